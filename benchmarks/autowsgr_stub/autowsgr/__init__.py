@@ -0,0 +1,16 @@
+"""
+autowsgr 的本地替身包，只实现 scripts/*.py 用到的接口，不连接模拟器。
+用于在普通 Linux 机器上对 GUI 的进程管理、日志显示与异常重启路径做压力测试。
+
+启动 GUI 前设置环境变量 AUTOWSGR_STUB=1，任务进程的 PYTHONPATH 会优先指向本目录；
+也可以直接运行: PYTHONPATH=benchmarks/autowsgr_stub python -m scripts.auto_daily
+设置 AUTOWSGR_STUB 后 GUI 不会把任务输出写入遭遇记录与日志归档。
+
+行为由以下环境变量控制（均可省略）:
+    AUTOWSGR_STUB_REPLAY   回放的日志文件或 GUI 录制的会话文件（.awsr）；不设置时按任务参数生成模拟的出征日志
+    AUTOWSGR_STUB_SPEED    倍速，默认 1；0 表示不等待，尽可能快地输出
+    AUTOWSGR_STUB_BURST    突发输出，格式 "行数@间隔秒"，如 "2000@5"
+    AUTOWSGR_STUB_HANG     运行若干秒后停止输出并挂起，等待被终止
+    AUTOWSGR_STUB_CRASH    运行若干秒后崩溃，格式 "秒数[:exception|exit|abort]"
+    AUTOWSGR_STUB_SEED     随机数种子，固定后生成的日志可复现
+"""
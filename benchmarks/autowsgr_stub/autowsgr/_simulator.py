@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+# 替身包的核心：按倍速输出日志，并在指定时间注入突发输出、挂起与崩溃。
+# 各脚本接口只负责生成“该说什么”，什么时候说、说多快都由 Simulator 决定。
+
+SPEED_ENV = 'AUTOWSGR_STUB_SPEED'
+REPLAY_ENV = 'AUTOWSGR_STUB_REPLAY'
+BURST_ENV = 'AUTOWSGR_STUB_BURST'
+HANG_ENV = 'AUTOWSGR_STUB_HANG'
+CRASH_ENV = 'AUTOWSGR_STUB_CRASH'
+SEED_ENV = 'AUTOWSGR_STUB_SEED'
+
+# 没有时间戳的回放文件中相邻两行的间隔（秒）
+DEFAULT_REPLAY_INTERVAL = 0.2
+# 回放时单次等待的上限，避免日志中的长时间空档让回放停住
+MAX_REPLAY_GAP = 30.0
+# 等待时检查注入事件的粒度（秒）
+CHECK_INTERVAL = 0.05
+
+_TIMESTAMP_PATTERN = re.compile(r'^\s*(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)')
+_LEVEL_COLORS = {'DEBUG': '34', 'INFO': '32', 'WARNING': '33', 'ERROR': '31', 'CRITICAL': '35'}
+
+SHIP_TYPES = ('BB', 'BC', 'CA', 'CL', 'CV', 'CVL', 'DD', 'SS', 'CLT', 'NAP')
+
+class _Formatter(logging.Formatter):
+    """与 autowsgr 终端输出相近的带颜色格式"""
+    def format(self, record):
+        timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        color = _LEVEL_COLORS.get(record.levelname, '0')
+        return (f"{timestamp} \x1b[36mautowsgr\x1b[0m \x1b[{color}m{record.levelname}\x1b[0m "
+                f"{record.getMessage()}")
+
+def _env_float(name, default=None):
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"忽略无效的环境变量 {name}={value}", file=sys.stderr)
+        return default
+
+class AttrDict(dict):
+    """支持属性访问的配置字典，缺少的键返回 None，与 autowsgr 配置对象的用法一致"""
+    def __getattr__(self, name):
+        value = self.get(name)
+        return AttrDict(value) if isinstance(value, dict) else value
+
+class Simulator:
+    def __init__(self):
+        self.speed = max(0.0, _env_float(SPEED_ENV, 1.0))
+        seed = os.environ.get(SEED_ENV)
+        self.random = random.Random(seed)
+        self.started = time.monotonic()
+        self.simulated_seconds = 0.0 # 按 1 倍速计算的已运行时间
+        self.hang_at = _env_float(HANG_ENV)
+        self.crash_at, self.crash_mode = self._parse_crash(os.environ.get(CRASH_ENV, ''))
+        self.burst_lines, self.burst_interval = self._parse_burst(os.environ.get(BURST_ENV, ''))
+        self.next_burst = self.burst_interval
+        self.burst_count = 0
+
+        self.logger = logging.getLogger('autowsgr')
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(_Formatter())
+            self.logger.addHandler(handler)
+
+    @staticmethod
+    def _parse_crash(value):
+        if not value.strip():
+            return None, None
+        seconds, _, mode = value.partition(':')
+        mode = mode.strip() or 'exception'
+        if mode not in ('exception', 'exit', 'abort'):
+            print(f"未知的崩溃方式 {mode}，改用 exception", file=sys.stderr)
+            mode = 'exception'
+        try:
+            return float(seconds), mode
+        except ValueError:
+            print(f"忽略无效的环境变量 {CRASH_ENV}={value}", file=sys.stderr)
+            return None, None
+
+    @staticmethod
+    def _parse_burst(value):
+        if not value.strip():
+            return 0, None
+        lines, _, interval = value.partition('@')
+        try:
+            return int(lines), float(interval or 0)
+        except ValueError:
+            print(f"忽略无效的环境变量 {BURST_ENV}={value}", file=sys.stderr)
+            return 0, None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    # ---------- 注入事件 ----------
+
+    def _check_events(self):
+        elapsed = self.elapsed()
+        if self.crash_at is not None and elapsed >= self.crash_at:
+            self._crash()
+        if self.hang_at is not None and elapsed >= self.hang_at:
+            self.logger.warning("[stub] 模拟挂起，不再输出")
+            sys.stdout.flush()
+            threading.Event().wait()
+        if self.burst_interval is not None and elapsed >= self.next_burst:
+            self._burst()
+            self.next_burst = elapsed + self.burst_interval if self.burst_interval > 0 else float('inf')
+
+    def _crash(self):
+        self.logger.error(f"[stub] 模拟崩溃 ({self.crash_mode})")
+        sys.stdout.flush()
+        if self.crash_mode == 'abort':
+            os.abort()
+        if self.crash_mode == 'exit':
+            os._exit(3)
+        raise RuntimeError("autowsgr 替身包模拟的崩溃")
+
+    def _burst(self):
+        """一次性写出大量日志行，模拟识别失败时的刷屏"""
+        self.burst_count += 1
+        prefix = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        lines = [f"{prefix} \x1b[36mautowsgr\x1b[0m \x1b[34mDEBUG\x1b[0m "
+                 f"[stub] 突发输出 {self.burst_count}-{i}: 等待界面 map_page 超时，重新截图"
+                 for i in range(self.burst_lines)]
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    # ---------- 输出 ----------
+
+    def wait(self, seconds: float):
+        """按倍速等待 1 倍速下的 seconds 秒，期间照常触发注入事件"""
+        self.simulated_seconds += seconds
+        remaining = seconds / self.speed if self.speed > 0 else 0.0
+        while True:
+            self._check_events()
+            if remaining <= 0:
+                return
+            step = min(remaining, CHECK_INTERVAL)
+            time.sleep(step)
+            remaining -= step
+
+    def log(self, message: str, delay: float = 0.5, level: int = logging.INFO):
+        """等待 delay 秒（1 倍速下）后输出一行日志"""
+        self.wait(delay)
+        self.logger.log(level, message)
+
+    def replay(self, path) -> int:
+        """
+        按日志中的时间戳间隔原样回放文件，返回进程应使用的退出代码。
+        GUI 录制的会话文件（.awsr）按录制时的字节流与间隔回放，并沿用录制中的退出代码。
+        """
+        from utils.session_recorder import is_session_file
+        if is_session_file(path):
+            return self._replay_session(path)
+        count = 0
+        previous = None
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                match = _TIMESTAMP_PATTERN.match(line)
+                if match:
+                    current = self._parse_timestamp(match.group(1))
+                    gap = 0.0 if previous is None or current is None else (current - previous).total_seconds()
+                    previous = current or previous
+                    self.wait(min(max(gap, 0.0), MAX_REPLAY_GAP))
+                elif previous is None:
+                    self.wait(DEFAULT_REPLAY_INTERVAL)
+                sys.stdout.write(line + "\n")
+                sys.stdout.flush()
+                count += 1
+        self.logger.info(f"[stub] 回放结束，共 {count} 行")
+        return 0
+
+    def _replay_session(self, path) -> int:
+        from utils.session_recorder import SessionReader, STREAM_STDERR, STREAM_EVENT
+        reader = SessionReader(path)
+        previous_ms = 0
+        exit_code = 0
+        for elapsed_ms, stream, data in reader.records():
+            self.wait(max(0, elapsed_ms - previous_ms) / 1000)
+            previous_ms = elapsed_ms
+            if stream == STREAM_EVENT:
+                exit_code = json.loads(data.decode('utf-8')).get('exit_code', exit_code)
+                continue
+            output = sys.stderr if stream == STREAM_STDERR else sys.stdout
+            output.buffer.write(data)
+            output.flush()
+        return exit_code
+
+    @staticmethod
+    def _parse_timestamp(text):
+        text = text.replace('T', ' ').replace(',', '.')
+        for fmt in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+        return None
+
+    # ---------- 模拟出征 ----------
+
+    def enemy_counts(self) -> dict:
+        counts = {}
+        for _ in range(6):
+            ship_type = self.random.choice(SHIP_TYPES)
+            counts[ship_type] = counts.get(ship_type, 0) + 1
+        return counts
+
+    def sortie(self, map_key: str, nodes: list, fleet_id) -> bool:
+        """模拟一次出征，返回是否到达了路线上的最后一个节点"""
+        self.log(f"开始出征 地图: {map_key}，舰队: {fleet_id}", delay=3.0)
+        route_length = self.random.randint(1, len(nodes)) if nodes else 0
+        for node in nodes[:route_length]:
+            # 与 autowsgr 开启 show_map_node 时的 DEBUG 输出相同：Logger.debug 输出的是参数元组的 str()
+            self.log(str((node,)), delay=2.0, level=logging.DEBUG)
+            self.log("matched: spot_enemy_success", delay=1.0)
+            enemies = self.enemy_counts()
+            enemies['ALL'] = sum(enemies.values())
+            for _ in range(2):  # 常规战中每次索敌输出两次
+                self.log(str(('enemies:' + str(enemies),)), delay=0.1, level=logging.DEBUG)
+            self.log("matched: result", delay=self.random.uniform(20.0, 60.0))
+        finished = bool(nodes) and route_length == len(nodes)
+        self.log("到达终点，返回港口" if finished else "中途撤退，返回港口", delay=2.0)
+        return finished
+
+_simulator = None
+
+def get_simulator() -> Simulator:
+    global _simulator
+    if _simulator is None:
+        _simulator = Simulator()
+    return _simulator
+
+def load_plan(path) -> tuple:
+    """读取计划文件，返回 (地图, 节点列表)；文件不存在时使用 1-1 的默认路线"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            plan = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError, TypeError):
+        get_simulator().log(f"[stub] 无法读取计划 {path}，使用默认路线", delay=0, level=logging.WARNING)
+        return '1-1', ['A', 'B']
+    map_key = f"{plan.get('chapter', 1)}-{plan.get('map', 1)}"
+    nodes = [str(node) for node in plan.get('selected_nodes') or []]
+    return map_key, nodes
+
+def build_plan_tree(plan_root) -> dict:
+    """与 autowsgr 的 plan_tree 相同：normal_fight 目录下按子目录与文件名嵌套的计划路径"""
+    tree = {}
+    root = Path(plan_root or '') / 'normal_fight'
+    if not root.is_dir():
+        return tree
+    for path in sorted(root.rglob('*.yaml')):
+        node = tree
+        for part in path.relative_to(root).parent.parts:
+            node = node.setdefault(part, {})
+        node[path.stem] = str(path)
+    return tree
@@ -0,0 +1 @@
+from autowsgr.fight.decisive_battle import DecisiveBattle
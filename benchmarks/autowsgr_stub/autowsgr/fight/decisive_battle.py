@@ -0,0 +1,17 @@
+STAGES = 3
+
+class DecisiveBattle:
+    def __init__(self, timer):
+        self.timer = timer
+        self.simulator = timer.simulator
+        self.chapter = (timer.config.decisive_battle or {}).get('chapter', 6)
+
+    def run_for_times(self, times: int):
+        log = self.simulator.log
+        for run in range(1, int(times) + 1):
+            log(f"决战 第 {self.chapter} 章，第 {run}/{times} 轮", delay=3.0)
+            for stage in range(1, STAGES + 1):
+                log(f"进入第 {stage} 小关，选择舰船", delay=10.0)
+                for node in 'ABCDE'[:self.simulator.random.randint(3, 5)]:
+                    log(f"决战节点 {node} 战果: {self.simulator.random.choice(('S', 'A', 'B'))}", delay=30.0)
+            log(f"第 {run} 轮决战结束，重置关卡", delay=5.0)
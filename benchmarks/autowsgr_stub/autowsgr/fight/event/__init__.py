@@ -0,0 +1,55 @@
+import importlib.abc
+import importlib.machinery
+import re
+import sys
+import types
+from pathlib import Path
+from autowsgr._simulator import load_plan
+
+# 任意活动编号的模块 autowsgr.fight.event.event_<编号> 都由此处即时生成，
+# 其中的 EventFightPlan<编号去掉下划线> 按活动计划文件模拟出征。
+
+_EVENT_MODULE_PATTERN = re.compile(rf'^{re.escape(__name__)}\.event_(\w+)$')
+
+class EventFightPlan:
+    event_identifier = ''
+
+    def __init__(self, timer, plan_path, fleet_id=None, *args, **kwargs):
+        self.timer = timer
+        self.simulator = timer.simulator
+        self.fleet_id = fleet_id
+        self.map_key, self.nodes = load_plan(self._resolve_plan(timer, plan_path))
+
+    def _resolve_plan(self, timer, plan_path) -> str:
+        """计划名按 plan_root/event/<活动目录>/<计划名>.yaml 查找"""
+        path = Path(plan_path)
+        if path.is_file():
+            return str(path)
+        folder = self.event_identifier.replace('_', '')
+        return str(Path(timer.config.plan_root or '') / 'event' / folder / f"{plan_path}.yaml")
+
+    def run_for_times(self, times: int, gap: int = 1800, *args, **kwargs):
+        next_bonus_check = self.simulator.simulated_seconds + int(gap)
+        for i in range(1, int(times) + 1):
+            self.simulator.log(f"活动出征 第 {i}/{times} 次", delay=0.5)
+            self.simulator.sortie(self.map_key, self.nodes, self.fleet_id)
+            if self.simulator.simulated_seconds >= next_bonus_check:
+                self.simulator.log("检查并收取任务奖励", delay=5.0)
+                next_bonus_check = self.simulator.simulated_seconds + int(gap)
+
+class _EventModuleFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, fullname, path=None, target=None):
+        if _EVENT_MODULE_PATTERN.match(fullname):
+            return importlib.machinery.ModuleSpec(fullname, self)
+        return None
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module: types.ModuleType):
+        identifier = _EVENT_MODULE_PATTERN.match(module.__name__).group(1)
+        class_name = f"EventFightPlan{identifier.replace('_', '')}"
+        setattr(module, class_name, type(class_name, (EventFightPlan,), {'event_identifier': identifier}))
+
+if not any(isinstance(finder, _EventModuleFinder) for finder in sys.meta_path):
+    sys.meta_path.append(_EventModuleFinder())
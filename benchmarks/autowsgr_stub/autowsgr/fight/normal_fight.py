@@ -0,0 +1,23 @@
+from autowsgr._simulator import load_plan
+
+class NormalFightPlan:
+    def __init__(self, timer, plan_path, fleet_id=None, fleet=-1, *args, **kwargs):
+        self.timer = timer
+        self.simulator = timer.simulator
+        self.fleet_id = fleet_id
+        self.map_key, self.nodes = load_plan(plan_path)
+
+    def run(self):
+        return 'success' if self.simulator.sortie(self.map_key, self.nodes, self.fleet_id) else 'dock is full'
+
+    def run_for_times(self, times: int, *args, **kwargs):
+        for _ in range(int(times)):
+            self.run()
+
+    def run_for_times_condition(self, times: int, last_point: str, result='S', *args, **kwargs):
+        """出征直到以 result 以上的战果到达 last_point 达到 times 次"""
+        reached = 0
+        while reached < int(times):
+            if self.simulator.sortie(self.map_key, self.nodes, self.fleet_id):
+                reached += 1
+                self.simulator.log(f"已在节点 {last_point} 取得 {result} 胜 {reached}/{times} 次", delay=0.5)
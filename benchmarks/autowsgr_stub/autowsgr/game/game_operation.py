@@ -0,0 +1,2 @@
+def set_support(timer, enable: bool):
+    timer.simulator.log(f"{'开启' if enable else '关闭'}战役支援", delay=3.0)
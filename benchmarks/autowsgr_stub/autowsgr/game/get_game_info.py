@@ -0,0 +1,2 @@
+def get_loot_and_ship(timer):
+    timer.simulator.log(f"今日已获取舰船 {timer.got_ship_num}/500，胖次 {timer.got_loot_num}/50", delay=2.0)
@@ -0,0 +1,15 @@
+from autowsgr.fight.decisive_battle import DecisiveBattle
+
+class TaskRunner:
+    def __init__(self, timer):
+        self.timer = timer
+        self.tasks = []
+
+    def add_decisive_task(self, times: int):
+        self.tasks.append(('决战', times))
+
+    def run(self):
+        for name, times in self.tasks:
+            self.timer.simulator.log(f"任务队列: 开始 {name} × {times}", delay=1.0)
+            DecisiveBattle(self.timer).run_for_times(times)
+        self.timer.simulator.log("任务队列已清空", delay=0.5)
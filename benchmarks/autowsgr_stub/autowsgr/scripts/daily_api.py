@@ -0,0 +1,44 @@
+from autowsgr._simulator import AttrDict, load_plan
+
+class DailyOperation:
+    def __init__(self, timer):
+        self.timer = timer
+        self.simulator = timer.simulator
+        self.config = timer.config.daily_automation or AttrDict()
+        self.plan_root = timer.config.plan_root or ''
+
+    def run(self):
+        config = self.config
+        log = self.simulator.log
+        if config.auto_expedition:
+            log("检查远征", delay=2.0)
+            log("远征已收取，重新派遣", delay=4.0)
+        if config.auto_gain_bonus:
+            log("收取任务奖励", delay=2.0)
+        if config.auto_bath_repair:
+            log("澡堂修理: 无需修理的舰船", delay=3.0)
+        if config.auto_battle:
+            for i in range(1, 4):
+                log(f"战役 {config.battle_type} 第 {i} 次", delay=15.0)
+        if config.auto_exercise:
+            for i in range(1, 5):
+                log(f"演习 舰队: {config.exercise_fleet_id} 对手 {i} 战果: S", delay=20.0)
+        for task in config.normal_fight_tasks or []:
+            if not self._run_normal_fight(*task):
+                break
+        log("日常任务已完成", delay=1.0)
+
+    def _run_normal_fight(self, plan_name, fleet_id, times) -> bool:
+        """执行一个常规战任务，达到出征上限时返回 False"""
+        map_key, nodes = load_plan(f"{self.plan_root}/normal_fight/{plan_name}.yaml")
+        self.simulator.log(f"开始常规战任务 {plan_name}，计划出征 {times} 次", delay=1.0)
+        for i in range(int(times)):
+            if self.config.stop_max_ship and self.timer.got_ship_num >= 500:
+                self.simulator.log("已达出征上限，停止常规战", delay=0.5)
+                return False
+            self.simulator.log(f"正在执行的PLAN: {plan_name}, 已出击次数/目标次数: {i}/{times}, "
+                               f"消耗快修数量: 0, 已掉落船数量: {self.timer.got_ship_num}", delay=0.5)
+            if self.simulator.sortie(map_key, nodes, fleet_id):
+                self.timer.got_ship_num += 1
+                self.simulator.log(f"已获取舰船 {self.timer.got_ship_num}/500", delay=0.5)
+        return True
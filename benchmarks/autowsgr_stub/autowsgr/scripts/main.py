@@ -0,0 +1,32 @@
+import os
+import yaml
+from autowsgr._simulator import REPLAY_ENV, AttrDict, build_plan_tree, get_simulator
+
+class Timer:
+    """autowsgr 的 Timer 替身，只保留脚本用到的属性"""
+    def __init__(self, config: AttrDict):
+        self.simulator = get_simulator()
+        self.logger = self.simulator.logger
+        self.config = config
+        self.plan_tree = build_plan_tree(config.plan_root)
+        self.got_ship_num = self.simulator.random.randint(0, 400)
+        self.got_loot_num = self.simulator.random.randint(0, 50)
+
+def start_script(settings_path=None) -> Timer:
+    """读取用户设置并“连接”模拟器；设置了回放文件时直接回放并结束进程"""
+    simulator = get_simulator()
+    try:
+        with open(settings_path, encoding='utf-8') as f:
+            config = AttrDict(yaml.safe_load(f) or {})
+    except (OSError, TypeError, yaml.YAMLError) as e:
+        simulator.log(f"[stub] 读取设置失败: {e}", delay=0)
+        config = AttrDict()
+    simulator.log(f"[stub] 使用 autowsgr 替身包，倍速 {simulator.speed:g}", delay=0)
+    replay_path = os.environ.get(REPLAY_ENV)
+    if replay_path:
+        raise SystemExit(simulator.replay(replay_path))
+
+    simulator.log(f"已加载设置文件: {settings_path}", delay=0.2)
+    simulator.log(f"正在连接模拟器 {config.emulator_type or ''} {config.emulator_name or ''}".rstrip(), delay=1.0)
+    simulator.log("模拟器连接成功，游戏已启动", delay=3.0)
+    return Timer(config)
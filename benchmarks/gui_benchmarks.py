@@ -0,0 +1,415 @@
+"""
+离屏 GUI 基准测试：在 QT_QPA_PLATFORM=offscreen 下使用临时配置与生成的计划目录运行，
+测量主窗口构造、页面切换、计划切换、地图缩放、日志吞吐、配置保存与舰队编辑器打开等耗时，
+并用 autowsgr 替身包（benchmarks/autowsgr_stub）运行日常任务，测量任务输出的处理耗时与崩溃检测。
+
+结果追加到历史文件（默认 data/benchmarks/gui_history.json），并与同一台机器最近几次结果的
+中位数比较，超出 gui_thresholds.json 中的回退阈值时以非零状态退出。
+
+用法:
+    python benchmarks/gui_benchmarks.py                 # 运行全部并记录
+    python benchmarks/gui_benchmarks.py --quick         # 跳过 10 万行日志等耗时项
+    python benchmarks/gui_benchmarks.py --no-record     # 只比较，不写入历史
+    python benchmarks/gui_benchmarks.py --only log      # 只运行名称包含 log 的项目
+    python benchmarks/gui_benchmarks.py --session x.awsr  # 额外以不限速回放一个录制的任务会话
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+THRESHOLDS_FILE = Path(__file__).resolve().parent / 'gui_thresholds.json'
+# autowsgr 日常任务（DEBUG 级别、开启 show_map_node）的控制台输出及从中应解析出的遭遇
+ENCOUNTER_FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'autowsgr_daily_debug.log'
+DEFAULT_HISTORY = ROOT / 'data' / 'benchmarks' / 'gui_history.json'
+
+# ---------- 测试环境 ----------
+
+def build_sandbox(work_dir: Path) -> Path:
+    """生成计划目录（每张普通地图一个计划）与指向它的配置副本，返回计划根目录"""
+    import yaml
+    plan_root = work_dir / 'plans'
+    normal_dir = plan_root / 'normal_fight'
+    normal_dir.mkdir(parents=True)
+    (plan_root / 'event' / '20250930').mkdir(parents=True)
+    (plan_root / 'exercise').mkdir(parents=True)
+    with open(ROOT / 'resources' / 'normal_map_configs.yaml', encoding='utf-8') as f:
+        map_configs = yaml.safe_load(f)
+    for chapter_maps in map_configs.values():
+        for map_key, map_info in chapter_maps.items():
+            chapter, map_num = map_key.split('-')
+            nodes = list((map_info.get('nodes') or {}).keys())
+            plan_lines = [
+                f"# 基准测试计划 {map_key}",
+                f"chapter: {chapter}",
+                f"map: {map_num}",
+                "repair_mode: 2",
+                "fleet_id: 1",
+                f"selected_nodes: [{', '.join(nodes)}]",
+                "node_defaults:",
+                "  night: False",
+                "  formation: 2",
+            ]
+            if nodes:
+                plan_lines += ["node_args:", f"  {nodes[-1]}:", "    enemy_rules:",
+                               "      - [BB + CL > 1 and ( CV == 0 ), retreat]"]
+            (normal_dir / f"{map_key}.yaml").write_text("\n".join(plan_lines) + "\n", encoding='utf-8')
+    (plan_root / 'exercise' / 'exercise.yaml').write_text(
+        "exercise_times: 4\nrobot: True\nfleet_id: 2\nmax_refresh_times: 2\n", encoding='utf-8')
+
+    settings = (ROOT / 'user_settings.yaml').read_text(encoding='utf-8')
+    replacements = {'plan_root': plan_root.as_posix(),
+                    'ship_name_file': (ROOT / 'resources' / 'ship_name.yaml').as_posix()}
+    for key, value in replacements.items():
+        settings, count = re.subn(rf'^{key}:.*$', f"{key}: {value}", settings, flags=re.MULTILINE)
+        if not count:
+            settings += f"\n{key}: {value}\n"
+    (work_dir / 'user_settings.yaml').write_text(settings, encoding='utf-8')
+    shutil.copy(ROOT / 'ui_configs.yaml', work_dir / 'ui_configs.yaml')
+    return plan_root
+
+# ---------- 计时工具 ----------
+
+def timed_ms(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+def median(samples) -> float:
+    return statistics.median(samples)
+
+def p95(samples) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+# ---------- 基准项目 ----------
+
+class GuiBenchmarks:
+    def __init__(self, app, quick: bool, session_path=None):
+        self.app = app
+        self.quick = quick
+        self.session_path = session_path
+        self.window = None
+
+    def settle(self):
+        self.app.processEvents()
+        self.app.processEvents()
+
+    def bench_mainwindow_cold(self):
+        from main_window.main_window import MainWindow
+
+        def construct():
+            self.window = MainWindow()
+            self.window.resize(1200, 850)
+            self.window.show()
+            self.settle()
+        return {'mainwindow_cold_ms': timed_ms(construct)}
+
+    def bench_tab_switch(self):
+        side_bar = self.window.side_bar
+        count = self.window.stacked_widget.count()
+        samples = []
+        for _ in range(5):
+            for index in list(range(1, count)) + [0]:
+                samples.append(timed_ms(lambda: (side_bar.on_button_clicked(index), self.settle())))
+        return {'tab_switch_median_ms': median(samples), 'tab_switch_p95_ms': p95(samples)}
+
+    def _open_plan_editor(self):
+        editor = self.window.plan_editor_tab
+        self.window.side_bar.on_button_clicked(self.window.stacked_widget.indexOf(editor))
+        self.settle()
+        editor.root_combo.setCurrentIndex(editor.root_combo.findText('normal_fight'))
+        self.settle()
+        return editor
+
+    def bench_plan_select(self):
+        editor = self._open_plan_editor()
+        combo = editor.plan_combo
+        names = [combo.itemText(i) for i in range(combo.count()) if not combo.itemText(i).startswith('[')]
+        results = {'plan_count': len(names)}
+        for label in ('cold', 'warm'):
+            samples = [timed_ms(lambda: (combo.setCurrentText(name), self.settle())) for name in names]
+            results[f'plan_select_{label}_median_ms'] = median(samples)
+            results[f'plan_select_{label}_p95_ms'] = p95(samples)
+        return results
+
+    def bench_map_resize(self):
+        editor = self._open_plan_editor()
+        combo = editor.plan_combo
+        combo.setCurrentText('9-3' if combo.findText('9-3') != -1 else combo.itemText(0))
+        self.settle()
+        sizes = [(1000 + (i % 12) * 50, 700 + (i % 8) * 30) for i in range(60)]
+        samples = [timed_ms(lambda: (self.window.resize(w, h), self.settle())) for w, h in sizes]
+        self.window.resize(1200, 850)
+        self.settle()
+        return {'map_resize_frame_median_ms': median(samples), 'map_resize_frame_p95_ms': p95(samples)}
+
+    def _log_lines(self, count):
+        for i in range(count):
+            yield (f"2026-10-18 21:{i // 6000 % 60:02d}:{i // 100 % 60:02d}.{i % 1000:03d} \x1b[36mautowsgr\x1b[0m "
+                   f"\x1b[32mINFO\x1b[0m 第 {i} 次出击，节点 {'ABCDEFGHIJ'[i % 10]} 敌方阵容: BB CV CL DD DD SS")
+
+    def _bench_log(self, count):
+        log_tab = self.window.log_tab
+        self.window.side_bar.on_button_clicked(self.window.stacked_widget.indexOf(log_tab))
+        log_tab._clear_log()
+        self.settle()
+        lines = list(self._log_lines(count))
+        chunks = ["\n".join(lines[i:i + 20]) for i in range(0, len(lines), 20)]
+
+        def feed():
+            for chunk in chunks:
+                log_tab.append_log_message(chunk)
+            self.settle()
+        total = timed_ms(feed)
+        log_tab._clear_log()
+        self.settle()
+        return total
+
+    def bench_log_throughput(self):
+        results = {'log_10k_lines_ms': self._bench_log(10_000)}
+        if not self.quick:
+            results['log_100k_lines_ms'] = self._bench_log(100_000)
+        return results
+
+    def bench_save_config(self):
+        from constants import SETTINGS_FILE
+        from utils.config_utils import create_yaml_manager, save_config
+        yaml_manager = create_yaml_manager()
+        with open(SETTINGS_FILE, encoding='utf-8') as f:
+            data = yaml_manager.load(f)
+        target = SETTINGS_FILE.parent / 'save_config_bench.yaml'
+        samples = [timed_ms(lambda: save_config(yaml_manager, data, target)) for _ in range(50)]
+        return {'save_config_median_ms': median(samples), 'save_config_p95_ms': p95(samples)}
+
+    def bench_fleet_editor_open(self):
+        from PySide6.QtWidgets import QDialog
+        from tabs.components.dialog_pool import acquire_dialog
+        from tabs.components.fleet_editor_dialog import FleetEditorDialog
+        editor = self._open_plan_editor()
+        parent = editor.settings_panel
+        fleet = ['胡德', '俾斯麦', '大和', '', '', '']
+        custom_ships = list(self.window.custom_ship_name.get('custom_ship_names', []) or [])
+
+        def open_once():
+            dialog = acquire_dialog(FleetEditorDialog, parent, fleet, custom_ships)
+            dialog.show()
+            self.settle()
+            dialog.done(QDialog.DialogCode.Rejected)
+            self.settle()
+        first = timed_ms(open_once)
+        samples = [timed_ms(open_once) for _ in range(10)]
+        return {'fleet_editor_first_open_ms': first, 'fleet_editor_reopen_median_ms': median(samples)}
+
+    def _wait_for_tasks(self, finished: list, count: int, timeout_s=300):
+        """处理事件直到 finished 中累计 count 个任务结束"""
+        from PySide6.QtCore import QEventLoop
+        deadline = time.perf_counter() + timeout_s
+        while len(finished) < count:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"任务在 {timeout_s} 秒内没有结束")
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+
+    def bench_stub_task(self):
+        """用替身包以不限速的方式运行日常任务，再模拟一次崩溃并确认自动重启"""
+        daily_tab = self.window.daily_tab
+        log_buffer = self.window.log_tab.log_buffer
+        finished = []
+        slot = lambda task_name, is_error: finished.append(is_error)
+        daily_tab.task_finished.connect(slot)
+        os.environ.update({'AUTOWSGR_STUB_SPEED': '0', 'AUTOWSGR_STUB_SEED': '1'})
+        try:
+            lines_before = log_buffer.total_written
+            start = time.perf_counter()
+            daily_tab._on_task_toggle()
+            self._wait_for_tasks(finished, 1)
+            total = (time.perf_counter() - start) * 1000
+            lines = log_buffer.total_written - lines_before
+            if finished[0]:
+                raise RuntimeError("替身包日常任务被判定为异常退出")
+
+            self.window.log_tab.auto_restart_checkbox.setChecked(True)
+            os.environ['AUTOWSGR_STUB_CRASH'] = '0.5'
+            daily_tab._on_task_toggle()
+            self._wait_for_tasks(finished, 2)
+            # 重启后的任务不再注入崩溃，应当正常结束
+            del os.environ['AUTOWSGR_STUB_CRASH']
+            if not finished[1]:
+                raise RuntimeError("替身包模拟的崩溃没有被判定为异常退出")
+            self._wait_for_tasks(finished, 3, timeout_s=60)
+            if finished[2]:
+                raise RuntimeError("崩溃后自动重启的任务没有正常结束")
+        finally:
+            os.environ.pop('AUTOWSGR_STUB_CRASH', None)
+            daily_tab.task_finished.disconnect(slot)
+        self.window.log_tab._clear_log()
+        self.settle()
+        return {'stub_daily_task_ms': total, 'stub_daily_task_lines': lines}
+
+    def bench_encounter_parse(self):
+        """用 autowsgr 日志样本校验遭遇解析结果，并测量解析耗时"""
+        from utils.encounter_store import EncounterLogParser
+        lines = ENCOUNTER_FIXTURE.read_text(encoding='utf-8').splitlines()
+        with open(ENCOUNTER_FIXTURE.with_suffix('.expected.json'), encoding='utf-8') as f:
+            expected = [tuple(item) for item in json.load(f)]
+
+        def parse():
+            parser = EncounterLogParser()
+            encounters = [encounter[:3] for line in lines for encounter in parser.feed_line(line)]
+            return encounters + [encounter[:3] for encounter in parser.flush()]
+        encounters = parse()
+        if encounters != expected:
+            raise RuntimeError(f"遭遇解析结果与样本不符: {encounters}")
+        repeats = 20 if self.quick else 200
+        total = timed_ms(lambda: [parse() for _ in range(repeats)])
+        return {'encounter_parse_ms': total / repeats}
+
+    def bench_session_replay(self):
+        """不限速回放录制的会话，测量日志页与遭遇解析器处理同一段真实输出的耗时"""
+        from utils.encounter_store import EncounterRecorder, EncounterStore
+        from utils.session_replay import SessionReplayer
+        log_tab = self.window.log_tab
+        log_tab._clear_log()
+        from constants import DIAGNOSTICS_DIR
+        recorder = EncounterRecorder(EncounterStore(DIAGNOSTICS_DIR / 'replay_encounters'))
+        replayer = SessionReplayer(self.session_path, speed=0)
+        replayer.output_ready.connect(log_tab.append_log_message)
+        replayer.output_ready.connect(recorder.feed)
+        summaries = []
+        replayer.finished.connect(summaries.append)
+        lines_before = log_tab.log_buffer.total_written
+        replayer.start()
+        while not summaries:
+            self.app.processEvents()
+        recorder.finish()
+        lines = log_tab.log_buffer.total_written - lines_before
+        log_tab._clear_log()
+        self.settle()
+        # 指标名带上录制文件名，不同会话的结果不会互相作为基线
+        name = Path(self.session_path).stem
+        return {f'session_replay[{name}]_ms': summaries[0]['elapsed_ms'], f'session_replay[{name}]_lines': lines}
+
+    def run(self, only=None):
+        benches = [
+            ('mainwindow_cold', self.bench_mainwindow_cold),
+            ('tab_switch', self.bench_tab_switch),
+            ('plan_select', self.bench_plan_select),
+            ('map_resize', self.bench_map_resize),
+            ('log_throughput', self.bench_log_throughput),
+            ('save_config', self.bench_save_config),
+            ('fleet_editor_open', self.bench_fleet_editor_open),
+            ('stub_task', self.bench_stub_task),
+            ('encounter_parse', self.bench_encounter_parse),
+        ]
+        if self.session_path:
+            benches.append(('session_replay', self.bench_session_replay))
+        metrics = {}
+        for name, bench in benches:
+            # 主窗口是其余项目的前提，始终构造
+            if only and only not in name and name != 'mainwindow_cold':
+                continue
+            result = bench()
+            metrics.update(result)
+            print(f"{name}: " + "，".join(f"{key} = {value:g}" if isinstance(value, int) else f"{key} = {value:.2f}"
+                                            for key, value in result.items()))
+        return metrics
+
+# ---------- 历史与阈值 ----------
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+def load_history(path: Path) -> list:
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def check_regressions(metrics: dict, history: list, thresholds: dict, machine: str) -> list:
+    """与同一机器最近几次结果的中位数比较，返回回退描述列表"""
+    previous = [entry['metrics'] for entry in history if entry.get('machine') == machine]
+    previous = previous[-thresholds['baseline_runs']:]
+    failures = []
+    for key, value in metrics.items():
+        if not key.endswith('_ms'):
+            continue
+        baseline_values = [entry[key] for entry in previous if key in entry]
+        if not baseline_values:
+            continue
+        baseline = median(baseline_values)
+        ratio = thresholds['metrics'].get(key, thresholds['default_max_ratio'])
+        if value > baseline * ratio and value - baseline > thresholds['min_delta_ms']:
+            failures.append(f"{key}: {value:.2f} ms，基线 {baseline:.2f} ms（允许 ×{ratio}）")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="离屏 GUI 基准测试")
+    parser.add_argument('--quick', action='store_true', help="跳过 10 万行日志等耗时项")
+    parser.add_argument('--only', help="只运行名称包含该字符串的项目")
+    parser.add_argument('--session', type=Path, help="额外回放的会话录制文件")
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY, help="历史结果文件")
+    parser.add_argument('--no-record', action='store_true', help="不把本次结果写入历史")
+    args = parser.parse_args()
+    if args.session:
+        args.session = args.session.resolve()
+
+    work_dir = Path(tempfile.mkdtemp(prefix='autowsgr_bench_'))
+    build_sandbox(work_dir)
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    os.environ['AUTOWSGR_GUI_CONFIG_DIR'] = str(work_dir)
+    os.environ['AUTOWSGR_STUB'] = '1'
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6 import __version__ as pyside_version
+    from constants import STYLE_FILE
+    app = QApplication(sys.argv)
+    app.setStyleSheet(STYLE_FILE.read_text(encoding='utf-8'))
+
+    metrics = GuiBenchmarks(app, args.quick, args.session).run(args.only)
+
+    with open(THRESHOLDS_FILE, encoding='utf-8') as f:
+        thresholds = json.load(f)
+    machine = platform.node()
+    history = load_history(args.history)
+    failures = check_regressions(metrics, history, thresholds, machine)
+    if not args.no_record:
+        history.append({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'machine': machine,
+            'python': platform.python_version(),
+            'pyside': pyside_version,
+            'quick': args.quick,
+            'metrics': {key: round(value, 3) for key, value in metrics.items()},
+        })
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=1)
+        print(f"结果已记录到 {args.history}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    for message in failures:
+        print(f"性能回退: {message}")
+    print("通过" if not failures else f"{len(failures)} 项超出阈值")
+    sys.stdout.flush()
+    # 跳过解释器退出时的 Qt 对象析构，避免离屏平台下析构顺序导致的崩溃
+    os._exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
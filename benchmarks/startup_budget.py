@@ -0,0 +1,98 @@
+"""
+启动预算检查：在 offscreen 平台下启动 GUI，记录启动时间线，
+启动耗时或导入的模块超出 startup_budget.json 中的预算时以非零状态退出。
+
+用法:
+    python benchmarks/startup_budget.py            # 检查
+    python benchmarks/startup_budget.py --update   # 把本次导入的第三方包并入允许列表
+
+用户配置会先复制到临时目录（AUTOWSGR_GUI_CONFIG_DIR），启动过程中写回的配置不会影响仓库中的文件。
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / 'startup_budget.json'
+CONFIG_FILES = ('user_settings.yaml', 'ui_configs.yaml')
+
+def top_level_packages(modules) -> set:
+    """返回非标准库的顶层包名，忽略下划线开头与 Cython 运行时等随环境变化的内部模块"""
+    names = {name.split('.')[0] for name in modules} - sys.stdlib_module_names
+    return {name for name in names if not name.startswith('_') and name != 'cython_runtime'}
+
+def run_once(work_dir: Path, timeout: int) -> dict:
+    trace_path = work_dir / 'startup_trace.json'
+    if trace_path.exists():
+        trace_path.unlink()
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', AUTOWSGR_GUI_CONFIG_DIR=str(work_dir))
+    env.pop('AUTOWSGR_PROFILE_STARTUP', None)
+    subprocess.run([sys.executable, str(ROOT / 'main.pyw'), f'--profile-startup={trace_path}', '--exit-after-startup'],
+                   cwd=ROOT, env=env, timeout=timeout, check=True,
+                   stdout=subprocess.DEVNULL)
+    with open(trace_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def print_phases(trace: dict):
+    for event in trace['traceEvents']:
+        if event.get('ph') == 'X':
+            print(f"  {event['name']:<28} {event['ts'] / 1000:>8.1f} ms  +{event['dur'] / 1000:>7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="检查 GUI 启动耗时与导入模块是否超出预算")
+    parser.add_argument('--runs', type=int, default=3, help="启动次数，取最快一次的结果")
+    parser.add_argument('--timeout', type=int, default=120)
+    parser.add_argument('--update', action='store_true', help="把本次导入的第三方包并入预算文件")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE, encoding='utf-8') as f:
+        budget = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix='autowsgr_startup_') as tmp:
+        work_dir = Path(tmp)
+        for name in CONFIG_FILES:
+            if (ROOT / name).exists():
+                shutil.copy(ROOT / name, work_dir / name)
+        traces = [run_once(work_dir, args.timeout) for _ in range(max(1, args.runs))]
+    trace = min(traces, key=lambda t: t['otherData']['total_ms'])
+    total_ms = trace['otherData']['total_ms']
+    modules = trace['otherData']['modules']
+    packages = top_level_packages(modules)
+
+    print(f"启动耗时 {total_ms:.0f} ms（预算 {budget['max_startup_ms']} ms），"
+          f"已导入模块 {len(modules)} 个（预算 {budget['max_module_count']} 个）")
+    print_phases(trace)
+
+    if args.update:
+        budget['allowed_packages'] = sorted(set(budget['allowed_packages']) | packages)
+        with open(BUDGET_FILE, 'w', encoding='utf-8') as f:
+            json.dump(budget, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"已更新 {BUDGET_FILE.name}")
+        return 0
+
+    failures = []
+    if total_ms > budget['max_startup_ms']:
+        failures.append(f"启动耗时 {total_ms:.0f} ms 超出预算 {budget['max_startup_ms']} ms")
+    if len(modules) > budget['max_module_count']:
+        failures.append(f"导入模块数 {len(modules)} 超出预算 {budget['max_module_count']}")
+    forbidden = sorted(packages & set(budget['forbidden_packages']))
+    if forbidden:
+        failures.append(f"启动时导入了禁止的包: {', '.join(forbidden)}")
+    unexpected = sorted(packages - set(budget['allowed_packages']) - set(forbidden))
+    if unexpected:
+        failures.append(f"启动时导入了预算外的包: {', '.join(unexpected)}（确需导入时用 --update 更新预算）")
+
+    for message in failures:
+        print(f"失败: {message}")
+    if not failures:
+        print("通过")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
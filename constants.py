@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -8,11 +9,23 @@ MAP_PICS_DIR = BASE_DIR / 'resources/pics/map'
 SHIP_NAME_FILE = BASE_DIR / 'resources/ship_name.yaml'
 SHIPS_FILE = BASE_DIR / 'resources/all_ships.yaml'
 LOGO_FILE = BASE_DIR / 'resources/pics/logo/logo.png'
-SETTINGS_FILE = BASE_DIR / 'user_settings.yaml'
-UI_CONFIGS_FILE = BASE_DIR / 'ui_configs.yaml'
+# 用户配置文件所在目录，可用环境变量 AUTOWSGR_GUI_CONFIG_DIR 指向其他目录（如启动预算检查使用的临时副本）
+CONFIG_DIR = Path(os.environ.get('AUTOWSGR_GUI_CONFIG_DIR') or BASE_DIR)
+SETTINGS_FILE = CONFIG_DIR / 'user_settings.yaml'
+UI_CONFIGS_FILE = CONFIG_DIR / 'ui_configs.yaml'
 STYLE_FILE = BASE_DIR / 'style.qss'
 NORMAL_MAP_CONFIGS_FILE = BASE_DIR / 'resources/normal_map_configs.yaml'
 EVENT_MAP_CONFIGS_FILE = BASE_DIR / 'resources/event_map_configs.yaml'
+# 运行数据（遭遇记录、日志归档、诊断信息等）跟随配置目录，使用临时配置目录时不会写入仓库中的 data/
+DATA_DIR = CONFIG_DIR / 'data'
+ENCOUNTERS_DIR = DATA_DIR / 'encounters'
+ICON_CACHE_DIR = DATA_DIR / 'icon_cache'
+DIAGNOSTICS_DIR = DATA_DIR / 'diagnostics'
+SESSIONS_DIR = DATA_DIR / 'sessions'
+LOGS_DIR = DATA_DIR / 'logs'
+# 设置该环境变量后，任务进程使用 benchmarks/autowsgr_stub 中的 autowsgr 替身包
+AUTOWSGR_STUB_ENV = 'AUTOWSGR_STUB'
+AUTOWSGR_STUB_DIR = BASE_DIR / 'benchmarks/autowsgr_stub'
 ENEMY_SHIP_TYPES = {
     'BB': '战列',
     'BC': '战巡',
@@ -16,6 +16,7 @@ echo This script will install the following required libraries:
 echo   - PySide6
 echo   - ruamel.yaml
 echo   - ansi2html
+echo   - pypinyin
 echo.
 echo It will automatically detect the Python environment where
 echo 'autowsgr' is installed and use the Tsinghua University
@@ -90,7 +91,7 @@ echo.
 echo Starting installation...
 echo.
 
-"%TARGET_PYTHON%" -m pip install PySide6 ruamel.yaml ansi2html -i https://pypi.tuna.tsinghua.edu.cn/simple
+"%TARGET_PYTHON%" -m pip install PySide6 ruamel.yaml ansi2html pypinyin -i https://pypi.tuna.tsinghua.edu.cn/simple
 
 if %errorlevel% equ 0 (
     echo.
@@ -1,23 +1,78 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QFont
-from main_window.main_window import MainWindow
-from constants import STYLE_FILE
+from datetime import datetime
+from pathlib import Path
+# 启动计时模块只依赖标准库，需在其他模块之前导入
+from utils import startup_profiler
+
+EXIT_AFTER_STARTUP_FLAG = '--exit-after-startup'
+
+_profile_output = startup_profiler.requested_output()
+if _profile_output is not None:
+    startup_profiler.enable()
+
+# 将较重的依赖单独导入，以便在时间线中分别计时
+with startup_profiler.phase("import PySide6"):
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QFont
+    from PySide6.QtCore import QObject, QEvent, QTimer
+with startup_profiler.phase("import ruamel.yaml"):
+    import ruamel.yaml
+with startup_profiler.phase("import ansi2html"):
+    import ansi2html
+with startup_profiler.phase("import main_window"):
+    from main_window.main_window import MainWindow
+from constants import STYLE_FILE, DIAGNOSTICS_DIR
+
+class FirstPaintWatcher(QObject):
+    """窗口第一次绘制完成后调用 callback"""
+    def __init__(self, window, callback):
+        super().__init__(window)
+        self.callback = callback
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            # 过滤器在绘制之前被调用，等本次绘制完成后再回调
+            QTimer.singleShot(0, self.callback)
+        return False
+
+def finish_startup_profile(finish_first_paint, exit_after_startup):
+    """结束首次绘制阶段并写出启动时间线"""
+    finish_first_paint()
+    if _profile_output:
+        output = Path(_profile_output)
+    else:
+        output = DIAGNOSTICS_DIR / f"startup_trace_{datetime.now():%Y%m%d_%H%M%S}.json"
+    try:
+        startup_profiler.write_trace(output)
+        print(f"启动时间线已写入: {output}（共 {startup_profiler.total_ms():.0f} ms）")
+    except OSError as e:
+        print(f"写入启动时间线失败: {e}")
+    if exit_after_startup:
+        QApplication.instance().quit()
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    with startup_profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
     # 从外部文件加载并应用样式表
     font = QFont()
     font.setStyleStrategy(QFont.StyleStrategy.NoSubpixelAntialias)
     app.setFont(font)
-    try:
-        with open(STYLE_FILE, 'r', encoding='utf-8') as f:
-            style_sheet = f.read()
-            app.setStyleSheet(style_sheet)
-    except FileNotFoundError:
-        # 如果找不到样式文件，打印警告，程序仍可运行
-        print("警告: 'style.qss' 文件未找到，将使用默认样式运行。")
-
-    window = MainWindow()
+    with startup_profiler.phase("load stylesheet"):
+        try:
+            with open(STYLE_FILE, 'r', encoding='utf-8') as f:
+                style_sheet = f.read()
+                app.setStyleSheet(style_sheet)
+        except FileNotFoundError:
+            # 如果找不到样式文件，打印警告，程序仍可运行
+            print("警告: 'style.qss' 文件未找到，将使用默认样式运行。")
+
+    with startup_profiler.phase("MainWindow"):
+        window = MainWindow()
+    if startup_profiler.is_enabled():
+        finish_first_paint = startup_profiler.begin("first paint")
+        window.first_paint_watcher = FirstPaintWatcher(
+            window, lambda: finish_startup_profile(finish_first_paint, EXIT_AFTER_STARTUP_FLAG in sys.argv))
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
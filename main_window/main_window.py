@@ -1,13 +1,23 @@
+import os
 import sys
+from datetime import datetime
 from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QFrame, 
-                               QStackedWidget, QSystemTrayIcon, QMenu, QApplication)
-from PySide6.QtCore import Qt, QPoint, QEvent, QTimer, QObject, QProcess, Slot
-from PySide6.QtGui import QAction, QPixmap, QIcon
+                               QStackedWidget, QSystemTrayIcon, QMenu, QApplication, QFileDialog)
+from PySide6.QtCore import Qt, QPoint, QEvent, QTimer, QProcess, Slot
+from PySide6.QtGui import QAction, QPixmap, QIcon, QKeySequence, QShortcut, QCursor
 from main_window.title_bar import CustomTitleBar
 from main_window.side_bar import SideBar
 from utils.icon_utils import get_icon_path
-from constants import LOGO_FILE, SETTINGS_FILE, UI_CONFIGS_FILE
-from ruamel.yaml import YAML, YAMLError
+from utils.plan_reference_utils import PlanReferenceIndex
+from utils.encounter_store import EncounterRecorder, EncounterStore, plan_map_key
+from utils.config_utils import create_yaml_manager
+from utils.stall_monitor import StallMonitor
+from utils.session_replay import SessionReplayer
+from utils.session_recorder import SESSION_SUFFIX
+from utils.log_archive import LogArchive
+from utils import startup_profiler, tracing
+from constants import LOGO_FILE, SETTINGS_FILE, UI_CONFIGS_FILE, DIAGNOSTICS_DIR, SESSIONS_DIR, LOGS_DIR, AUTOWSGR_STUB_ENV
+from ruamel.yaml import YAMLError
 from pathlib import Path
 # 各选项卡
 from tabs.settings_tab import SettingsTab
@@ -16,6 +26,9 @@ from tabs.logs_tab import LogTab
 from tabs.decisive_battle_tab import DecisiveBattleTab
 from tabs.event_tab import EventTab
 from tabs.plan_editor_tab import PlanEditorTab
+from tabs.components.app_event_dispatcher import get_event_dispatcher
+from tabs.components.stall_report_dialog import StallReportDialog
+from tabs.components.log_archive_dialog import LogArchiveDialog
 
 class MainWindow(QMainWindow):
     # 定义不同边缘和角落的常量
@@ -58,6 +71,8 @@ class MainWindow(QMainWindow):
         self._is_resizing = False   # 是否在缩放
         self.current_resize_pos = 0 # 当前正在缩放的边缘/角落
         self._initial_geometry = None # 缩放时的初始几何信息
+        self._low_power = False # 窗口不可见时暂停渲染、定时器与动画
+        self._hidden_to_tray = False
 
         # 任务管理
         self.task_tabs = {}  # 用于存储所有任务选项卡的字典
@@ -104,32 +119,40 @@ class MainWindow(QMainWindow):
         root_layout.addWidget(content_area) # 添加到根布局中
 
         # 初始化YAML管理器
-        self.yaml_manager = YAML()
-        self.yaml_manager.preserve_quotes = True
-        self.yaml_manager.default_flow_style = False
-        self.yaml_manager.indent(mapping=2, sequence=4, offset=2)
-        self.yaml_manager.boolean_representation = ['False', 'True']
+        self.yaml_manager = create_yaml_manager()
         self.settings_data = self._load_yaml_file(SETTINGS_FILE)
         self.ui_configs_data = self._load_yaml_file(UI_CONFIGS_FILE)
 
         # 初始化页面实例
-        self.log_tab = LogTab(self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
-        self.settings_tab = SettingsTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
+        with startup_profiler.phase("LogTab"):
+            self.log_tab = LogTab(self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
+        with startup_profiler.phase("SettingsTab"):
+            self.settings_tab = SettingsTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
 
         CUSTOM_SHIP_NAME_FILE = Path(self.settings_data.get('ship_name_file', [])) # 在settings_tab更新船名文件路径后再导入
         self.custom_ship_name = self._load_yaml_file(CUSTOM_SHIP_NAME_FILE)
 
-        self.daily_tab = DailyTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
+        with startup_profiler.phase("DailyTab"):
+            self.daily_tab = DailyTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
         self.task_tabs["日常"] = self.daily_tab
-        self.decisive_battle_tab = DecisiveBattleTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.custom_ship_name, CUSTOM_SHIP_NAME_FILE, self.yaml_manager, self)
+        with startup_profiler.phase("DecisiveBattleTab"):
+            self.decisive_battle_tab = DecisiveBattleTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.custom_ship_name, CUSTOM_SHIP_NAME_FILE, self.yaml_manager, self)
         self.task_tabs["决战"] = self.decisive_battle_tab
-        self.event_tab = EventTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
+        with startup_profiler.phase("EventTab"):
+            self.event_tab = EventTab(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager, self)
         self.task_tabs["活动"] = self.event_tab
-        self.plan_editor_tab = PlanEditorTab(self.custom_ship_name, CUSTOM_SHIP_NAME_FILE, self.yaml_manager, self)
+        self.plan_reference_index = PlanReferenceIndex(self.settings_data, SETTINGS_FILE, self.ui_configs_data, UI_CONFIGS_FILE, self.yaml_manager)
+        with startup_profiler.phase("PlanEditorTab"):
+            self.plan_editor_tab = PlanEditorTab(self.custom_ship_name, CUSTOM_SHIP_NAME_FILE, self.yaml_manager, self,
+                                                 reference_index=self.plan_reference_index)
+        # 从任务日志中记录敌方遭遇，供规则编辑器计算命中率
+        self.encounter_recorder = EncounterRecorder(resolve_map=self._plan_map_key)
 
         # 填充内容
-        self.populate_content()
-        self.init_tray_icon() # 初始化托盘图标
+        with startup_profiler.phase("populate content"):
+            self.populate_content()
+        with startup_profiler.phase("tray init"):
+            self.init_tray_icon() # 初始化托盘图标
 
         # 选择管理器
         self.log_tab.task_selector_combo.blockSignals(True)
@@ -164,13 +187,48 @@ class MainWindow(QMainWindow):
             tab_instance.task_started.connect(self._on_any_task_started)
             tab_instance.task_finished.connect(self._on_any_task_finished)
             tab_instance.log_message_signal.connect(self.log_tab.append_log_message)
+        # 使用替身包时任务输出是模拟的，不写入遭遇记录与日志归档，以免污染真实数据
+        using_stub = os.environ.get(AUTOWSGR_STUB_ENV, '') not in ('', '0')
+        if not using_stub:
+            for tab_instance in self.task_tabs.values():
+                tab_instance.log_message_signal.connect(self.encounter_recorder.feed)
+        # 任务日志写入磁盘归档，清空日志框或退出后仍可在历史日志中查看
+        self.log_archive = LogArchive(LOGS_DIR)
+        if self.ui_configs_data.get('log_archive', True) and not using_stub:
+            self.log_archive.start()
+        for task_name, tab_instance in self.task_tabs.items():
+            tab_instance.log_message_signal.connect(
+                lambda text, name=task_name: self.log_archive.append(name, text))
+        self.log_archive_dialog = None
+        self.log_tab.log_archive_requested.connect(self._show_log_archive)
+        # 任务会话录制
+        self.log_tab.record_session_checkbox.toggled.connect(self._set_session_recording)
+        self._set_session_recording(self.log_tab.record_session_checkbox.isChecked())
+        self.session_replayer = None
+        self.replay_encounter_recorder = None
 
         # 连接刷新下拉框
         self.settings_tab.plan_root_changed.connect(self.daily_tab.refresh_task_plans)
         self.settings_tab.plan_root_changed.connect(self.event_tab.refresh_task_plans)
+        self.plan_editor_tab.plan_references_changed.connect(self._on_plan_references_changed)
         
         # 启用追踪
-        QApplication.instance().installEventFilter(self)
+        get_event_dispatcher().add_move_listener(self, self._on_app_mouse_move)
+
+        # 界面卡顿监视
+        self.stall_monitor = StallMonitor(DIAGNOSTICS_DIR / 'stall_report.txt', parent=self)
+        if self.ui_configs_data.get('stall_monitor', True):
+            self.stall_monitor.start()
+        self._stall_monitor_paused = False # 低功耗模式下暂停，恢复时重新启动
+        self.stall_report_dialog = None
+        # 隐藏的诊断菜单：Ctrl+Alt+D 或右键点击标题栏图标打开
+        self.diagnostics_menu = self._create_diagnostics_menu()
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Alt+D"), self)
+        self.diagnostics_shortcut.activated.connect(lambda: self._show_diagnostics_menu(QCursor.pos()))
+        self.title_bar.logo_label.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.title_bar.logo_label.customContextMenuRequested.connect(
+            lambda pos: self._show_diagnostics_menu(self.title_bar.logo_label.mapToGlobal(pos)))
+        QApplication.instance().aboutToQuit.connect(self._on_about_to_quit)
 
     @Slot(int)
     def _on_sidebar_index_changed(self, new_index):
@@ -189,8 +247,18 @@ class MainWindow(QMainWindow):
                 self.side_bar.on_button_clicked(current_index)
                 return
         # 允许切换
+        if self.stacked_widget.widget(new_index) == self.plan_editor_tab:
+            # 任务与预设只会在其他页面被修改，进入编辑页时重建引用索引
+            self.plan_reference_index.invalidate()
         self.stacked_widget.setCurrentIndex(new_index)
 
+    @Slot()
+    def _on_plan_references_changed(self):
+        """计划被重命名或删除后，刷新引用它的各任务页面"""
+        self.plan_reference_index.invalidate()
+        self.daily_tab.reload_plan_references()
+        self.event_tab.reload_plan_selection()
+
     def populate_content(self):
         """根据PAGES_CONFIG创建选项卡"""
         pages_config = [{"id": "overview", "title": "总览", "icon": "overview",
@@ -225,7 +293,7 @@ class MainWindow(QMainWindow):
         # 为托盘图标创建右键菜单
         tray_menu = QMenu(self)
         restore_action = QAction("打开主界面", self)
-        restore_action.triggered.connect(self.showNormal)
+        restore_action.triggered.connect(self.restore_from_tray)
         quit_action = QAction("退出应用", self)
         quit_action.triggered.connect(QApplication.instance().quit)
         tray_menu.addAction(restore_action)
@@ -237,16 +305,45 @@ class MainWindow(QMainWindow):
 
     def minimize_to_tray(self):
         """隐藏主窗口，并显示系统托盘图标"""
+        self._hidden_to_tray = True
+        self._set_low_power_mode(True)
         self.hide()
         self.tray_icon.show()
 
+    def restore_from_tray(self):
+        """从托盘恢复主窗口"""
+        self._hidden_to_tray = False
+        self._set_low_power_mode(False)
+        self.showNormal()
+        self.activateWindow()
+        self.tray_icon.hide()
+
     def on_tray_icon_activated(self, reason):
         """处理托盘图标点击的槽函数"""
         # 如果是单击或双击，则恢复窗口
         if reason == QSystemTrayIcon.ActivationReason.Trigger or reason == QSystemTrayIcon.ActivationReason.DoubleClick:
-            self.showNormal()
-            self.activateWindow()
-            self.tray_icon.hide()
+            self.restore_from_tray()
+
+    def _set_low_power_mode(self, enabled: bool):
+        """
+        窗口隐藏到托盘或最小化时进入低功耗模式：日志只写入缓冲区，标题栏动画暂停，
+        侧边栏动画直接结束，卡顿监视的心跳与看门狗停止，并关闭重绘以丢弃积压的更新；恢复时整体重绘一次。
+        """
+        if enabled == self._low_power:
+            return
+        self._low_power = enabled
+        self.log_tab.set_low_power(enabled)
+        self.title_bar.set_animation_paused(enabled)
+        if enabled:
+            self.side_bar.finish_animations()
+            self._cursor_update_timer.stop()
+            self._stall_monitor_paused = self.stall_monitor.is_running()
+            self.stall_monitor.stop()
+        elif self._stall_monitor_paused:
+            # start() 重置心跳时间，隐藏期间的空档不会被记为卡顿
+            self._stall_monitor_paused = False
+            self.stall_monitor.start()
+        self.main_frame.setUpdatesEnabled(not enabled)
 
     def maximize_restore(self):
         """根据是否已保存正常窗口几何信息最大化和还原窗口"""
@@ -269,6 +366,8 @@ class MainWindow(QMainWindow):
         if event.type() == QEvent.Type.WindowStateChange:
             # 无论窗口状态如何变化图标的状态都只取决于 normal_geometry 标志
             self.title_bar.update_restore_icon(self.normal_geometry is not None)
+            if not self._hidden_to_tray:
+                self._set_low_power_mode(self.isMinimized())
             
         super().changeEvent(event)
 
@@ -472,34 +571,152 @@ class MainWindow(QMainWindow):
         self.tray_icon.hide()
         super().closeEvent(event)
 
+    def _create_diagnostics_menu(self):
+        """创建隐藏的诊断菜单"""
+        menu = QMenu(self)
+        menu.addAction("界面卡顿报告...", self._show_stall_report)
+        menu.addSeparator()
+        self.trace_toggle_action = menu.addAction("记录操作追踪")
+        self.trace_toggle_action.setCheckable(True)
+        self.trace_toggle_action.toggled.connect(self._on_trace_toggled)
+        self.trace_export_action = menu.addAction("导出追踪文件...", self._export_trace)
+        self.trace_clear_action = menu.addAction("清空追踪记录", tracing.clear)
+        menu.addSeparator()
+        replay_menu = menu.addMenu("回放任务会话")
+        for label, speed in (("原速", 1.0), ("10 倍速", 10.0), ("不限速", 0.0)):
+            replay_menu.addAction(f"{label}回放...", lambda checked=False, s=speed: self._replay_session(s))
+        self.replay_stop_action = menu.addAction("停止回放", self._stop_session_replay)
+        return menu
+
+    def _show_diagnostics_menu(self, global_pos):
+        self.trace_toggle_action.blockSignals(True)
+        self.trace_toggle_action.setChecked(tracing.is_enabled())
+        self.trace_toggle_action.blockSignals(False)
+        self.trace_export_action.setText(f"导出追踪文件（{tracing.event_count()} 条记录）...")
+        self.trace_export_action.setEnabled(tracing.event_count() > 0)
+        self.replay_stop_action.setEnabled(self.session_replayer is not None and self.session_replayer.is_running())
+        self.diagnostics_menu.popup(global_pos)
+
+    def _on_trace_toggled(self, checked):
+        if checked:
+            tracing.enable()
+            self.log_tab.append_log_message("已开始记录操作追踪，复现问题后可从诊断菜单导出追踪文件。")
+        else:
+            tracing.disable()
+
+    def _export_trace(self):
+        """把追踪缓冲区导出为 Chrome Trace / Perfetto JSON"""
+        default_path = DIAGNOSTICS_DIR / f"trace_{datetime.now():%Y%m%d_%H%M%S}.json"
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出追踪文件", str(default_path), "Trace JSON (*.json)")
+        if not file_path:
+            return
+        try:
+            tracing.dump(file_path)
+        except OSError as e:
+            self.log_tab.append_log_message(f"导出追踪文件失败: {e}")
+            return
+        self.log_tab.append_log_message(f"追踪文件已导出: {file_path}（可在 https://ui.perfetto.dev 或 chrome://tracing 中打开）")
+
+    def _set_session_recording(self, enabled: bool):
+        for tab_instance in self.task_tabs.values():
+            tab_instance.session_dir = SESSIONS_DIR if enabled else None
+
+    def _replay_session(self, speed: float):
+        """
+        把录制的任务会话按倍速送入日志页与遭遇解析器。
+        遭遇写入诊断目录下单独的记录库，不影响规则编辑器使用的真实统计。
+        """
+        if self.running_task_tab is not None or (self.session_replayer and self.session_replayer.is_running()):
+            self.log_tab.append_log_message("有任务或回放正在运行，无法开始回放。")
+            return
+        file_path, _ = QFileDialog.getOpenFileName(self, "选择会话录制文件", str(SESSIONS_DIR),
+                                                   f"会话录制 (*{SESSION_SUFFIX})")
+        if not file_path:
+            return
+        try:
+            replayer = SessionReplayer(file_path, speed, self)
+        except (OSError, ValueError, EOFError) as e:
+            self.log_tab.append_log_message(f"无法读取会话录制文件: {e}")
+            return
+        if self.session_replayer is not None:
+            self.session_replayer.deleteLater()
+        self.session_replayer = replayer
+        self.replay_encounter_recorder = EncounterRecorder(EncounterStore(DIAGNOSTICS_DIR / 'replay_encounters'),
+                                                           resolve_map=self._plan_map_key)
+        replayer.output_ready.connect(self.log_tab.append_log_message)
+        replayer.output_ready.connect(self.replay_encounter_recorder.feed)
+        replayer.finished.connect(self._on_session_replay_finished)
+        metadata = replayer.reader.metadata
+        self.log_tab.append_log_message(
+            f"------------ 回放会话: {metadata.get('task', '')} {metadata.get('started', '')}"
+            f"（{'不限速' if speed == 0 else f'{speed:g} 倍速'}）------------")
+        replayer.start()
+
+    def _stop_session_replay(self):
+        if self.session_replayer is not None:
+            self.session_replayer.stop()
+
+    def _on_session_replay_finished(self, summary: dict):
+        self.replay_encounter_recorder.finish()
+        exit_event = summary['exit'] or {}
+        state = "已停止" if summary['stopped'] else "已结束"
+        if summary['truncated']:
+            state += "（录制文件不完整）"
+        self.log_tab.append_log_message(
+            f"------------ 回放{state}: {summary['records']} 条记录，{summary['bytes']} 字节，"
+            f"录制时长 {summary['recorded_ms'] / 1000:.1f} 秒，回放耗时 {summary['elapsed_ms'] / 1000:.1f} 秒，"
+            f"退出代码 {exit_event.get('exit_code', '未知')} ------------")
+
+    def _show_log_archive(self):
+        """打开历史日志浏览窗口"""
+        if self.log_archive_dialog is None:
+            self.log_archive_dialog = LogArchiveDialog(LOGS_DIR, self)
+        else:
+            self.log_archive_dialog.refresh_tasks()
+        self.log_archive_dialog.show()
+        self.log_archive_dialog.raise_()
+
+    def _show_stall_report(self):
+        """打开界面卡顿诊断面板"""
+        if self.stall_report_dialog is None:
+            self.stall_report_dialog = StallReportDialog(self.stall_monitor, self)
+        self.stall_report_dialog.refresh()
+        self.stall_report_dialog.show()
+        self.stall_report_dialog.raise_()
+
+    def _on_about_to_quit(self):
+        """退出前停止卡顿监视并写完日志归档，有卡顿记录时写出报告"""
+        self.stall_monitor.stop()
+        self.log_archive.close()
+        if self.stall_monitor.stall_count:
+            self.stall_monitor.write_report()
+
     def _load_yaml_file(self, file_path):
         """加载单个YAML文件并返回其数据"""
         config_data = {} # 默认返回空字典
-        try:
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    config_data = self.yaml_manager.load(f)
-            else:
-                print(f"提示: 配置文件 {file_path} 不存在，将使用默认值。")
-        except YAMLError as e:
-            print(f"错误: 加载 YAML 配置文件 {file_path} 时发生格式错误: {e}")
-        except Exception as e:
-            print(f"错误: 处理配置文件 {file_path} 时发生未知错误: {e}")
+        with startup_profiler.phase(f"load {Path(file_path).name}"):
+            try:
+                if file_path.exists():
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        config_data = self.yaml_manager.load(f)
+                else:
+                    print(f"提示: 配置文件 {file_path} 不存在，将使用默认值。")
+            except YAMLError as e:
+                print(f"错误: 加载 YAML 配置文件 {file_path} 时发生格式错误: {e}")
+            except Exception as e:
+                print(f"错误: 处理配置文件 {file_path} 时发生未知错误: {e}")
         return config_data
 
-    def eventFilter(self, watched: 'QObject', event: 'QEvent') -> bool:
-        """事件过滤器用于全局捕获鼠标移动事件"""
-        if event.type() == QEvent.Type.MouseMove:
-            # 检查鼠标是否在当前窗口的几何范围内
-            if self.geometry().contains(event.globalPosition().toPoint()):
-                # 将全局坐标转换为相对于本窗口的局部坐标
-                local_pos = self.mapFromGlobal(event.globalPosition().toPoint())
-                # 调用光标更新逻辑
-                self._last_mouse_pos = local_pos
-                if not self._cursor_update_timer.isActive():
-                    self._cursor_update_timer.start()
-
-        return super().eventFilter(watched, event)
+    def _on_app_mouse_move(self, event):
+        """由全局分发器调用，捕获应用内的鼠标移动事件"""
+        # 检查鼠标是否在当前窗口的几何范围内
+        if self.geometry().contains(event.globalPosition().toPoint()):
+            # 将全局坐标转换为相对于本窗口的局部坐标
+            local_pos = self.mapFromGlobal(event.globalPosition().toPoint())
+            # 调用光标更新逻辑
+            self._last_mouse_pos = local_pos
+            if not self._cursor_update_timer.isActive():
+                self._cursor_update_timer.start()
     
 
 # =================== 进程管理 ====================
@@ -572,16 +789,23 @@ class MainWindow(QMainWindow):
         if not self.running_task_tab: return
 
         self.title_bar.start_task_animation(running_task_name)
+        if self._low_power:
+            self.title_bar.set_animation_paused(True)
         self.log_tab.update_for_task_state(True, running_task_name)
 
         for task_name, tab_instance in self.task_tabs.items():
             if tab_instance is not self.running_task_tab:
                 tab_instance.set_button_enabled(False)
 
+    def _plan_map_key(self, plan_name):
+        """任务日志中的常规战计划名对应的地图，供遭遇记录使用"""
+        return plan_map_key(self.settings_data.get('plan_root'), plan_name)
+
     @Slot(str)
     def _on_any_task_finished(self, finished_task_name: str, is_error: bool = False):
         """当任何一个任务结束时，此槽函数被调用，负责重置全局UI状态并处理重启"""
         self.running_task_tab = None
+        self.encounter_recorder.finish()
         self.title_bar.stop_task_animation()
         self.log_tab.update_for_task_state(False)
         self._set_all_task_buttons_enabled(True)
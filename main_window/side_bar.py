@@ -37,6 +37,11 @@ class SideBar(QWidget):
         # 发送被点击按钮的索引信号
         self.index_changed.emit(index)
 
+    def finish_animations(self):
+        """结束所有按钮的动画，用于窗口隐藏时"""
+        for btn in self._buttons:
+            btn.finish_animation()
+
     def set_initial_checked(self, index: int):
         """设置初始选中的按钮"""
         if 0 <= index < len(self._buttons):
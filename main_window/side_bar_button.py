@@ -118,6 +118,20 @@ class SideBarButton(QWidget):
         # 启动并行动画组
         self.animation_group.start()
         
+    def finish_animation(self):
+        """停止进行中的动画并直接跳到最终状态，用于窗口隐藏时"""
+        self._is_hover = False
+        self.animation_group.stop()
+        self.height_animation.stop()
+        if self._is_active:
+            return
+        # 隐藏期间收不到离开事件，悬浮展开的按钮也一并收起
+        self.text_label.setStyleSheet(self.style_text_normal)
+        self.icon_label.setPixmap(self.normal_pixmap)
+        self.opacity_effect.setOpacity(0.0)
+        self.setMaximumHeight(self.collapsed_height)
+        self.text_label.hide()
+
     def _on_animation_finished(self):
         """动画组完成后的回调"""
         # 只有在完全收起的状态下才隐藏文字标签
@@ -124,6 +124,13 @@ class CustomTitleBar(QWidget):
         self.status_label.setVisible(True)
         self._animation_timer.start()
 
+    def set_animation_paused(self, paused: bool):
+        """窗口隐藏时暂停运行指示动画，恢复显示时若任务仍在运行则继续"""
+        if paused:
+            self._animation_timer.stop()
+        elif self._base_status_text and not self._animation_timer.isActive():
+            self._animation_timer.start()
+
     def stop_task_animation(self):
         """停止任务运行动画"""
         self._animation_timer.stop()
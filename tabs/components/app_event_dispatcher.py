@@ -0,0 +1,113 @@
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, QEvent
+
+# 应用级唯一的事件过滤器：替代各控件分别安装在 QApplication 上的全局过滤器。
+# 鼠标按下事件依次交给已打开的弹窗与处于激活状态的点击监听者，鼠标移动事件只交给移动监听者；
+# 没有弹窗、也没有激活的点击监听者时，每个事件只做一次类型判断即返回。
+
+_PRESS = QEvent.Type.MouseButtonPress
+_MOVE = QEvent.Type.MouseMove
+
+def _is_inside(widget, container) -> bool:
+    return widget is not None and (widget == container or container.isAncestorOf(widget))
+
+class AppEventDispatcher(QObject):
+    """
+    弹窗: open_popup(popup, owner, close_callback)，点击弹窗外部时调用 close_callback，
+          点击 owner 本身时还会消费该事件，避免 owner 立即重新打开弹窗。
+    点击监听者: add_press_listener(widget, callback, armed)，仅在监听者激活、widget 可见且点击发生在
+          widget 所在窗口时调用 callback(event, clicked_widget)，返回 True 表示消费该事件。
+          长期存在的控件应只在需要处理外部点击时（如按钮处于二次确认状态）调用
+          set_press_listener_armed(widget, True) 激活，处理完毕后取消激活。
+    移动监听者: add_move_listener(widget, callback)，仅在 widget 可见时调用 callback(event)。
+    监听者随控件销毁自动移除。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._popups = []
+        self._press_listeners = {}
+        self._armed_presses = set()
+        self._move_listeners = {}
+        # 同一个鼠标事件会随传播多次经过过滤器，只处理第一次
+        self._last_press_key = None
+
+    # --- 注册 ---
+    def open_popup(self, popup, owner, close_callback):
+        self.close_popup(popup)
+        self._popups.append((popup, owner, close_callback))
+
+    def close_popup(self, popup):
+        self._popups = [entry for entry in self._popups if entry[0] is not popup]
+
+    def add_press_listener(self, widget, callback, armed: bool = True):
+        self._add_listener(self._press_listeners, widget, callback)
+        self.set_press_listener_armed(widget, armed)
+
+    def set_press_listener_armed(self, widget, armed: bool):
+        key = id(widget)
+        if armed and key in self._press_listeners:
+            self._armed_presses.add(key)
+        else:
+            self._armed_presses.discard(key)
+
+    def add_move_listener(self, widget, callback):
+        self._add_listener(self._move_listeners, widget, callback)
+
+    def _add_listener(self, listeners, widget, callback):
+        key = id(widget)
+        if key not in listeners:
+            widget.destroyed.connect(lambda: (listeners.pop(key, None), self._armed_presses.discard(key)))
+        listeners[key] = (widget, callback)
+
+    def remove_listeners(self, widget):
+        key = id(widget)
+        self._press_listeners.pop(key, None)
+        self._armed_presses.discard(key)
+        self._move_listeners.pop(key, None)
+
+    # --- 分发 ---
+    def eventFilter(self, watched, event):
+        event_type = event.type()
+        if event_type == _PRESS:
+            if not self._popups and not self._armed_presses:
+                return False
+            press_key = (event.timestamp(), event.button(), event.globalPosition().toPoint().toTuple())
+            if press_key == self._last_press_key:
+                return False
+            self._last_press_key = press_key
+            return self._dispatch_press(event)
+        if event_type == _MOVE and self._move_listeners and watched.isWindowType():
+            for widget, callback in list(self._move_listeners.values()):
+                if widget.isVisible():
+                    callback(event)
+        return False
+
+    def _dispatch_press(self, event) -> bool:
+        clicked_widget = QApplication.widgetAt(event.globalPosition().toPoint())
+        if self._popups:
+            popup, owner, close_callback = self._popups[-1]
+            if _is_inside(clicked_widget, popup):
+                return False
+            close_callback()
+            self.close_popup(popup)
+            if _is_inside(clicked_widget, owner):
+                return True
+        if clicked_widget is None:
+            return False
+        clicked_window = clicked_widget.window()
+        armed = [entry for key, entry in self._press_listeners.items() if key in self._armed_presses]
+        for widget, callback in armed:
+            if widget.isVisible() and widget.window() is clicked_window and callback(event, clicked_widget):
+                return True
+        return False
+
+_dispatcher = None
+
+def get_event_dispatcher() -> AppEventDispatcher:
+    """返回进程内唯一的分发器，首次调用时安装到 QApplication 上。"""
+    global _dispatcher
+    if _dispatcher is None:
+        app = QApplication.instance()
+        _dispatcher = AppEventDispatcher(app)
+        app.installEventFilter(_dispatcher)
+    return _dispatcher
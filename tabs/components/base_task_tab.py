@@ -1,8 +1,13 @@
+import os
 import sys
 import locale
 from PySide6.QtWidgets import QWidget, QPushButton
-from PySide6.QtCore import Signal, QProcess
-from constants import BASE_DIR
+from PySide6.QtCore import Signal, QProcess, QProcessEnvironment
+from constants import BASE_DIR, AUTOWSGR_STUB_ENV, AUTOWSGR_STUB_DIR
+from utils.style_utils import set_style_property
+from utils import tracing
+from utils.session_recorder import (SessionRecorder, session_file_name, decode_output,
+                                    STREAM_STDOUT, STREAM_STDERR)
 
 class BaseTaskTab(QWidget):
     """包含后台进程管理通用逻辑的标签页基类"""
@@ -18,6 +23,10 @@ class BaseTaskTab(QWidget):
         self.task_process = QProcess(self)
         self.log_encoding = locale.getpreferredencoding()
         self._is_manual_stop = False # 手动停止标志位
+        self._finish_run_span = None # 结束“任务运行”追踪区间的函数
+        self.session_dir = None # 不为 None 时把每次运行的输出录制到该目录
+        self.session_recorder = None
+        self._launch_args = None # 最近一次启动的 (模块, 参数)，写入录制文件的元数据
 
         # 连接通用的信号
         self.task_process.readyReadStandardOutput.connect(
@@ -44,8 +53,17 @@ class BaseTaskTab(QWidget):
         """子类可以重写此方法以提供脚本参数"""
         return []
 
+    def _use_stub_package(self):
+        """让任务进程优先导入 autowsgr 替身包，用于在没有模拟器的环境下测试"""
+        env = QProcessEnvironment.systemEnvironment()
+        python_path = [str(AUTOWSGR_STUB_DIR), env.value('PYTHONPATH')]
+        env.insert('PYTHONPATH', os.pathsep.join(path for path in python_path if path))
+        self.task_process.setProcessEnvironment(env)
+        self.log_message_signal.emit(f"使用 autowsgr 替身包: {AUTOWSGR_STUB_DIR}")
+
     # 通用逻辑方法
 
+    @tracing.traced("task toggle")
     def _on_task_toggle(self):
         """启动或中止后台脚本"""
         if self.task_process.state() == QProcess.ProcessState.Running:
@@ -59,6 +77,9 @@ class BaseTaskTab(QWidget):
             if args is None: # 如果获取参数失败，则不启动
                 return
             self.log_message_signal.emit(f"------------ 准备启动脚本: {module_path} ------------")
+            if os.environ.get(AUTOWSGR_STUB_ENV, '') not in ('', '0'):
+                self._use_stub_package()
+            self._launch_args = (module_path, [str(arg) for arg in args])
             self.task_process.start(sys.executable, ['-um', module_path, *args])
             
     def _on_task_started(self):
@@ -66,18 +87,40 @@ class BaseTaskTab(QWidget):
         button = self.get_start_button()
         task_name = button.objectName()
         button.setText(f"中止{task_name}")
-        button.setProperty("running", True)
-        button.style().polish(button)
+        set_style_property(button, "running", True)
         self.log_message_signal.emit(f"\n------------ {task_name}任务已启动 ------------\n")
+        self._finish_run_span = tracing.begin("task run", task=task_name)
+        if self.session_dir is not None:
+            self._start_session_recording(task_name)
         self.task_started.emit(task_name)
 
+    def _start_session_recording(self, task_name: str):
+        module_path, args = self._launch_args or ('', [])
+        path = self.session_dir / session_file_name(task_name)
+        try:
+            self.session_recorder = SessionRecorder(path, {
+                'task': task_name, 'module': module_path, 'args': args, 'encoding': self.log_encoding})
+        except OSError as e:
+            self.session_recorder = None
+            self.log_message_signal.emit(f"无法创建会话录制文件: {e}")
+
+    def _finish_session_recording(self, **exit_fields):
+        recorder = self.session_recorder
+        self.session_recorder = None
+        try:
+            recorder.write_event('exit', **exit_fields)
+            recorder.close()
+        except OSError as e:
+            self.log_message_signal.emit(f"写入会话录制文件失败: {e}")
+            return
+        self.log_message_signal.emit(f"本次任务会话已录制到: {recorder.path}")
+
     def _on_task_finished(self, exit_code, exit_status):
         """后台脚本结束时的通用UI更新"""
         button = self.get_start_button()
         task_name = button.objectName()
         button.setText(f"启动{task_name}")
-        button.setProperty("running", False)
-        button.style().polish(button)
+        set_style_property(button, "running", False)
         # 判断是否为异常退出
         is_error = False
         if not self._is_manual_stop:
@@ -85,6 +128,12 @@ class BaseTaskTab(QWidget):
                 is_error = True
                 self.log_message_signal.emit(f"\n⚠任务异常退出 (代码: {exit_code})")
         self.log_message_signal.emit(f"\n------------ {task_name}任务已结束 ------------\n")
+        if self._finish_run_span is not None:
+            self._finish_run_span(exit_code=exit_code, manual_stop=self._is_manual_stop)
+            self._finish_run_span = None
+        if self.session_recorder is not None:
+            self._finish_session_recording(exit_code=exit_code, crashed=exit_status == QProcess.ExitStatus.CrashExit,
+                                           manual_stop=self._is_manual_stop)
         self.task_finished.emit(task_name, is_error)
         
     def _process_output_and_log(self, is_error=False):
@@ -93,7 +142,13 @@ class BaseTaskTab(QWidget):
             output_bytes = self.task_process.readAllStandardError()
         else:
             output_bytes = self.task_process.readAllStandardOutput()
-        
-        output_text = output_bytes.data().decode(self.log_encoding, errors='ignore').strip()
+        data = output_bytes.data()
+        if self.session_recorder is not None:
+            try:
+                self.session_recorder.write(STREAM_STDERR if is_error else STREAM_STDOUT, data)
+            except OSError as e:
+                self.session_recorder = None
+                self.log_message_signal.emit(f"写入会话录制文件失败，已停止录制: {e}")
+        output_text = decode_output(data, self.log_encoding)
         if output_text:
             self.log_message_signal.emit(output_text)
\ No newline at end of file
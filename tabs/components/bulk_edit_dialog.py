@@ -0,0 +1,191 @@
+import yaml
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QTextEdit, QPushButton
+)
+from PySide6.QtCore import Qt, QThread, Signal
+from tabs.components.combo_box import CustomComboBox
+from constants import KEY_ORDER_MAP
+from utils.plan_bulk_edit import preview_bulk_edit, apply_bulk_edit, format_diff
+
+OPERATION_TEXTS = {'设置': 'set', '删除': 'unset', '合并': 'merge'}
+ALL_TYPES_TEXT = "全部"
+
+class PlanBulkEditWorker(QThread):
+    """在后台线程中计算预览或写入修改。"""
+    preview_finished = Signal(dict)
+    apply_finished = Signal(list, list)
+    task_failed = Signal(str)
+
+    def __init__(self, plan_root, selector=None, operations=None, changes=None, parent=None):
+        super().__init__(parent)
+        self.plan_root = plan_root
+        self.selector = selector
+        self.operations = operations
+        self.changes = changes
+
+    def run(self):
+        try:
+            if self.changes is not None:
+                written, errors = apply_bulk_edit(self.changes)
+                self.apply_finished.emit(written, errors)
+            else:
+                self.preview_finished.emit(preview_bulk_edit(self.plan_root, self.selector, self.operations))
+        except Exception as e:
+            self.task_failed.emit(str(e))
+
+class PlanBulkEditDialog(QDialog):
+    """按地图/节点筛选计划并批量修改参数的对话框，写入前先显示 diff 预览。"""
+    def __init__(self, plan_root, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.FramelessWindowHint)
+        self.setObjectName('Dialog')
+        self.setWindowTitle("批量编辑计划")
+        self.setMinimumSize(760, 560)
+        self.plan_root = plan_root
+        self.worker = None
+        self._pending_changes = []
+        self._preview_generation = 0 # 条件每变化一次加一，丢弃按旧条件算出的预览
+        self.written_files = []
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        form_layout = QFormLayout()
+        self.type_combo = CustomComboBox()
+        self.type_combo.addItems([ALL_TYPES_TEXT] + list(KEY_ORDER_MAP.keys()))
+        self.map_input = QLineEdit()
+        self.map_input.setPlaceholderText("例如 9-* 或 H-5，留空表示全部")
+        self.node_input = QLineEdit()
+        self.node_input.setPlaceholderText("例如 A 或 [BC]，用于键路径中的 *")
+        self.op_combo = CustomComboBox()
+        self.op_combo.addItems(list(OPERATION_TEXTS.keys()))
+        self.path_input = QLineEdit()
+        self.path_input.setPlaceholderText("例如 node_args.*.night 或 repair_mode")
+        self.value_input = QLineEdit()
+        self.value_input.setPlaceholderText("YAML 格式，例如 True、[1, 2] 或 {formation: 2}")
+        form_layout.addRow("计划类型:", self.type_combo)
+        form_layout.addRow("地图:", self.map_input)
+        form_layout.addRow("节点:", self.node_input)
+        form_layout.addRow("操作:", self.op_combo)
+        form_layout.addRow("键路径:", self.path_input)
+        form_layout.addRow("值:", self.value_input)
+
+        self.status_label = QLabel("填写条件后点击预览")
+        self.diff_text = QTextEdit()
+        self.diff_text.setReadOnly(True)
+        self.diff_text.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        self.preview_button = QPushButton("预览")
+        self.preview_button.setProperty("class", "OkCancelButton")
+        self.apply_button = QPushButton("应用")
+        self.apply_button.setProperty("class", "OkCancelButton")
+        self.apply_button.setEnabled(False)
+        self.close_button = QPushButton("关闭")
+        self.close_button.setProperty("class", "OkCancelButton")
+        self.preview_button.clicked.connect(self._start_preview)
+        self.apply_button.clicked.connect(self._start_apply)
+        self.close_button.clicked.connect(self.accept)
+        # 条件变化后旧的预览不再有效
+        for line_edit in (self.map_input, self.node_input, self.path_input, self.value_input):
+            line_edit.textChanged.connect(self._invalidate_preview)
+        self.type_combo.currentIndexChanged.connect(self._invalidate_preview)
+        self.op_combo.currentIndexChanged.connect(self._invalidate_preview)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(self.preview_button)
+        button_layout.addWidget(self.apply_button)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(form_layout)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.diff_text, 1)
+        layout.addLayout(button_layout)
+
+    def _build_request(self):
+        """根据输入生成 (selector, operations)，输入无效时引发 ValueError。"""
+        plan_type = self.type_combo.currentText()
+        selector = {
+            'plan_type': None if plan_type == ALL_TYPES_TEXT else plan_type,
+            'map': self.map_input.text().strip() or None,
+            'node': self.node_input.text().strip() or None,
+        }
+        op = OPERATION_TEXTS[self.op_combo.currentText()]
+        operation = {'op': op, 'path': self.path_input.text().strip()}
+        if op != 'unset':
+            try:
+                operation['value'] = yaml.safe_load(self.value_input.text())
+            except yaml.YAMLError as e:
+                raise ValueError(f"值不是有效的 YAML: {e}")
+        return selector, [operation]
+
+    def _set_busy(self, is_busy):
+        self.preview_button.setEnabled(not is_busy)
+        self.apply_button.setEnabled(not is_busy and bool(self._pending_changes))
+
+    def _invalidate_preview(self):
+        self._preview_generation += 1
+        self._pending_changes = []
+        self.apply_button.setEnabled(False)
+
+    def _start_preview(self):
+        try:
+            selector, operations = self._build_request()
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        self._preview_generation += 1
+        generation = self._preview_generation
+        self._pending_changes = []
+        self._set_busy(True)
+        self.status_label.setText("正在计算预览...")
+        self.diff_text.clear()
+        self.worker = PlanBulkEditWorker(self.plan_root, selector, operations, parent=self)
+        self.worker.preview_finished.connect(lambda result: self._on_preview_finished(result, generation))
+        self.worker.task_failed.connect(self._on_task_failed)
+        self.worker.start()
+
+    def _on_preview_finished(self, result, generation):
+        if generation != self._preview_generation:
+            # 计算期间条件已被修改，预览对应的是旧条件，不能用于写入
+            self.status_label.setText("条件已修改，请重新预览")
+            self.diff_text.clear()
+            self._set_busy(False)
+            return
+        self._pending_changes = result['changes']
+        status = f"检查 {result['matched']} 个计划，{len(self._pending_changes)} 个将被修改"
+        if result['errors']:
+            status += f"，{len(result['errors'])} 个无法解析"
+        self.status_label.setText(status)
+        self.diff_text.setPlainText(format_diff(self._pending_changes, self.plan_root) or "没有需要修改的内容")
+        self._set_busy(False)
+
+    def _start_apply(self):
+        if not self._pending_changes:
+            return
+        self._set_busy(True)
+        self.apply_button.setEnabled(False)
+        self.status_label.setText("正在写入...")
+        self.worker = PlanBulkEditWorker(self.plan_root, changes=self._pending_changes, parent=self)
+        self.worker.apply_finished.connect(self._on_apply_finished)
+        self.worker.task_failed.connect(self._on_task_failed)
+        self.worker.start()
+
+    def _on_apply_finished(self, written, errors):
+        self.written_files.extend(written)
+        self._pending_changes = []
+        status = f"已写入 {len(written)} 个计划"
+        if errors:
+            status += f"，{len(errors)} 个失败"
+            self.diff_text.setPlainText("\n".join(f"{path}: {message}" for path, message in errors))
+        self.status_label.setText(status)
+        self._set_busy(False)
+
+    def _on_task_failed(self, message):
+        self.status_label.setText(f"操作失败: {message}")
+        self._set_busy(False)
+
+    def done(self, result):
+        # 等待后台线程结束，避免对话框销毁时线程仍在运行
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.wait()
+        super().done(result)
@@ -1,6 +1,8 @@
-from PySide6.QtWidgets import QPushButton, QListWidget, QListWidgetItem, QApplication, QAbstractItemView, QLabel, QHBoxLayout, QWidget
+from PySide6.QtWidgets import QPushButton, QListWidget, QListWidgetItem, QAbstractItemView, QLabel, QHBoxLayout
 from PySide6.QtCore import Qt, Signal, QSize, QPoint, QEvent
 from utils.icon_utils import get_icon_path, create_colored_pixmap
+from tabs.components.app_event_dispatcher import get_event_dispatcher
+from utils.style_utils import set_style_property
 
 class CustomComboBox(QPushButton):
     currentIndexChanged = Signal(int)
@@ -37,8 +39,6 @@ class CustomComboBox(QPushButton):
         # 信号连接
         self.clicked.connect(self._show_popup)
         self.list_widget.itemClicked.connect(self._on_item_selected)
-        # 全局事件过滤器，用于处理点击外部关闭弹窗的逻辑
-        self.global_event_filter = GlobalEventFilter(self, self.list_widget, self._hide_popup)
 
     # enterEvent 和 leaveEvent 用于手动处理内部变化
     def enterEvent(self, event):
@@ -46,14 +46,12 @@ class CustomComboBox(QPushButton):
         if not self.isEnabled():
             return
         self.icon_label.setPixmap(self.arrow_pixmap_hover)
-        self.text_label.setProperty("hovering", True)
-        self.text_label.style().polish(self.text_label)
+        set_style_property(self.text_label, "hovering", True)
 
     def leaveEvent(self, event):
         super().leaveEvent(event)
         # 只有在弹窗不可见时，离开才恢复正常图标
-        self.text_label.setProperty("hovering", False)
-        self.text_label.style().polish(self.text_label)
+        set_style_property(self.text_label, "hovering", False)
         # 如果按钮是禁用的，图标逻辑不执行
         if not self.isEnabled():
             return
@@ -71,8 +69,8 @@ class CustomComboBox(QPushButton):
             self._hide_popup() # 如果已打开，再次点击则关闭
             return
         self._popup_visible = True
-        self.setProperty("state", "on") # 用于QSS，例如让边框持续高亮
-        self.style().polish(self)
+        # 用于QSS，例如让边框持续高亮；文字颜色规则依赖该属性，需一并刷新
+        set_style_property(self, "state", "on", self.text_label)
         self.icon_label.setPixmap(self.arrow_pixmap_hover) # 打开时图标保持高亮
         # 弹窗定位和显示逻辑
         item_height = self.list_widget.sizeHintForRow(0) if self.count() > 0 else 30
@@ -85,23 +83,20 @@ class CustomComboBox(QPushButton):
         self.list_widget.show()
         if self._current_index >= 0:
             self.list_widget.scrollToItem(self.list_widget.item(self._current_index), QAbstractItemView.ScrollHint.PositionAtCenter)
-        # 安装全局事件过滤器
-        QApplication.instance().installEventFilter(self.global_event_filter)
+        # 由全局分发器处理点击外部关闭弹窗的逻辑
+        get_event_dispatcher().open_popup(self.list_widget, self, self._hide_popup)
 
     def _hide_popup(self):
         if not self._popup_visible:
             return
         self._popup_visible = False
         self.list_widget.hide()
-        self.setProperty("state", "off")
-        self.style().polish(self)
-        self.text_label.setProperty("hovering", False)
-        self.text_label.style().polish(self.text_label)
+        set_style_property(self, "state", "off", self.text_label)
+        set_style_property(self.text_label, "hovering", False)
         # 弹窗关闭后，如果鼠标不在按钮上，恢复图标
         if not self.underMouse():
             self.icon_label.setPixmap(self.arrow_pixmap_normal)
-        # 移除全局事件过滤器
-        QApplication.instance().removeEventFilter(self.global_event_filter)
+        get_event_dispatcher().close_popup(self.list_widget)
         
     def _on_item_selected(self, item: QListWidgetItem):
         row = self.list_widget.row(item)
@@ -163,37 +158,3 @@ class CustomComboBox(QPushButton):
     # 用于居中文本
     def get_icon_width(self):
         return self.icon_label.width()
-
-# 一个辅助类，用于处理点击外部关闭弹窗的逻辑
-class GlobalEventFilter(QWidget):
-    def __init__(self, button, popup, hide_callback):
-        super().__init__()
-        self.button = button
-        self.popup = popup
-        self.hide_callback = hide_callback
-    
-    def eventFilter(self, obj, event):
-        # 只关心鼠标按键按下的事件
-        if event.type() == QEvent.Type.MouseButtonPress:
-            widget_at_pos = QApplication.widgetAt(event.globalPosition().toPoint())
-            # 点击是否发生在内部
-            parent = widget_at_pos
-            while parent is not None:
-                if parent == self.popup:
-                    # 如果是则不处理，让列表自身响应点击
-                    return False
-                parent = parent.parent()
-            # 点击是否发生在父按钮
-            parent = widget_at_pos
-            while parent is not None:
-                if parent == self.button:
-                    # 是，则关闭弹窗并消费事件(return True)，防止按钮再次打开弹窗
-                    self.hide_callback()
-                    return True
-                parent = parent.parent()
-            # 点击发生在控件外部，关闭弹窗
-            self.hide_callback()
-            # 不消费事件，让窗口其他部分能响应点击
-            return False
-        # 对于其他类型的事件不进行处理
-        return False
\ No newline at end of file
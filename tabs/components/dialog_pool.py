@@ -0,0 +1,31 @@
+from shiboken6 import isValid
+from utils.tracing import span
+
+# 对话框池：每种编辑器对话框只保留一个隐藏的实例，打开时用新的初始数据重新绑定，
+# 避免每次点击都重新创建按钮网格、列表与表格。
+# 对话框类需要实现 rebind()，参数与构造函数中 parent 以外的参数相同，并在关闭时自行重置临时状态。
+
+_dialogs = {}
+
+def acquire_dialog(dialog_class, parent, *args, **kwargs):
+    """
+    取得 dialog_class 的共享实例并绑定初始数据。
+    实例挂在 parent 所在的顶层窗口上，与窗口同生命周期；窗口销毁后会重新创建。
+    共享实例正在使用时返回临时实例，关闭后回到外层事件循环时自动销毁，调用方在 exec() 返回后仍可读取结果
+    （不用 WA_DeleteOnClose：exec() 会在返回前直接删除设置了该属性的对话框）。
+    """
+    window = parent.window() if parent is not None else None
+    dialog = _dialogs.get(dialog_class)
+    if dialog is not None and isValid(dialog) and dialog.parentWidget() is window:
+        if not dialog.isVisible():
+            with span("dialog open", dialog=dialog_class.__name__, pooled=True):
+                dialog.rebind(*args, **kwargs)
+            return dialog
+        # 共享实例正在使用中（嵌套打开），临时创建一个新实例，关闭后销毁
+        with span("dialog open", dialog=dialog_class.__name__, pooled=False):
+            dialog = dialog_class(*args, parent=window, **kwargs)
+        dialog.finished.connect(dialog.deleteLater)
+        return dialog
+    with span("dialog open", dialog=dialog_class.__name__, pooled=False):
+        dialog = _dialogs[dialog_class] = dialog_class(*args, parent=window, **kwargs)
+    return dialog
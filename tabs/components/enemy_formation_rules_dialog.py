@@ -1,12 +1,13 @@
 from ruamel.yaml.comments import CommentedSeq
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QApplication,
+    QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
     QPushButton, QTableWidgetItem
 )
-from PySide6.QtCore import Qt, QEvent
+from PySide6.QtCore import Qt
 from utils.ui_utils import create_ok_cancel_buttons
 from tabs.components.combo_box import CustomComboBox
 from tabs.components.managed_list_widget import ManagedListWidget
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 from constants import ACTION_ITEMS, FORMATION_ITEMS
 
 class FormationEditorContentWidget(QWidget):
@@ -128,7 +129,7 @@ class FormationEditorContentWidget(QWidget):
                     rules.append(flow_rule)
         return rules
 
-    def process_app_event(self, watched, event: QEvent):
+    def process_mouse_press(self, event, clicked_widget):
         """将事件传递给 list_manager 以重置其删除按钮状态"""
         if hasattr(self, 'list_manager'):
             self.list_manager.process_global_event(event)
@@ -144,6 +145,8 @@ class EnemyFormationRulesDialog(QDialog):
         self.setMinimumSize(600, 400)
         self.content_widget = FormationEditorContentWidget(initial_rules, self)
         self._setup_shell_ui()
+        # 对话框由对话框池复用，只在显示期间接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
 
     def get_rules(self):
         return self.content_widget.get_rules()
@@ -160,14 +163,14 @@ class EnemyFormationRulesDialog(QDialog):
         button_layout.addWidget(confirm_button)
         shell_layout.addLayout(button_layout)
 
-    def exec(self):
-        QApplication.instance().installEventFilter(self)
-        result = super().exec()
-        QApplication.instance().removeEventFilter(self)
-        return result
-
-    def eventFilter(self, watched, event: QEvent):
-        """将事件传递给内容控件"""
-        if self.isActiveWindow():
-            return self.content_widget.process_app_event(watched, event)
-        return False
\ No newline at end of file
+    def showEvent(self, event):
+        super().showEvent(event)
+        get_event_dispatcher().set_press_listener_armed(self, True)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        get_event_dispatcher().set_press_listener_armed(self, False)
+
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器在对话框可见时调用，转发给内容控件"""
+        return self.content_widget.process_mouse_press(event, clicked_widget)
\ No newline at end of file
@@ -1,22 +1,23 @@
 from ruamel.yaml.comments import CommentedSeq
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QApplication,
+    QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
     QPushButton, QTableWidgetItem, QButtonGroup, QGridLayout
 )
-from PySide6.QtCore import Qt, Signal, QEvent, QSize
+from PySide6.QtCore import Qt, Signal, QSize
 from utils.ui_utils import create_ok_cancel_buttons
-from tabs.components.list_box import BaseSourceList, BaseTargetList
+from tabs.components.list_box import BaseSourceList, BaseTargetList, cached_text_width
 from tabs.components.combo_box import CustomComboBox
 from tabs.components.managed_list_widget import ManagedListWidget
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 from constants import ENEMY_SHIP_TYPES, SYMBOLS, QUANTITIES, LOGIC_OPS, ACTION_ITEMS, PARENS
-
-SYMBOLS_TEXT_TO_VALUE = {v: k for k, v in SYMBOLS.items()}
-LOGIC_OPS_TEXT_TO_VALUE = {v: k for k, v in LOGIC_OPS.items()}
-ENEMY_SHIP_TYPES_TEXT_TO_VALUE = {v: k for k, v in ENEMY_SHIP_TYPES.items()}
-
-LOGIC_OPS_VALUES = set(LOGIC_OPS.keys())
-SYMBOLS_VALUES = set(SYMBOLS.keys())
-ENEMY_SHIP_TYPES_VALUES = set(ENEMY_SHIP_TYPES.keys())
+from utils.enemy_rule_utils import (
+    SYMBOLS_TEXT_TO_VALUE, LOGIC_OPS_TEXT_TO_VALUE, ENEMY_SHIP_TYPES_TEXT_TO_VALUE,
+    LOGIC_OPS_VALUES, SYMBOLS_VALUES, ENEMY_SHIP_TYPES_VALUES, to_internal_value
+)
+from utils.enemy_rule_compiler import parse_tokens, RuleSyntaxError
+from utils.encounter_store import rule_coverage, condition_coverage
+from utils.enemy_rule_optimizer import analyze_rules, describe_findings, has_findings
+from utils.style_utils import set_style_property
 
 sorted_quantities = sorted(list(QUANTITIES), key=lambda x: int(x))
 sorted_ship_types = sorted(
@@ -61,24 +62,43 @@ class RulesTargetList(BaseTargetList):
         self.contentChanged.connect(self.syntax_changed)
 
     def _update_item_sizes(self):
-        fm = self.fontMetrics()
         horizontal_padding = 22
         fixed_height = 22
         for i in range(self.count()):
             item = self.item(i)
-            text_width = fm.boundingRect(item.text()).width()
+            text_width = cached_text_width(self, item.text())
             item.setSizeHint(QSize(text_width + horizontal_padding, fixed_height))
             item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
 
 class EditorContentWidget(QWidget):
-    def __init__(self, initial_rules, parent=None):
+    def __init__(self, initial_rules, parent=None, encounter_records=None):
         super().__init__(parent)
+        self.encounter_records = None
         self._setup_ui()
         self._connect_signals()
-        self._load_rules(initial_rules or [])
         self._update_source_block_list()
+        self.bind(initial_rules, encounter_records)
+
+    def bind(self, initial_rules, encounter_records=None):
+        """绑定要编辑的规则与历史遭遇记录（对话框复用时调用）"""
+        self.encounter_records = encounter_records
+        self.staging_list.clear()
+        self._load_rules(initial_rules or [])
+        self._clear_analysis()
         self._validate_staging_list()
 
+    def reset_state(self):
+        """关闭时清空暂存条件、选择与筛选，并释放遭遇记录"""
+        self.encounter_records = None
+        self.staging_list.clear()
+        self.action_combo.setCurrentIndex(0)
+        self.list_manager.clear_selection()
+        self.list_manager.confirm_delete_manager.reset_state()
+        all_button = next((btn for btn in self.block_type_group.buttons() if btn.text() == "全部"), None)
+        if all_button and not all_button.isChecked():
+            all_button.setChecked(True)
+            self._update_source_block_list()
+
     def _setup_ui(self):
         root_layout = QHBoxLayout(self)
         left_panel = self._create_left_panel()
@@ -146,6 +166,25 @@ class EditorContentWidget(QWidget):
         layout.addWidget(QLabel("已添加的规则 (从上到下执行):"))
         self.list_manager = ManagedListWidget(["规则: [条件, 操作]"])
         layout.addWidget(self.list_manager, 1)
+        self.coverage_label = QLabel()
+        self.coverage_label.setObjectName("DescriptionLabel")
+        self.coverage_label.setWordWrap(True)
+        layout.addWidget(self.coverage_label)
+        self.analysis_label = QLabel()
+        self.analysis_label.setObjectName("DescriptionLabel")
+        self.analysis_label.setWordWrap(True)
+        self.analysis_label.hide()
+        layout.addWidget(self.analysis_label)
+        self.analyze_button = QPushButton("分析规则")
+        self.analyze_button.setProperty("class", "TallButton")
+        self.apply_normalized_button = QPushButton("使用简化结果")
+        self.apply_normalized_button.setProperty("class", "TallButton")
+        self.apply_normalized_button.setEnabled(False)
+        analysis_button_layout = QHBoxLayout()
+        analysis_button_layout.addWidget(self.analyze_button)
+        analysis_button_layout.addWidget(self.apply_normalized_button)
+        layout.addLayout(analysis_button_layout)
+        self._normalized_rules = None
         
         return panel
 
@@ -155,6 +194,12 @@ class EditorContentWidget(QWidget):
         self.staging_list.syntax_changed.connect(self._validate_staging_list)
         self.add_rule_button.clicked.connect(self._on_add_rule)
         self.clear_stage_button.clicked.connect(self.staging_list.clear)
+        self.list_manager.item_moved.connect(self._update_coverage)
+        self.list_manager.item_removed.connect(self._update_coverage)
+        self.list_manager.item_moved.connect(self._clear_analysis)
+        self.list_manager.item_removed.connect(self._clear_analysis)
+        self.analyze_button.clicked.connect(self._on_analyze_rules)
+        self.apply_normalized_button.clicked.connect(self._on_apply_normalized)
 
     def _load_rules(self, rules: list):
         """加载初始规则到表格中"""
@@ -171,9 +216,10 @@ class EditorContentWidget(QWidget):
 
     def _update_source_block_list(self):
         """根据选中的块类型更新源块列表"""
-        self.source_block_list.clear()
         checked_button = self.block_type_group.checkedButton()
-        if not checked_button: return
+        if not checked_button:
+            self.source_block_list.clear()
+            return
         block_type = checked_button.text()
         
         items = []
@@ -181,7 +227,7 @@ class EditorContentWidget(QWidget):
             items = ALL_BLOCKS
         else:
             items = BLOCK_TYPES.get(block_type, [])
-        self.source_block_list.addItems(items)
+        self.source_block_list.set_items(items)
 
     def _get_block_type(self, block_text):
         """根据显示文本获取块类型"""
@@ -211,143 +257,20 @@ class EditorContentWidget(QWidget):
         if value in ENEMY_SHIP_TYPES_VALUES: return "TYPE"
         return "UNKNOWN"
     
-    def _is_valid_atomic(self, sub_tokens: list) -> bool:
-        """检查一个原子条件 (e.g., "BB + CL > 1") 是否有效。使用内部值进行验证。"""     
-        if not sub_tokens: return False
-        symbol_index = -1
-        symbol_count = 0
-        for i, token in enumerate(sub_tokens):
-            if token in SYMBOLS_VALUES:  # 使用内部值集合
-                if symbol_index == -1:
-                    symbol_index = i
-                symbol_count += 1
-        # 必须包含一个且只有一个比较符号
-        if symbol_count != 1: return False
-            
-        lhs_tokens = sub_tokens[:symbol_index]
-        rhs_tokens = sub_tokens[symbol_index + 1:]
-        # 必须是 1 个 QUANTITY
-        if not (len(rhs_tokens) == 1 and rhs_tokens[0] in QUANTITIES): return False
-        # 必须是 (TYPE) 或 (TYPE + TYPE ...)
-        if not lhs_tokens: return False
-        # 检查左侧第一个元素是否为类型
-        if lhs_tokens[0] not in ENEMY_SHIP_TYPES_VALUES: return False
-        # 检查左侧最后一个元素是否为逻辑运算符
-        if lhs_tokens[-1] in LOGIC_OPS_VALUES: return False
-        # 检查 LHS 的交替模式 (TYPE, LOGIC, TYPE, LOGIC...)
-        for i in range(1, len(lhs_tokens)):
-            token = lhs_tokens[i]
-            last_token = lhs_tokens[i-1]
-            # 如果上一个元素是类型，当前元素必须是逻辑运算符
-            if last_token in ENEMY_SHIP_TYPES_VALUES:
-                if token not in LOGIC_OPS_VALUES:return False
-            # 如果上一个元素是逻辑运算符，当前元素必须是类型
-            elif last_token in LOGIC_OPS_VALUES:
-                if token not in ENEMY_SHIP_TYPES_VALUES:return False
-            else: return False
-        return True
-    
-    def _compile_to_logical_tokens(self, items: list) -> (list | None):
-        """
-        将原始积木列表编译为逻辑标记列表
-        """
-        # 将显示文本转换为内部值
-        internal_items = []
-        for item in items:
-            if item in ENEMY_SHIP_TYPES_TEXT_TO_VALUE:
-                internal_items.append(ENEMY_SHIP_TYPES_TEXT_TO_VALUE[item])
-            elif item in SYMBOLS_TEXT_TO_VALUE:
-                internal_items.append(SYMBOLS_TEXT_TO_VALUE[item])
-            elif item in LOGIC_OPS_TEXT_TO_VALUE:
-                internal_items.append(LOGIC_OPS_TEXT_TO_VALUE[item])
-            else:
-                internal_items.append(item)
-        
-        # 使用内部值进行编译
-        delimiters = (LOGIC_OPS_VALUES - {'+'}) | PARENS
-        tokens = []
-        current_atom = []
-        
-        for item in internal_items:
-            if item in delimiters:
-                # 遇到了分隔符，先处理之前积累的原子块
-                if current_atom:
-                    if not self._is_valid_atomic(current_atom): return None
-                    tokens.append("ATOMIC")
-                    current_atom = []
-                # 添加分隔符本身
-                tokens.append(item)
-            else:
-                # 非分隔符，说明是原子块的一部分
-                current_atom.append(item)
-        # 处理循环结束后的最后一个原子块
-        if current_atom:
-            if not self._is_valid_atomic(current_atom): return None
-            tokens.append("ATOMIC")
-        return tokens
-
-    def _validate_logical_syntax(self, tokens: list) -> bool:
-        """
-        检查编译后的标记列表 ['(', 'ATOMIC', 'and', 'ATOMIC', ')']是否符合逻辑语法规则。
-        """
-        if not tokens: return False # 列表为空
-        # 检查括号平衡
-        paren_balance = 0
-        for token in tokens:
-            if token == "(": paren_balance += 1
-            elif token == ")": paren_balance -= 1
-            if paren_balance < 0: return False # e.g., ") ("
-        if paren_balance != 0: return False # e.g., "( ( ..."
-        # 检查标记的顺序是否合法
-        logic_ops = LOGIC_OPS_VALUES  - {'+'} # 'and', 'or'
-        last_token_type = "START"
-        for token in tokens:
-            current_token_type = "UNKNOWN"
-            if token == "ATOMIC": current_token_type = "ATOMIC"
-            elif token in logic_ops: current_token_type = "LOGIC"
-            elif token == "(": current_token_type = "LPAREN"
-            elif token == ")": current_token_type = "RPAREN"
-            if last_token_type == "START":
-                # 规则必须以 原子 或 ( 开头
-                if current_token_type not in {"ATOMIC", "LPAREN"}: return False
-            elif last_token_type == "ATOMIC":
-                # 原子 后面必须跟 逻辑(and/or) 或 )
-                if current_token_type not in {"LOGIC", "RPAREN"}: return False
-            elif last_token_type == "LOGIC":
-                # 逻辑(and/or) 后面必须跟 原子 或 (
-                if current_token_type not in {"ATOMIC", "LPAREN"}: return False
-            elif last_token_type == "LPAREN":
-                # ( 后面必须跟 原子 或 (
-                if current_token_type not in {"ATOMIC", "LPAREN"}: return False # 杜绝 "( )" 或 "( and ...)"
-            elif last_token_type == "RPAREN":
-                # ) 后面必须跟 逻辑(and/or) 或 )
-                if current_token_type not in {"LOGIC", "RPAREN"}: return False
-            last_token_type = current_token_type
-        # 规则必须以 原子 或 ) 结尾
-        if last_token_type not in {"ATOMIC", "RPAREN"}: return False
-        return True
-
     def _validate_staging_list(self) -> bool:
-        """
-        1. 将积木列表转为逻辑标记，并验证所有原子规则。
-        2. 验证逻辑标记的顺序。
-        """
+        """将积木列表转为内部值，并用规则编译器解析验证。"""
         items = [self.staging_list.item(i).text() for i in range(self.staging_list.count())]
         is_valid = False
         if items: # 仅在列表非空时验证
-            # 验证所有原子
-            logical_tokens = self._compile_to_logical_tokens(items)
-            if logical_tokens is not None:
-                # 验证逻辑结构
-                is_valid = self._validate_logical_syntax(logical_tokens)
+            try:
+                parse_tokens([to_internal_value(item) for item in items])
+                is_valid = True
+            except RuleSyntaxError:
+                is_valid = False
         # 设置 QSS
-        if is_valid:
-            self.staging_list.setProperty("class", "")
-        else:
-            self.staging_list.setProperty("class", "invalid")
-        self.staging_list.style().unpolish(self.staging_list)
-        self.staging_list.style().polish(self.staging_list)
+        set_style_property(self.staging_list, "class", "" if is_valid else "invalid")
         self.add_rule_button.setEnabled(is_valid)
+        self._update_coverage()
         return is_valid
 
     def _on_add_rule(self):
@@ -357,17 +280,7 @@ class EditorContentWidget(QWidget):
         
         items = [self.staging_list.item(i).text() for i in range(self.staging_list.count())]
         
-        condition_items = []
-        for item in items:
-            if item in ENEMY_SHIP_TYPES_TEXT_TO_VALUE:
-                condition_items.append(ENEMY_SHIP_TYPES_TEXT_TO_VALUE[item])
-            elif item in SYMBOLS_TEXT_TO_VALUE:
-                condition_items.append(SYMBOLS_TEXT_TO_VALUE[item])
-            elif item in LOGIC_OPS_TEXT_TO_VALUE:
-                condition_items.append(LOGIC_OPS_TEXT_TO_VALUE[item])
-            else:
-                condition_items.append(item)
-        
+        condition_items = [to_internal_value(item) for item in items]
         condition_str = " ".join(condition_items)
         
         # 直接从 userData 获取内部值
@@ -382,6 +295,77 @@ class EditorContentWidget(QWidget):
         item = QTableWidgetItem(rule_text)
         item.setData(Qt.UserRole, [condition, action_value])
         self.list_manager.add_table_row([item])
+        self._update_coverage()
+        self._clear_analysis()
+
+    def _update_coverage(self):
+        """用历史遭遇记录计算规则的命中比例，规则或暂存条件变化时调用。"""
+        if not hasattr(self, 'coverage_label'):
+            return
+        records = self.encounter_records
+        if records is None or not len(records):
+            self.coverage_label.setText("该节点暂无历史遭遇记录（日常任务以 DEBUG 日志级别并开启 show_map_node 运行时记录）")
+            return
+        rules = self.get_rules()
+        try:
+            coverage = rule_coverage(rules, records)
+        except RuleSyntaxError as e:
+            self.coverage_label.setText(f"无法计算命中率: {e}")
+            return
+        total = coverage['total']
+        by_action = coverage['by_action']
+        formation_hits = sum(count for action, count in by_action.items() if action not in ('retreat', 'detour'))
+        lines = [
+            f"历史遭遇 {total} 次：撤退 {by_action.get('retreat', 0) / total:.1%}，"
+            f"迂回 {by_action.get('detour', 0) / total:.1%}，改变阵型 {formation_hits / total:.1%}，"
+            f"不触发 {coverage['unmatched'] / total:.1%}"
+        ]
+        for row, hit_count in enumerate(coverage['per_rule']):
+            share_text = f"{hit_count / total:.1%}"
+            lines.append(f"规则 {row + 1}: {share_text}")
+            item = self.list_manager.get_item(row, 0)
+            if item:
+                item.setToolTip(f"在历史遭遇中作为首个命中规则的比例: {share_text}")
+        staging_items = [to_internal_value(self.staging_list.item(i).text()) for i in range(self.staging_list.count())]
+        if staging_items:
+            try:
+                lines.append(f"当前条件成立: {condition_coverage(staging_items, records):.1%}")
+            except RuleSyntaxError:
+                pass
+        self.coverage_label.setText("<br>".join(lines))
+
+    def _clear_analysis(self):
+        """规则列表变化后旧的分析结果失效。"""
+        self._normalized_rules = None
+        self.apply_normalized_button.setEnabled(False)
+        self.analysis_label.hide()
+
+    def _on_analyze_rules(self):
+        """在全部可能的敌方编成上分析规则，找出不会触发与可简化的规则。"""
+        try:
+            analysis = analyze_rules(self.get_rules())
+        except RuleSyntaxError as e:
+            self.analysis_label.setText(f"无法分析: {e}")
+            self.analysis_label.show()
+            return
+        if has_findings(analysis):
+            lines = describe_findings(analysis)
+            self._normalized_rules = analysis['normalized']
+            self.apply_normalized_button.setEnabled(analysis['is_equivalent'])
+        else:
+            lines = ["未发现冗余规则"]
+            self._normalized_rules = None
+            self.apply_normalized_button.setEnabled(False)
+        self.analysis_label.setText("<br>".join(lines))
+        self.analysis_label.show()
+
+    def _on_apply_normalized(self):
+        """用等价的精简规则替换当前规则列表。"""
+        if self._normalized_rules is None:
+            return
+        self._load_rules(self._normalized_rules)
+        self._clear_analysis()
+        self._update_coverage()
 
     def get_rules(self) -> list:
         """从右侧表格收集所有规则并返回"""
@@ -396,7 +380,7 @@ class EditorContentWidget(QWidget):
                     rules.append(flow_rule)
         return rules
 
-    def process_app_event(self, watched, event: QEvent):
+    def process_mouse_press(self, event, clicked_widget):
         """
         处理全局鼠标点击事件。
         将事件传递给 list_manager 以重置其删除按钮状态。
@@ -407,14 +391,24 @@ class EditorContentWidget(QWidget):
 
 class EnemyRulesDialog(QDialog):
     """敌方规则对话框的壳"""
-    def __init__(self, initial_rules: list, parent=None):
+    def __init__(self, initial_rules: list, parent=None, encounter_records=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.FramelessWindowHint)
         self.setObjectName('Dialog')
         self.setWindowTitle("敌方编队规则")
         self.setMinimumSize(800, 600)
-        self.content_widget = EditorContentWidget(initial_rules, self)
+        self.content_widget = EditorContentWidget(initial_rules, self, encounter_records)
         self._setup_shell_ui()
+        # 对话框由对话框池复用，只在显示期间接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
+
+    def rebind(self, initial_rules: list, encounter_records=None):
+        """由对话框池调用，用新的规则复用此对话框"""
+        self.content_widget.bind(initial_rules, encounter_records)
+
+    def done(self, result):
+        super().done(result)
+        self.content_widget.reset_state()
 
     def get_rules(self):
         return self.content_widget.get_rules()
@@ -429,13 +423,14 @@ class EnemyRulesDialog(QDialog):
         button_layout.addWidget(cancel_button); button_layout.addWidget(confirm_button)
         shell_layout.addLayout(button_layout)
 
-    def exec(self):
-        QApplication.instance().installEventFilter(self)
-        result = super().exec()
-        QApplication.instance().removeEventFilter(self)
-        return result
+    def showEvent(self, event):
+        super().showEvent(event)
+        get_event_dispatcher().set_press_listener_armed(self, True)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        get_event_dispatcher().set_press_listener_armed(self, False)
 
-    def eventFilter(self, watched, event: QEvent):
-        if self.isActiveWindow():
-            return self.content_widget.process_app_event(watched, event)
-        return False
\ No newline at end of file
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器在对话框可见时调用，转发给内容控件"""
+        return self.content_widget.process_mouse_press(event, clicked_widget)
\ No newline at end of file
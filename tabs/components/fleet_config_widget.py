@@ -1,11 +1,14 @@
 from PySide6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QGridLayout, QWidget,
-    QLabel, QPushButton, QLineEdit,QButtonGroup, QApplication
+    QLabel, QPushButton, QLineEdit,QButtonGroup
 )
 from PySide6.QtCore import Signal, QEvent
 from tabs.components.list_box import BaseSourceList, BaseTargetList
+from tabs.components.ship_search_box import ShipSearchBox
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 from utils.ui_utils import ConfirmButtonManager, natural_sort_key
-from utils.ship_data_utils import load_ship_data
+from utils.style_utils import set_style_property
+from utils.ship_data_utils import get_ship_catalog
 
 class ConfigSourceList(BaseSourceList):
     """配置界面的源列表"""
@@ -65,8 +68,8 @@ class FleetConfigWidget(QWidget):
     def __init__(self, initial_custom_ships=None, parent=None):
         """初始化控件，创建UI和数据，连接信号。"""
         super().__init__(parent)
-        submarine_types = ['潜艇', '炮潜', '导潜']
-        self.all_ships_data = load_ship_data(target_types=submarine_types, group_by_type=False)
+        self.ship_types = ('潜艇', '炮潜', '导潜')
+        self.ship_catalog = get_ship_catalog()
         self.custom_ships = initial_custom_ships if initial_custom_ships else []
         # UI控件创建
         self._create_widgets()
@@ -76,41 +79,42 @@ class FleetConfigWidget(QWidget):
         self._layout = self._setup_ui()
         self._connect_signals()
         self.custom_ship_input.installEventFilter(self)
+        # 只在源列表有选中项或删除按钮处于二次确认状态时接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
         self._update_source_list_filter()
 
     def get_layout(self):
         """返回主布局。"""
         return self._layout
 
-    def process_app_event(self, watched, event):
-        """处理由父控件转发来的全局事件。"""
-        if not self.isVisible():
-            return False
-
-        # 点击输入框时自动切换筛选
+    def eventFilter(self, watched, event):
+        """点击输入框时自动切换到自定义筛选。"""
         if watched == self.custom_ship_input and event.type() == QEvent.Type.FocusIn:
             for button in self.filter_button_group.buttons():
                 if button.text() == "自定义" and not button.isChecked():
                     button.click()
                     break
+        return super().eventFilter(watched, event)
 
-        # 处理全局鼠标点击事件
-        if event.type() == QEvent.Type.MouseButtonPress:
-            clicked_widget = QApplication.widgetAt(event.globalPosition().toPoint())
+    def _update_press_listener(self):
+        armed = bool(self.source_ships_list.selectedItems()) or self.remove_button_manager.is_confirming()
+        get_event_dispatcher().set_press_listener_armed(self, armed)
 
-            # 检查点击是否发生在删除按钮上
-            is_click_on_delete_button = self.remove_custom_ship_button.isAncestorOf(clicked_widget) or clicked_widget == self.remove_custom_ship_button
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器调用，处理可见时的全局鼠标点击事件。"""
+        # 检查点击是否发生在删除按钮上
+        is_click_on_delete_button = self.remove_custom_ship_button.isAncestorOf(clicked_widget) or clicked_widget == self.remove_custom_ship_button
 
-            # 检查点击是否发生在源列表上
-            is_click_on_source_list = self.source_ships_list.isAncestorOf(clicked_widget) or clicked_widget == self.source_ships_list
+        # 检查点击是否发生在源列表上
+        is_click_on_source_list = self.source_ships_list.isAncestorOf(clicked_widget) or clicked_widget == self.source_ships_list
 
-            # 全局单选逻辑：当点击发生在列表外部且不是删除按钮时，清空选择
-            if self.source_ships_list.selectedItems() and not is_click_on_source_list and not is_click_on_delete_button:
-                self.source_ships_list.clearSelection()
+        # 全局单选逻辑：当点击发生在列表外部且不是删除按钮时，清空选择
+        if self.source_ships_list.selectedItems() and not is_click_on_source_list and not is_click_on_delete_button:
+            self.source_ships_list.clearSelection()
 
-            # 二次确认按钮重置逻辑
-            if self.remove_button_manager.is_confirming() and not is_click_on_delete_button:
-                self.remove_button_manager.reset_state()
+        # 二次确认按钮重置逻辑
+        if self.remove_button_manager.is_confirming() and not is_click_on_delete_button:
+            self.remove_button_manager.reset_state()
 
         return False
 
@@ -128,6 +132,7 @@ class FleetConfigWidget(QWidget):
         self.all_ships_button = QPushButton("全部")
 
         self.source_ships_list = ConfigSourceList()
+        self.ship_search_box = ShipSearchBox()
 
         self.custom_ship_input = QLineEdit()
         self.add_custom_ship_button = QPushButton("添加")
@@ -202,7 +207,7 @@ class FleetConfigWidget(QWidget):
         self.all_ships_button.setProperty("class", "ShortButton")
         self.filter_button_group.addButton(self.all_ships_button)
         filter_buttons_layout.addWidget(self.all_ships_button, 0, 0, 1, 5)
-        other_buttons_data = list(self.all_ships_data.keys()) + ["自定义"]
+        other_buttons_data = list(self.ship_catalog.nations_for(self.ship_types)) + ["自定义"]
         max_cols = 5
         for i, text in enumerate(other_buttons_data):
             button = QPushButton(text)
@@ -214,7 +219,9 @@ class FleetConfigWidget(QWidget):
         main_layout.addLayout(filter_buttons_layout)
         main_layout.addSpacing(5)
 
-        # 源舰船列表
+        # 搜索框与源舰船列表
+        main_layout.addWidget(self.ship_search_box)
+        main_layout.addSpacing(5)
         main_layout.addWidget(self.source_ships_list, 1)
         main_layout.addSpacing(5)
 
@@ -234,9 +241,12 @@ class FleetConfigWidget(QWidget):
     def _connect_signals(self):
         """连接所有信号与槽函数。"""
         self.filter_button_group.buttonClicked.connect(self._update_source_list_filter)
+        self.ship_search_box.search_changed.connect(self._update_source_list_filter)
         self.add_custom_ship_button.clicked.connect(self._on_add_custom_ship)
         self.remove_button_manager.confirmed_click.connect(self._on_remove_custom_ship)
         self.source_ships_list.itemSelectionChanged.connect(self._update_remove_button_state)
+        self.source_ships_list.itemSelectionChanged.connect(self._update_press_listener)
+        self.remove_button_manager.confirming_changed.connect(self._update_press_listener)
         self.level1_list.contentChanged.connect(
             lambda: self.level1_fleet_changed.emit(self.get_list_data(self.level1_list))
         )
@@ -248,30 +258,27 @@ class FleetConfigWidget(QWidget):
         )
 
     def _update_source_list_filter(self):
-        """根据筛选按钮刷新可用舰船列表。"""
-        self.source_ships_list.clear()
+        """根据筛选按钮与搜索框刷新可用舰船列表。"""
+        self.ship_search_box.set_catalog_names(self.ship_catalog, self.custom_ships)
         checked_button = self.filter_button_group.checkedButton()
         if not checked_button:
+            self.source_ships_list.clear()
             return
         filter_category = checked_button.text()
 
         is_custom_mode = (filter_category == "自定义")
-        self.source_ships_list.setProperty("customMode", is_custom_mode)
-        self.source_ships_list.style().unpolish(self.source_ships_list)
-        self.source_ships_list.style().polish(self.source_ships_list)
+        set_style_property(self.source_ships_list, "customMode", is_custom_mode)
 
-        ships_to_display = []
+        unique_ships = []
         if filter_category == "全部":
-            for country_ships in self.all_ships_data.values(): # --- 修改: 迭代字典的值 ---
-                ships_to_display.extend(country_ships)
-            ships_to_display.extend(self.custom_ships)
+            unique_ships = self.ship_catalog.merge_with_custom(
+                self.ship_catalog.filter_names(None, self.ship_types), self.custom_ships)
         elif filter_category == "自定义":
-            ships_to_display.extend(self.custom_ships)
-        elif filter_category in self.all_ships_data:
-            ships_to_display.extend(self.all_ships_data[filter_category])
+            unique_ships = sorted(set(filter(None, self.custom_ships)), key=natural_sort_key)
+        elif filter_category in self.ship_catalog.nations_for(self.ship_types):
+            unique_ships = self.ship_catalog.filter_names(filter_category, self.ship_types)
 
-        unique_ships = sorted(list(set(filter(None, ships_to_display))), key=natural_sort_key)
-        self.source_ships_list.addItems(unique_ships)
+        self.source_ships_list.set_items(self.ship_search_box.filter_names(unique_ships))
         self._update_remove_button_state()
 
     def _on_add_custom_ship(self):
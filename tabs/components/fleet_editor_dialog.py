@@ -1,9 +1,12 @@
-from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QApplication,
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
                                QPushButton, QButtonGroup, QGridLayout, QLineEdit)
 from PySide6.QtCore import Qt, Signal, QEvent
-from utils.ship_data_utils import load_ship_data
+from utils.ship_data_utils import get_ship_catalog
 from utils.ui_utils import natural_sort_key, create_ok_cancel_buttons, ConfirmButtonManager
+from utils.style_utils import set_style_property
 from tabs.components.list_box import BaseSourceList, BaseTargetList
+from tabs.components.ship_search_box import ShipSearchBox
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 
 class EditorSourceList(BaseSourceList):
     """编辑器界面的源列表"""
@@ -103,48 +106,45 @@ class EditorContentWidget(QWidget):
 
     def __init__(self, initial_custom_ships, parent=None):
         super().__init__(parent)
-        self.all_ships_data = load_ship_data(group_by_type=True)
+        self.ship_catalog = get_ship_catalog()
         self.custom_ships = initial_custom_ships if initial_custom_ships else []
-        self._all_standard_ships = {ship for data in self.all_ships_data.values() for ships in data.values() for ship in ships}
         self.drop_zones = []
         self._setup_ui()
         self._connect_signals()
         self._update_source_list_filter()
 
-    def process_app_event(self, watched, event: QEvent):
-        """专门处理由父级对话框转发来的事件"""
+    def eventFilter(self, watched, event: QEvent):
+        """点击自定义船名输入框时自动切换到自定义筛选"""
         if event.type() == QEvent.Type.FocusIn and watched == self.custom_ship_input:
             custom_button = next((btn for btn in self.type_filter_group.buttons() if btn.text() == "自定义"), None)
             if custom_button and not custom_button.isChecked():
                 custom_button.click()
-            return False
+        return super().eventFilter(watched, event)
+
+    def process_mouse_press(self, event, clicked_widget):
+        """处理由对话框转发来的全局鼠标点击事件，以实现点击空白处取消选择和清除焦点的功能"""
+        is_on_input = clicked_widget and (self.custom_ship_input == clicked_widget)
+        # 如果输入框有焦点，但点击位置不在输入框上，则清除焦点
+        if self.custom_ship_input.hasFocus() and not is_on_input:
+            self.custom_ship_input.clearFocus()
+
+        # 处理删除确认按钮和源列表的点击逻辑
+        is_on_delete_btn = clicked_widget and (self.remove_custom_ship_button == clicked_widget or self.remove_custom_ship_button.isAncestorOf(clicked_widget))
+        is_on_source_list = clicked_widget and (self.source_ships_list == clicked_widget or self.source_ships_list.isAncestorOf(clicked_widget))
         
-        # 处理全局鼠标点击事件，以实现点击空白处取消选择和清除焦点的功能
-        if event.type() == QEvent.Type.MouseButtonPress:
-            clicked_widget = QApplication.widgetAt(event.globalPosition().toPoint())
-
-            is_on_input = clicked_widget and (self.custom_ship_input == clicked_widget)
-            # 如果输入框有焦点，但点击位置不在输入框上，则清除焦点
-            if self.custom_ship_input.hasFocus() and not is_on_input:
-                self.custom_ship_input.clearFocus()
+        if self.remove_button_manager.is_confirming() and not is_on_delete_btn:
+            self.remove_button_manager.reset_state()
+        
+        if self.source_ships_list.selectedItems() and not is_on_source_list and not is_on_delete_btn:
+            self.source_ships_list.clearSelection()
 
-            # 处理删除确认按钮和源列表的点击逻辑
-            is_on_delete_btn = clicked_widget and (self.remove_custom_ship_button == clicked_widget or self.remove_custom_ship_button.isAncestorOf(clicked_widget))
-            is_on_source_list = clicked_widget and (self.source_ships_list == clicked_widget or self.source_ships_list.isAncestorOf(clicked_widget))
-            
-            if self.remove_button_manager.is_confirming() and not is_on_delete_btn:
-                self.remove_button_manager.reset_state()
-            
-            if self.source_ships_list.selectedItems() and not is_on_source_list and not is_on_delete_btn:
+        if is_on_source_list:
+            item_at_click = self.source_ships_list.itemAt(self.source_ships_list.mapFromGlobal(event.globalPosition().toPoint()))
+            if item_at_click is None:
                 self.source_ships_list.clearSelection()
-
-            if is_on_source_list:
-                item_at_click = self.source_ships_list.itemAt(self.source_ships_list.mapFromGlobal(event.globalPosition().toPoint()))
-                if item_at_click is None:
-                    self.source_ships_list.clearSelection()
-                    self.custom_ship_input.clearFocus()
-                    self.source_ships_list.setFocus()
-                    return True
+                self.custom_ship_input.clearFocus()
+                self.source_ships_list.setFocus()
+                return True
         return False
 
     def _setup_ui(self):
@@ -157,24 +157,26 @@ class EditorContentWidget(QWidget):
     def _create_left_panel(self):
         panel = QWidget()
         layout = QVBoxLayout(panel)
-        nations = ["全部"] + sorted(self.all_ships_data.keys())
+        nations = ["全部"] + list(self.ship_catalog.nations)
         self.nation_filter_group = QButtonGroup(self)
         nation_buttons_layout = self._create_button_grid(nations, self.nation_filter_group, "全部")
-        all_types = sorted(list(set(t for n in self.all_ships_data.values() for t in n.keys())))
-        ship_types = ["全部"] + all_types + ["自定义"]
+        ship_types = ["全部"] + list(self.ship_catalog.types) + ["自定义"]
         self.type_filter_group = QButtonGroup(self)
         type_buttons_layout = self._create_button_grid(ship_types, self.type_filter_group, "全部")
         self.source_ships_list = EditorSourceList()
+        self.ship_search_box = ShipSearchBox()
         layout.addWidget(QLabel("国籍:"))
         layout.addLayout(nation_buttons_layout)
         layout.addSpacing(10)
         layout.addWidget(QLabel("舰种:"))
         layout.addLayout(type_buttons_layout)
         layout.addSpacing(10)
+        layout.addWidget(self.ship_search_box)
         layout.addWidget(self.source_ships_list, 1)
         layout.addSpacing(5)
         self.custom_ship_input = QLineEdit()
         self.custom_ship_input.setPlaceholderText("输入自定义船名后按添加")
+        self.custom_ship_input.installEventFilter(self)
         self.add_custom_ship_button = QPushButton("添加")
         self.add_custom_ship_button.setProperty("class", "OkCancelButton")
         self.remove_custom_ship_button = QPushButton("删除选中")
@@ -212,6 +214,7 @@ class EditorContentWidget(QWidget):
     def _connect_signals(self):
         self.nation_filter_group.buttonClicked.connect(self._update_source_list_filter)
         self.type_filter_group.buttonClicked.connect(self._update_source_list_filter)
+        self.ship_search_box.search_changed.connect(self._update_source_list_filter)
         self.add_custom_ship_button.clicked.connect(self._on_add_custom_ship)
         self.remove_button_manager.confirmed_click.connect(self._on_remove_custom_ship)
         self.source_ships_list.itemSelectionChanged.connect(self._update_remove_button_state)
@@ -220,7 +223,7 @@ class EditorContentWidget(QWidget):
     def _on_add_custom_ship(self):
         ship_name = self.custom_ship_input.text().strip()
         if not ship_name: return
-        if ship_name in self.custom_ships or ship_name in self._all_standard_ships: return
+        if ship_name in self.custom_ships or ship_name in self.ship_catalog: return
         self.custom_ships.append(ship_name)
         self.custom_ships.sort(key=natural_sort_key)
         self.custom_ships_changed.emit(self.custom_ships)
@@ -246,22 +249,37 @@ class EditorContentWidget(QWidget):
         return layout
 
     def _update_source_list_filter(self):
-        self.source_ships_list.clear(); selected_nation = self.nation_filter_group.checkedButton().text(); selected_type = self.type_filter_group.checkedButton().text()
-        is_custom_mode = selected_type == "自定义"; self.source_ships_list.setProperty("customMode", is_custom_mode); self.source_ships_list.style().unpolish(self.source_ships_list); self.source_ships_list.style().polish(self.source_ships_list)
+        self.ship_search_box.set_catalog_names(self.ship_catalog, self.custom_ships)
+        selected_nation = self.nation_filter_group.checkedButton().text(); selected_type = self.type_filter_group.checkedButton().text()
+        is_custom_mode = selected_type == "自定义"; set_style_property(self.source_ships_list, "customMode", is_custom_mode)
         for btn in self.nation_filter_group.buttons(): btn.setEnabled(not is_custom_mode)
-        ships_to_display = []
-        if is_custom_mode: ships_to_display.extend(self.custom_ships)
+        if is_custom_mode: ships_to_display = sorted(set(self.custom_ships), key=natural_sort_key)
         else:
-            for nation, types_dict in self.all_ships_data.items():
-                if selected_nation != "全部" and nation != selected_nation: continue
-                for ship_type, ships in types_dict.items():
-                    if selected_type != "全部" and ship_type != selected_type: continue
-                    ships_to_display.extend(ships)
-            if selected_nation == "全部" and selected_type == "全部": ships_to_display.extend(self.custom_ships)
-        self.source_ships_list.addItems(sorted(list(set(ships_to_display)), key=natural_sort_key))
-        for zone in self.drop_zones: zone._update_item_sizes()
+            ships_to_display = self.ship_catalog.filter_names(
+                None if selected_nation == "全部" else selected_nation,
+                None if selected_type == "全部" else (selected_type,))
+            if selected_nation == "全部" and selected_type == "全部": ships_to_display = self.ship_catalog.merge_with_custom(ships_to_display, self.custom_ships)
+        self.source_ships_list.set_items(self.ship_search_box.filter_names(ships_to_display))
         self._update_remove_button_state()
 
+    def set_custom_ships(self, custom_ships):
+        """绑定自定义船名列表（对话框复用时调用），列表由调用方持有并在增删时原地修改"""
+        self.custom_ships = custom_ships if custom_ships else []
+        self._update_source_list_filter()
+
+    def reset_state(self):
+        """关闭时清空搜索、输入与选择，并把筛选恢复为全部"""
+        self.ship_search_box.blockSignals(True)
+        self.ship_search_box.clear()
+        self.ship_search_box.blockSignals(False)
+        self.custom_ship_input.clear()
+        self.remove_button_manager.reset_state()
+        self.source_ships_list.clearSelection()
+        for group in (self.nation_filter_group, self.type_filter_group):
+            all_button = next((btn for btn in group.buttons() if btn.text() == "全部"), None)
+            if all_button: all_button.setChecked(True)
+        self._update_source_list_filter()
+
     def remove_ship_from_all_fleets(self, ship_name: str):
         for zone in self.drop_zones:
             if zone.get_ship() == ship_name: zone.set_ship(None)
@@ -300,6 +318,17 @@ class FleetEditorDialog(QDialog):
 
         self._setup_shell_ui()
         self.set_fleet(initial_fleet)
+        # 对话框由对话框池复用，只在显示期间接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
+
+    def rebind(self, initial_fleet, initial_custom_ships):
+        """由对话框池调用，用新的舰队与自定义船名复用此对话框"""
+        self.content_widget.set_custom_ships(initial_custom_ships)
+        self.set_fleet(initial_fleet)
+
+    def done(self, result):
+        super().done(result)
+        self.content_widget.reset_state()
 
     def set_fleet(self, fleet_list):
         ships_to_set = fleet_list[1:] if fleet_list else []
@@ -323,15 +352,14 @@ class FleetEditorDialog(QDialog):
         button_layout.addWidget(cancel_button)
         shell_layout.addLayout(button_layout)
 
-    def exec(self):
-        QApplication.instance().installEventFilter(self)
-        result = super().exec()
-        QApplication.instance().removeEventFilter(self)
-        return result
+    def showEvent(self, event):
+        super().showEvent(event)
+        get_event_dispatcher().set_press_listener_armed(self, True)
 
-    def eventFilter(self, watched, event: QEvent):
-        """壳的过滤器，只负责转发"""
-        if self.isActiveWindow():
-            # 将事件转发给内容类处理
-            return self.content_widget.process_app_event(watched, event)
-        return False
\ No newline at end of file
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        get_event_dispatcher().set_press_listener_armed(self, False)
+
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器在对话框可见时调用，只负责转发"""
+        return self.content_widget.process_mouse_press(event, clicked_widget)
\ No newline at end of file
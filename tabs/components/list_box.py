@@ -1,17 +1,20 @@
+from typing import NamedTuple
 from PySide6.QtWidgets import QListWidget, QAbstractItemView, QListView
-from PySide6.QtCore import Qt, Signal, QSize
+from PySide6.QtCore import Qt, Signal, QSize, QAbstractListModel, QModelIndex
 
-class ListBox(QListWidget):
-    """基础舰船列表控件，支持拖拽、选择、查找等功能"""
-    def __init__(self, parent=None):
-        """初始化控件，设置拖拽和选择模式"""
-        super().__init__(parent)
-        self.setAcceptDrops(True)
-        self.setDragEnabled(True)
-        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
-        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self._drag_start_on_item = False
+# (字体, 文本) -> 文本宽度，同一字体下每个船名只测量一次
+_text_width_cache = {}
+
+def cached_text_width(widget, text):
+    key = (widget.font().key(), text)
+    width = _text_width_cache.get(key)
+    if width is None:
+        width = _text_width_cache[key] = widget.fontMetrics().boundingRect(text).width()
+    return width
+
+class ListViewBehavior:
+    """列表控件的公共交互：禁用右键菜单与空白区域框选"""
+    _drag_start_on_item = False
 
     def contextMenuEvent(self, event):
         """禁用右键菜单"""
@@ -20,7 +23,7 @@ class ListBox(QListWidget):
     def mousePressEvent(self, event):
         """记录拖拽起点是否在项目上"""
         if event.button() == Qt.MouseButton.LeftButton:
-            self._drag_start_on_item = self.itemAt(event.pos()) is not None
+            self._drag_start_on_item = self.indexAt(event.pos()).isValid()
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
@@ -29,6 +32,18 @@ class ListBox(QListWidget):
             return
         super().mouseMoveEvent(event)
 
+
+class ListBox(ListViewBehavior, QListWidget):
+    """基础舰船列表控件，支持拖拽、选择、查找等功能"""
+    def __init__(self, parent=None):
+        """初始化控件，设置拖拽和选择模式"""
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self.setDragEnabled(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+
     def find_items(self, text):
         """精确查找项目"""
         return self.findItems(text, Qt.MatchFlag.MatchExactly)
@@ -54,38 +69,130 @@ class ListBox(QListWidget):
                         items[0].setSelected(True)
 
 
-class BaseSourceList(ListBox):
-    """所有源列表的基类，提供统一的拖拽和样式管理"""
+class SourceListItem(NamedTuple):
+    """源列表中的一项，提供与 QListWidgetItem 相同的 text() 接口"""
+    name: str
+
+    def text(self):
+        return self.name
+
+
+class ShipNameModel(QAbstractListModel):
+    """源列表的数据模型：船名表只增不减，当前显示哪些船名由序号数组决定"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._positions = {}
+        self._rows = ()
+        self._size_hint = QSize()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._names[self._rows[index.row()]]
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return self._size_hint
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def flags(self, index):
+        if index.isValid():
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+        return Qt.ItemFlag.ItemIsDropEnabled  # 允许目标列表拖回
+
+    def supportedDragActions(self):
+        return Qt.DropAction.CopyAction
+
+    def supportedDropActions(self):
+        return Qt.DropAction.CopyAction | Qt.DropAction.MoveAction
+
+    def set_size_hint(self, size):
+        self._size_hint = QSize(size)
+
+    def name_at(self, row):
+        return self._names[self._rows[row]]
+
+    def names(self):
+        return [self._names[i] for i in self._rows]
+
+    def set_names(self, labels):
+        """以重置模型的方式切换显示的船名，内容不变时返回 False"""
+        rows = []
+        for name in labels:
+            position = self._positions.get(name)
+            if position is None:
+                position = self._positions[name] = len(self._names)
+                self._names.append(name)
+            rows.append(position)
+        rows = tuple(rows)
+        if rows == self._rows:
+            return False
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+        return True
+
+
+class BaseSourceList(ListViewBehavior, QListView):
+    """
+    所有源列表的基类，提供统一的拖拽和样式管理。
+    基于 ShipNameModel 的只读视图：切换筛选只重置模型，项目尺寸统一为网格尺寸，仅绘制可见的行。
+    """
     contentChanged = Signal()
+    itemSelectionChanged = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.setDragEnabled(True)
         self.setAcceptDrops(True)  # 允许拖回删除
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
         self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
         self.setFlow(QListView.Flow.LeftToRight)
         self.setWrapping(True)
         self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(100)
+        self.ship_model = ShipNameModel(self)
+        self.setModel(self.ship_model)
         self.setGridSize(QSize(116, 30))
+        self.selectionModel().selectionChanged.connect(self.itemSelectionChanged)
 
-    def _update_all_item_sizes(self):
-        """统一的项目尺寸更新逻辑"""
-        grid_size = self.gridSize()
-        for i in range(self.count()):
-            item = self.item(i)
-            item.setSizeHint(grid_size)
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+    def setGridSize(self, size):
+        """网格尺寸即项目尺寸，只需计算一次"""
+        super().setGridSize(size)
+        self.ship_model.set_size_hint(size)
 
-    def addItem(self, item):
-        """重写 addItem，在添加单个项目后更新尺寸"""
-        super().addItem(item)
-        self._update_all_item_sizes()
+    def count(self):
+        return self.ship_model.rowCount()
 
-    def addItems(self, labels):
-        """重写 addItems，在添加多个项目后更新尺寸"""
-        super().addItems(labels)
-        self._update_all_item_sizes()
+    def item_texts(self):
+        return self.ship_model.names()
+
+    def selectedItems(self):
+        """返回选中的项目，与 QListWidget.selectedItems() 兼容"""
+        return [SourceListItem(self.ship_model.name_at(index.row()))
+                for index in sorted(self.selectionModel().selectedIndexes(), key=lambda index: index.row())]
+
+    def itemAt(self, pos):
+        index = self.indexAt(pos)
+        return SourceListItem(self.ship_model.name_at(index.row())) if index.isValid() else None
+
+    def set_items(self, labels):
+        """将列表内容更新为 labels，内容不变时不做任何操作"""
+        if self.ship_model.set_names(labels):
+            self.itemSelectionChanged.emit()
+
+    def clear(self):
+        self.set_items(())
 
     def startDrag(self, supportedActions):
         """拖拽为复制操作"""
@@ -99,6 +206,9 @@ class BaseSourceList(ListBox):
         else:
             event.ignore()
 
+    def dragMoveEvent(self, event):
+        self.dragEnterEvent(event)
+
     def dropEvent(self, event):
         """处理从目标列表拖回删除"""
         source = event.source()
@@ -144,12 +254,11 @@ class BaseTargetList(ListBox):
 
     def _update_item_sizes(self):
         """统一的目标列表项目尺寸更新"""
-        fm = self.fontMetrics()
         horizontal_padding = 22
         fixed_height = 22
         for i in range(self.count()):
             item = self.item(i)
-            text_width = fm.boundingRect(item.text()).width()
+            text_width = cached_text_width(self, item.text())
             item.setSizeHint(QSize(text_width + horizontal_padding, fixed_height))
             item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
 
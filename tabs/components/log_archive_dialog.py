@@ -0,0 +1,257 @@
+import re
+from datetime import datetime
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPlainTextEdit, QPushButton
+)
+from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import Qt
+from tabs.components.combo_box import CustomComboBox
+from utils.log_archive import LogSegmentReader, list_tasks, list_segments, segment_label
+from utils.log_search import LEVELS
+
+PAGE_LINES = 500
+# 跳到搜索命中时，命中行之前保留的行数
+HIT_CONTEXT_LINES = 20
+_ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+
+class LogArchiveDialog(QDialog):
+    """浏览磁盘日志归档，按页显示，可按行号或时间跳转，或按关键字与级别查找"""
+    def __init__(self, root_dir, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.FramelessWindowHint)
+        self.setObjectName('Dialog')
+        self.setWindowTitle("历史日志")
+        self.setMinimumSize(900, 620)
+        self.root_dir = root_dir
+        self.reader = None
+        self.first_line = 0
+        self.current_hit = None
+        self._setup_ui()
+        self._connect_signals()
+        self.refresh_tasks()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        select_layout = QHBoxLayout()
+        self.task_combo = CustomComboBox()
+        self.segment_combo = CustomComboBox()
+        self.refresh_button = QPushButton("刷新")
+        select_layout.addWidget(QLabel("任务:"))
+        select_layout.addWidget(self.task_combo, 1)
+        select_layout.addWidget(QLabel("日志段:"))
+        select_layout.addWidget(self.segment_combo, 2)
+        select_layout.addWidget(self.refresh_button)
+
+        jump_layout = QHBoxLayout()
+        self.line_input = QLineEdit()
+        self.line_input.setPlaceholderText("行号")
+        self.line_jump_button = QPushButton("跳转到行")
+        self.time_input = QLineEdit()
+        self.time_input.setPlaceholderText("时间，如 21:30 或 21:30:15")
+        self.time_jump_button = QPushButton("跳转到时间")
+        jump_layout.addWidget(self.line_input, 1)
+        jump_layout.addWidget(self.line_jump_button)
+        jump_layout.addWidget(self.time_input, 1)
+        jump_layout.addWidget(self.time_jump_button)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索关键字，留空时按级别查找")
+        self.search_previous_button = QPushButton("上一个")
+        self.search_next_button = QPushButton("下一个")
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.search_previous_button)
+        search_layout.addWidget(self.search_next_button)
+        self.level_buttons = {}
+        for level in LEVELS:
+            button = QPushButton(level)
+            button.setCheckable(True)
+            button.setChecked(True)
+            button.setProperty("class", "ShortButton")
+            self.level_buttons[level] = button
+            search_layout.addWidget(button)
+
+        self.info_label = QLabel()
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+
+        self.previous_button = QPushButton("上一页")
+        self.next_button = QPushButton("下一页")
+        self.end_button = QPushButton("末尾")
+        self.close_button = QPushButton("关闭")
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.previous_button)
+        button_layout.addWidget(self.next_button)
+        button_layout.addWidget(self.end_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_button)
+        for button in (self.refresh_button, self.line_jump_button, self.time_jump_button, self.search_previous_button,
+                       self.search_next_button, self.previous_button, self.next_button, self.end_button,
+                       self.close_button):
+            button.setProperty("class", "OkCancelButton")
+
+        layout.addLayout(select_layout)
+        layout.addLayout(jump_layout)
+        layout.addLayout(search_layout)
+        layout.addWidget(self.info_label)
+        layout.addWidget(self.log_view, 1)
+        layout.addLayout(button_layout)
+
+    def _connect_signals(self):
+        self.task_combo.currentIndexChanged.connect(self._on_task_changed)
+        self.segment_combo.currentIndexChanged.connect(self._on_segment_changed)
+        self.refresh_button.clicked.connect(self.refresh_tasks)
+        self.line_jump_button.clicked.connect(self._jump_to_line)
+        self.line_input.returnPressed.connect(self._jump_to_line)
+        self.time_jump_button.clicked.connect(self._jump_to_time)
+        self.time_input.returnPressed.connect(self._jump_to_time)
+        self.previous_button.clicked.connect(lambda: self.show_page(self.first_line - PAGE_LINES))
+        self.next_button.clicked.connect(lambda: self.show_page(self.first_line + PAGE_LINES))
+        self.end_button.clicked.connect(self.show_end)
+        self.search_input.textChanged.connect(self._reset_search)
+        self.search_input.returnPressed.connect(lambda: self._find(backward=False))
+        self.search_previous_button.clicked.connect(lambda: self._find(backward=True))
+        self.search_next_button.clicked.connect(lambda: self._find(backward=False))
+        for button in self.level_buttons.values():
+            button.toggled.connect(self._reset_search)
+        self.close_button.clicked.connect(self.accept)
+
+    def refresh_tasks(self):
+        """重新扫描归档目录，尽量保持当前选择"""
+        current_task = self.task_combo.currentText()
+        current_segment = self.segment_combo.currentData()
+        self.task_combo.blockSignals(True)
+        self.task_combo.clear()
+        self.task_combo.addItems(list_tasks(self.root_dir))
+        if current_task:
+            self.task_combo.setCurrentText(current_task)
+        self.task_combo.blockSignals(False)
+        self._load_segments(current_segment)
+
+    def _on_task_changed(self, index):
+        self._load_segments(None)
+
+    def _load_segments(self, selected_path):
+        self.segment_combo.blockSignals(True)
+        self.segment_combo.clear()
+        for path in list_segments(self.root_dir, self.task_combo.currentText()):
+            self.segment_combo.addItem(segment_label(path), str(path))
+        for i in range(self.segment_combo.count()):
+            if self.segment_combo.list_widget.item(i).data(Qt.ItemDataRole.UserRole) == selected_path:
+                self.segment_combo.setCurrentIndex(i)
+                break
+        self.segment_combo.blockSignals(False)
+        self._on_segment_changed(self.segment_combo.currentIndex())
+
+    def _on_segment_changed(self, index):
+        self.current_hit = None
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        path = self.segment_combo.currentData()
+        if not path:
+            self.info_label.setText("还没有归档的日志")
+            self.log_view.clear()
+            return
+        try:
+            self.reader = LogSegmentReader(path)
+        except (OSError, ValueError) as e:
+            self.info_label.setText(f"无法打开日志段: {e}")
+            self.log_view.clear()
+            return
+        self.show_end()
+
+    def show_end(self):
+        if self.reader is not None:
+            self.reader.reload()
+            self.show_page(self.reader.line_count - PAGE_LINES)
+
+    def show_page(self, first_line: int):
+        if self.reader is None:
+            return
+        self.first_line = max(0, min(first_line, self.reader.line_count - 1))
+        lines = self.reader.read_lines(self.first_line, PAGE_LINES)
+        self.log_view.setPlainText("\n".join(_ANSI_PATTERN.sub('', line) for line in lines))
+        self._update_info(len(lines))
+
+    def _update_info(self, shown: int):
+        start, end = self.reader.time_range()
+        time_text = ""
+        if start is not None:
+            time_text = f"，{datetime.fromtimestamp(start):%H:%M:%S} ~ {datetime.fromtimestamp(end):%H:%M:%S}"
+        last_line = self.first_line + shown
+        self.info_label.setText(f"第 {self.first_line + 1}-{last_line} 行，共 {self.reader.line_count} 行"
+                                f"（{self.reader.size / 1024 / 1024:.1f} MB{time_text}）")
+        self.previous_button.setEnabled(self.first_line > 0)
+        self.next_button.setEnabled(last_line < self.reader.line_count)
+
+    def _jump_to_line(self):
+        try:
+            line = int(self.line_input.text()) - 1
+        except ValueError:
+            return
+        self.show_page(line)
+
+    def _jump_to_time(self):
+        if self.reader is None:
+            return
+        text = self.time_input.text().strip()
+        day = self.reader.path.name[:10]
+        for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+            try:
+                target = datetime.strptime(f"{day} {text}", fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            self.info_label.setText("时间格式应为 时:分 或 时:分:秒")
+            return
+        self.show_page(self.reader.line_at_time(target.timestamp()))
+
+    def _reset_search(self, *args):
+        self.current_hit = None
+
+    def _find(self, backward: bool):
+        """
+        从上一处命中（没有时从当前页）开始查找下一处或上一处，到达一端后从另一端继续。
+        命中的候选块来自检索索引，只有候选块中的行需要读取核对。
+        """
+        if self.reader is None:
+            return
+        levels = [level for level, button in self.level_buttons.items() if button.isChecked()]
+        query = self.search_input.text()
+        if not levels or (not query and len(levels) == len(LEVELS)):
+            self.info_label.setText("请输入关键字，或取消部分级别后按级别查找")
+            return
+        self.reader.reload()
+        index = self.reader.search_index()
+        if self.current_hit is not None:
+            start = self.current_hit - 1 if backward else self.current_hit + 1
+        else:
+            start = self.first_line + PAGE_LINES - 1 if backward else self.first_line
+        wrap_start = index.line_count - 1 if backward else 0
+        for first in (start, wrap_start):
+            if 0 <= first < index.line_count:
+                hit = next(index.iter_hits(query, levels, first, backward, self.reader.read_lines), None)
+                if hit is not None:
+                    break
+        else:
+            self.current_hit = None
+            self.info_label.setText("没有找到匹配的日志")
+            return
+        self.current_hit = hit
+        self.show_page(hit - HIT_CONTEXT_LINES)
+        block = self.log_view.document().findBlockByNumber(hit - self.first_line)
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        self.log_view.setTextCursor(cursor)
+        self.log_view.centerCursor()
+
+    def done(self, result):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        super().done(result)
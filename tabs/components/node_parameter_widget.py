@@ -4,8 +4,10 @@ from ruamel.yaml.comments import CommentedSeq
 from tabs.components.check_box import CustomCheckBox
 from tabs.components.combo_box import CustomComboBox
 from tabs.components.enemy_rules_dialog import EnemyRulesDialog
+from tabs.components.dialog_pool import acquire_dialog
 from tabs.components.enemy_formation_rules_dialog import EnemyFormationRulesDialog
 from utils.ui_utils import create_form_layout
+from utils.encounter_store import EncounterStore
 from constants import PARAM_DEFAULTS, SPOT_FAILS_FORMATION_ITEMS, PROCEED_ITEMS
 
 class NodeParameterWidget(QWidget):
@@ -20,6 +22,7 @@ class NodeParameterWidget(QWidget):
         self._ui_rows = {}
         self._uncontrolled_data = {} # 防止两个规则被过滤
         self.current_defaults = PARAM_DEFAULTS.copy()
+        self._encounter_context = None # (地图, 节点列表)，用于显示规则在历史遭遇中的命中率
         self._setup_ui()
         self._connect_signals()
         self.update_visibility(visible_params)
@@ -109,6 +112,10 @@ class NodeParameterWidget(QWidget):
         self.enemy_rules_button.clicked.connect(self._on_edit_enemy_rules)
         self.enemy_formation_rules_button.clicked.connect(self._on_edit_enemy_formation_rules)
 
+    def set_encounter_context(self, map_key, nodes):
+        """公共接口：设置当前编辑的地图与节点，map_key 为空时不显示历史遭遇。"""
+        self._encounter_context = (map_key, list(nodes)) if map_key and nodes else None
+
     def set_defaults(self, defaults_dict: dict):
         """公共接口：允许父控件设置此控件当前应使用的默认值"""
         self.current_defaults = defaults_dict.copy()
@@ -227,7 +234,10 @@ class NodeParameterWidget(QWidget):
         """打开敌方编队规则编辑器"""
         # 从未控制数据中获取当前规则并执行对话框
         current_rules = self._uncontrolled_data.get('enemy_rules', [])
-        dialog = EnemyRulesDialog(current_rules, self)
+        encounter_records = None
+        if self._encounter_context:
+            encounter_records = EncounterStore().load_many(*self._encounter_context)
+        dialog = acquire_dialog(EnemyRulesDialog, self, current_rules, encounter_records=encounter_records)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_rules = dialog.get_rules()
             # 检查规则是否真的改变了
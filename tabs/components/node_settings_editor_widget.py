@@ -213,6 +213,8 @@ class NodeSettingsEditorWidget(QWidget):
             node_args_dict = self.plan_data.get('node_args') or {}
             data_to_load = (node_args_dict.get(selected_node) or {}).copy()
 
+        self._update_encounter_context(selected_node)
+
         # 检查 detour 是否刚被设为不可见
         if 'detour' not in visible_params and selected_node != "默认节点设置":
             # 如果包含一个无效的 detour
@@ -222,6 +224,17 @@ class NodeSettingsEditorWidget(QWidget):
 
         self.param_widget.load_data(data_to_load)
 
+    def _update_encounter_context(self, selected_node):
+        """默认节点设置对应所有已选节点的遭遇，单点设置只对应该节点。"""
+        chapter = self.plan_data.get('chapter')
+        map_num = self.plan_data.get('map')
+        if self.current_plan_type not in ['normal_fight', 'week', 'special_ap_task', 'event'] or chapter is None or map_num is None:
+            self.param_widget.set_encounter_context(None, [])
+        elif selected_node == "默认节点设置" or not selected_node:
+            self.param_widget.set_encounter_context(f"{chapter}-{map_num}", self.selected_nodes_list)
+        else:
+            self.param_widget.set_encounter_context(f"{chapter}-{map_num}", [selected_node])
+
     def _on_params_changed(self):
         """当子控件参数变化时，获取新数据并将其保存回 self.plan_data。"""
         # 从参数编辑器获取数据
@@ -0,0 +1,75 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QPushButton
+from PySide6.QtCore import Qt, QThread, Signal
+from utils.plan_lint import lint_plan_root, format_report, count_issues
+
+class PlanLintWorker(QThread):
+    """在后台线程中调用进程池检查计划，避免阻塞界面。"""
+    lint_finished = Signal(dict)
+    lint_failed = Signal(str)
+
+    def __init__(self, plan_root, parent=None):
+        super().__init__(parent)
+        self.plan_root = plan_root
+
+    def run(self):
+        try:
+            self.lint_finished.emit(lint_plan_root(self.plan_root))
+        except Exception as e:
+            self.lint_failed.emit(str(e))
+
+class PlanLintDialog(QDialog):
+    """显示 plan_root 下所有计划检查结果的对话框"""
+    def __init__(self, plan_root, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.FramelessWindowHint)
+        self.setObjectName('Dialog')
+        self.setWindowTitle("检查全部计划")
+        self.setMinimumSize(700, 500)
+        self.plan_root = plan_root
+        self._setup_ui()
+        self._start_lint()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        self.status_label = QLabel("正在检查...")
+        self.report_text = QTextEdit()
+        self.report_text.setReadOnly(True)
+        self.rerun_button = QPushButton("重新检查")
+        self.rerun_button.setProperty("class", "OkCancelButton")
+        self.close_button = QPushButton("关闭")
+        self.close_button.setProperty("class", "OkCancelButton")
+        self.rerun_button.clicked.connect(self._start_lint)
+        self.close_button.clicked.connect(self.accept)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(self.rerun_button)
+        button_layout.addWidget(self.close_button)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.report_text, 1)
+        layout.addLayout(button_layout)
+
+    def _start_lint(self):
+        self.rerun_button.setEnabled(False)
+        self.status_label.setText("正在检查...")
+        self.report_text.clear()
+        self.worker = PlanLintWorker(self.plan_root, self)
+        self.worker.lint_finished.connect(self._on_lint_finished)
+        self.worker.lint_failed.connect(self._on_lint_failed)
+        self.worker.start()
+
+    def _on_lint_finished(self, results):
+        errors, warnings = count_issues(results)
+        self.status_label.setText(f"检查完成：{errors} 个错误，{warnings} 个警告")
+        self.report_text.setPlainText(format_report(results, self.plan_root))
+        self.rerun_button.setEnabled(True)
+
+    def _on_lint_failed(self, message):
+        self.status_label.setText(f"检查失败: {message}")
+        self.rerun_button.setEnabled(True)
+
+    def done(self, result):
+        # 等待后台线程结束，避免对话框销毁时线程仍在运行
+        if self.worker.isRunning():
+            self.worker.wait()
+        super().done(result)
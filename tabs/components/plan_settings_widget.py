@@ -7,9 +7,11 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, Signal, QSize
 from tabs.components.fleet_editor_dialog import FleetEditorDialog
+from tabs.components.dialog_pool import acquire_dialog
 from tabs.components.spin_box import CustomSpinBox
 from tabs.components.check_box import CustomCheckBox
 from tabs.components.combo_box import CustomComboBox
+from tabs.components.list_box import cached_text_width
 from constants import BATTLE_TYPES, REPAIR_ITEMS, FIGHT_CONDITION_ITEMS
 from utils.ui_utils import create_group, create_form_layout
 
@@ -28,12 +30,11 @@ class FleetDisplayBox(QListWidget):
 
     def _update_item_sizes(self):
         """根据内容自适应项目尺寸"""
-        fm = self.fontMetrics()
         horizontal_padding = 22  # 水平内边距
         fixed_height = 22      # 固定高度
         for i in range(self.count()):
             item = self.item(i)
-            text_width = fm.boundingRect(item.text()).width()
+            text_width = cached_text_width(self, item.text())
             item.setSizeHint(QSize(text_width + horizontal_padding, fixed_height))
             item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
 
@@ -357,10 +358,14 @@ class PlanSettingsWidget(QWidget):
         current_fleet = self.plan_data.get('fleet', [])
         custom_ships = self.custom_ship_name.get('custom_ship_names', [])
         
-        dialog = FleetEditorDialog(current_fleet, custom_ships, self.window())
+        dialog = acquire_dialog(FleetEditorDialog, self, current_fleet, custom_ships)
         dialog.custom_ships_changed.connect(self._on_custom_ships_changed)
+        try:
+            accepted = dialog.exec() == QDialog.DialogCode.Accepted
+        finally:
+            dialog.custom_ships_changed.disconnect(self._on_custom_ships_changed)
 
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        if accepted:
             new_fleet = dialog.get_fleet()
             self._update_fleet_in_memory(new_fleet)
             self._load_fleet_data(display_label)
@@ -0,0 +1,109 @@
+from PySide6.QtWidgets import QLineEdit
+from PySide6.QtCore import QThread, Signal
+from utils.ship_search import ShipSearchIndex, simple_search, PINYIN_AVAILABLE
+
+class ShipSearchIndexBuilder(QThread):
+    """在后台线程中建立舰船搜索索引。"""
+    index_ready = Signal(object)
+
+    def __init__(self, names):
+        super().__init__()
+        self.names = tuple(names)
+
+    def run(self):
+        try:
+            index = ShipSearchIndex(self.names)
+        except Exception as e:
+            print(f"建立舰船搜索索引失败: {e}")
+            return
+        self.index_ready.emit(index)
+
+# 所有搜索框共用同一份索引；只有可搜索的船名（含自定义船名）变化时才重建
+_shared_index = None
+_running_builders = {}
+
+def _request_index(names, receiver):
+    """索引已建立时直接返回，否则在后台建立并在完成后调用 receiver(index)。"""
+    if _shared_index is not None and _shared_index.names == names:
+        return _shared_index
+    # 线程结束后才释放，避免销毁仍在运行的 QThread
+    for key, finished_builder in list(_running_builders.items()):
+        if finished_builder.isFinished():
+            del _running_builders[key]
+    builder = _running_builders.get(names)
+    if builder is None:
+        builder = ShipSearchIndexBuilder(names)
+        _running_builders[names] = builder
+
+        def on_ready(index):
+            global _shared_index
+            _shared_index = index
+
+        builder.index_ready.connect(on_ready)
+        builder.start()
+    builder.index_ready.connect(receiver)
+    return None
+
+class ShipSearchBox(QLineEdit):
+    """
+    舰船搜索框，支持船名、拼音首字母、全拼前缀与模糊匹配。
+    查询内容或索引变化时发出 search_changed，使用方通过 matches() 取得排序后的结果。
+    """
+    search_changed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        if PINYIN_AVAILABLE:
+            self.setPlaceholderText("搜索船名 / 拼音")
+        else:
+            self.setPlaceholderText("搜索船名（未安装 pypinyin，无法按拼音搜索）")
+            self.setToolTip("运行 install_deps.bat 或执行 pip install pypinyin 后重启，即可按拼音首字母与全拼搜索")
+        self.setClearButtonEnabled(True)
+        self._names = ()
+        self._custom_key = None
+        self._index = None
+        self.textChanged.connect(self.search_changed)
+
+    def set_catalog_names(self, catalog, custom_ships):
+        """以舰船目录与自定义船名作为可搜索范围，自定义船名未变化时直接返回。"""
+        custom_key = tuple(custom_ships)
+        if custom_key == self._custom_key:
+            return
+        self._custom_key = custom_key
+        self.set_names(catalog.merge_with_custom(catalog.names, custom_ships))
+
+    def set_names(self, names):
+        """设置可搜索的船名（应已按自然顺序排列），内容未变化时不会重建索引。"""
+        names = tuple(names)
+        if names == self._names:
+            return
+        self._names = names
+        self._index = _request_index(names, self._on_index_ready)
+        if self.is_active():
+            self.search_changed.emit()
+
+    def _on_index_ready(self, index):
+        if index.names != self._names:
+            return
+        self._index = index
+        if self.is_active():
+            self.search_changed.emit()
+
+    def is_active(self) -> bool:
+        return bool(self.text().strip())
+
+    def matches(self):
+        """返回按相关度排序的船名列表，搜索框为空时返回 None。"""
+        if not self.is_active():
+            return None
+        if self._index is None:
+            return simple_search(self._names, self.text())
+        return self._index.search(self.text())
+
+    def filter_names(self, names) -> list:
+        """按当前查询筛选并排序给定的船名，搜索框为空时原样返回。"""
+        ranked = self.matches()
+        if ranked is None:
+            return list(names)
+        allowed = set(names)
+        return [name for name in ranked if name in allowed]
@@ -2,6 +2,7 @@ from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QLineEdit
 from PySide6.QtGui import QIcon
 from PySide6.QtCore import Qt, Signal, QSize, QEvent
 from utils.icon_utils import get_icon_path, create_colored_pixmap
+from utils.style_utils import set_style_property
 class CustomSpinBox(QWidget):
     """自定义SpinBox"""
     valueChanged = Signal(int)
@@ -60,14 +61,8 @@ class CustomSpinBox(QWidget):
 
     def _update_hover_state(self, state):
         """统一更新悬浮状态并刷新样式"""
-        if self.property("hoverState") != state:
-            self.setProperty("hoverState", state)
-            # 刷新自身及所有子控件的样式
-            self.style().unpolish(self)
-            self.style().polish(self)
-            for child in self.findChildren(QWidget):
-                 self.style().unpolish(child)
-                 self.style().polish(child)
+        # 只有自身的渐变背景依赖 hoverState，子控件无需重新匹配样式
+        set_style_property(self, "hoverState", state)
 
     def eventFilter(self, obj, event):
         """事件过滤器，用于控制整个控件的悬浮状态"""
@@ -80,8 +75,7 @@ class CustomSpinBox(QWidget):
                 obj.setIcon(QIcon(pixmap_hover))
                 hover_state = "left" if obj is self.decr_button else "right"
                 self._update_hover_state(hover_state) # 设置父容器的渐变
-                self.line_edit.setProperty("parentButtonHovered", True)
-                self.line_edit.style().polish(self.line_edit)
+                set_style_property(self.line_edit, "parentButtonHovered", True)
                 return True
             elif event.type() == QEvent.Type.Leave:
                 obj.setIcon(QIcon(pixmap_normal))
@@ -92,15 +86,12 @@ class CustomSpinBox(QWidget):
             # 当鼠标进入输入框区域时，立即取消渐变效果
             if event.type() == QEvent.Type.Enter:
                 self._update_hover_state("none")
-                self.line_edit.setProperty("parentButtonHovered", False)
-                self.line_edit.style().polish(self.line_edit)
+                set_style_property(self.line_edit, "parentButtonHovered", False)
             # 处理焦点事件
             if event.type() == QEvent.Type.FocusIn:
-                self.setProperty("hasFocus", True)
-                self.style().polish(self)
+                set_style_property(self, "hasFocus", True)
             elif event.type() == QEvent.Type.FocusOut:
-                self.setProperty("hasFocus", False)
-                self.style().polish(self)
+                set_style_property(self, "hasFocus", False)
         return super().eventFilter(obj, event)
 
     def leaveEvent(self, event):
@@ -108,8 +99,7 @@ class CustomSpinBox(QWidget):
         self.decr_button.setIcon(QIcon(self.minus_pixmap_normal))
         self.incr_button.setIcon(QIcon(self.plus_pixmap_normal))
         self._update_hover_state("none")
-        self.line_edit.setProperty("parentButtonHovered", False)
-        self.line_edit.style().polish(self.line_edit)
+        set_style_property(self.line_edit, "parentButtonHovered", False)
         super().leaveEvent(event)
     
     def _decrement(self):
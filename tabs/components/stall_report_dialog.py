@@ -0,0 +1,58 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QPushButton
+from PySide6.QtCore import Qt
+
+class StallReportDialog(QDialog):
+    """显示界面卡顿监视器报告的诊断面板，有新的卡顿时自动刷新"""
+    def __init__(self, monitor, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.FramelessWindowHint)
+        self.setObjectName('Dialog')
+        self.setWindowTitle("界面卡顿诊断")
+        self.setMinimumSize(760, 520)
+        self.monitor = monitor
+        self._setup_ui()
+        self.monitor.stall_detected.connect(self._on_stall_detected)
+        self.refresh()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        self.status_label = QLabel()
+        self.report_text = QTextEdit()
+        self.report_text.setReadOnly(True)
+        self.report_text.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        self.save_button = QPushButton("写入文件")
+        self.reset_button = QPushButton("清空统计")
+        self.close_button = QPushButton("关闭")
+        for button in (self.save_button, self.reset_button, self.close_button):
+            button.setProperty("class", "OkCancelButton")
+        self.save_button.clicked.connect(self._save_report)
+        self.reset_button.clicked.connect(self._reset)
+        self.close_button.clicked.connect(self.accept)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.reset_button)
+        button_layout.addWidget(self.close_button)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.report_text, 1)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        state = "运行中" if self.monitor.is_running() else "未启用"
+        self.status_label.setText(f"监视器{state}，报告文件: {self.monitor.report_path}")
+        self.report_text.setPlainText(self.monitor.format_report())
+
+    def _on_stall_detected(self, record):
+        if self.isVisible():
+            self.refresh()
+
+    def _save_report(self):
+        if self.monitor.write_report():
+            self.status_label.setText(f"已写入 {self.monitor.report_path}")
+        else:
+            self.status_label.setText("写入失败，详见控制台输出")
+
+    def _reset(self):
+        self.monitor.reset()
+        self.refresh()
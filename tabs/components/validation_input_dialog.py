@@ -2,6 +2,7 @@ from pathlib import Path
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QWidget
 from PySide6.QtCore import Qt, QEvent
 from abc import ABC, abstractmethod
+from utils.style_utils import set_style_property
 
 class BaseValidator(ABC):
     """
@@ -132,15 +133,11 @@ class ValidationInputDialog(QDialog):
 
     def _show_error(self, message: str):
         """在一个地方处理显示错误的UI逻辑"""
-        self.line_edit.setProperty("state", "invalid")
+        set_style_property(self.line_edit, "state", "invalid")
         self.error_label.setText(message)
         self.error_label.show()
-        self.line_edit.style().unpolish(self.line_edit)
-        self.line_edit.style().polish(self.line_edit)
     
     def _clear_error_state(self):
         """清除错误标签和红色边框。"""
         self.error_label.hide()
-        self.line_edit.setProperty("state", "valid")
-        self.line_edit.style().unpolish(self.line_edit)
-        self.line_edit.style().polish(self.line_edit)
\ No newline at end of file
+        set_style_property(self.line_edit, "state", "valid")
\ No newline at end of file
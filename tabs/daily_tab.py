@@ -1,11 +1,10 @@
 import os
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QApplication,
+    QWidget, QVBoxLayout, QHBoxLayout,
     QTableWidgetItem, QPushButton, QLabel, QLineEdit, QDialog
 )
-from PySide6.QtCore import Qt, Signal, Slot, QEvent
+from PySide6.QtCore import Qt, Signal, Slot
 from PySide6.QtGui import QIntValidator
-from numpy import True_
 from ruamel.yaml.comments import CommentedSeq, CommentedMap
 
 from tabs.components.check_box import CustomCheckBox
@@ -13,6 +12,7 @@ from tabs.components.spin_box import CustomSpinBox
 from tabs.components.combo_box import CustomComboBox
 from tabs.components.base_task_tab import BaseTaskTab
 from tabs.components.managed_list_widget import ManagedListWidget
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 from tabs.components.validation_input_dialog import ValidationInputDialog, PresetValidator
 from utils.ui_utils import create_form_layout, create_group, create_ok_cancel_buttons, ConfirmButtonManager
 from utils.config_utils import update_config_value, save_config
@@ -43,7 +43,8 @@ class DailyTab(BaseTaskTab):
         self._setup_ui()
         self._connect_signals()
         self._load_data_to_ui()
-        QApplication.instance().installEventFilter(self)
+        # 只在删除按钮处于二次确认状态时接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
 
     def _setup_ui(self):
         """构建 UI 界面，包括左侧设置和右侧任务列表"""
@@ -230,6 +231,8 @@ class DailyTab(BaseTaskTab):
         self.apply_preset_btn.clicked.connect(self._on_apply_preset_clicked)
         self.save_preset_btn.clicked.connect(self._on_save_preset_clicked)
         self.delete_preset_confirm_manager.confirmed_click.connect(self._on_delete_preset_clicked)
+        self.delete_preset_confirm_manager.confirming_changed.connect(self._update_press_listener)
+        self.list_manager.confirm_delete_manager.confirming_changed.connect(self._update_press_listener)
         self.preset_task_combo.currentTextChanged.connect(self._on_preset_selection_changed)
         # 任务管理按钮信号
         self.add_task_btn.clicked.connect(self._on_add_task_clicked)
@@ -334,22 +337,24 @@ class DailyTab(BaseTaskTab):
         self._handle_value_change("daily_automation.quick_repair_limit", value_to_save)
 
 
-    def eventFilter(self, watched, event):
-        """事件过滤器，重置删除按钮的二次确认状态"""
-        if not self.isVisible():
-            return super().eventFilter(watched, event)
+    def _update_press_listener(self):
+        confirming = (self.delete_preset_confirm_manager.is_confirming()
+                      or self.list_manager.confirm_delete_manager.is_confirming())
+        get_event_dispatcher().set_press_listener_armed(self, confirming)
+
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器调用，重置删除按钮的二次确认状态"""
         self.list_manager.process_global_event(event)
 
-        if self.delete_preset_confirm_manager and event.type() == QEvent.Type.MouseButtonPress:
+        if self.delete_preset_confirm_manager:
             if self.delete_preset_btn.isVisible() and self.delete_preset_confirm_manager.is_confirming():
-                clicked_widget = QApplication.widgetAt(event.globalPosition().toPoint())
                 is_on_delete_button = clicked_widget and (
                     self.delete_preset_btn == clicked_widget or 
                     self.delete_preset_btn.isAncestorOf(clicked_widget)
                 )
                 if not is_on_delete_button:
                     self.delete_preset_confirm_manager.reset_state()
-        return super().eventFilter(watched, event)
+        return False
 
     @Slot()
     def refresh_task_plans(self):
@@ -383,6 +388,14 @@ class DailyTab(BaseTaskTab):
             self._handle_value_change('daily_automation.normal_fight_tasks', new_task_list)
             self.populate_tasks_table(new_task_list)
 
+    @Slot()
+    def reload_plan_references(self):
+        """计划被重命名或删除后，重新校验任务列表并刷新任务表格和预设"""
+        self.refresh_task_plans()
+        daily_automation = self.settings_data.get('daily_automation', {})
+        self.populate_tasks_table(daily_automation.get('normal_fight_tasks', []))
+        self._load_presets_to_combo()
+
     # 任务列表核心交互逻辑
     def _reset_to_view_mode(self):
         """重置 UI 到默认的“仅查看”状态"""
@@ -542,7 +555,7 @@ class DailyTab(BaseTaskTab):
 
         for saved_task_data in preset_map.values():
             saved_task_list = [list(task) for task in saved_task_data]
-            if current_tasks_list == saved_task_list: return True_
+            if current_tasks_list == saved_task_list: return True
         return False
     
     def _save_configs(self):
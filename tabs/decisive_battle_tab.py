@@ -1,7 +1,7 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QApplication
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
 )
-from PySide6.QtCore import Qt, Signal, QPropertyAnimation, QEasingCurve, QEvent
+from PySide6.QtCore import Qt, Signal, QPropertyAnimation, QEasingCurve
 from ruamel.yaml.comments import CommentedSeq
 from ruamel.yaml.scalarstring import DoubleQuotedScalarString
 
@@ -10,6 +10,7 @@ from tabs.components.fleet_config_widget import FleetConfigWidget
 from tabs.components.check_box import CustomCheckBox
 from tabs.components.spin_box import CustomSpinBox
 from tabs.components.combo_box import CustomComboBox
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 from utils.ui_utils import create_form_layout, create_group
 from utils.config_utils import update_config_value, save_config
 
@@ -36,7 +37,8 @@ class DecisiveBattleTab(BaseTaskTab):
         self._setup_ui()
         self._connect_signals()
         self._load_data_to_ui()
-        QApplication.instance().installEventFilter(self)
+        # 只在警告标签展开时接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
 
     def _setup_ui(self):
         """构建UI界面"""
@@ -181,13 +183,11 @@ class DecisiveBattleTab(BaseTaskTab):
         )
         self.fleet_config_controller.log_message_signal.connect(self.log_message_signal.emit)
 
-    def eventFilter(self, watched, event):
-        """事件过滤器，用于处理全局点击事件。"""
-        # 警告标签处理
-        if self.fleet_warning_label.maximumHeight() > 0 and event.type() == QEvent.Type.MouseButtonPress:
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器调用，点击开始按钮以外的位置时收起警告标签。"""
+        if self.fleet_warning_label.maximumHeight() > 0:
             global_pos = event.globalPosition().toPoint()
             if self.rect().contains(self.mapFromGlobal(global_pos)):
-                clicked_widget = QApplication.widgetAt(global_pos)
                 is_start_button_click = False
                 widget_iterator = clicked_widget
                 while widget_iterator is not None:
@@ -198,8 +198,6 @@ class DecisiveBattleTab(BaseTaskTab):
                 if not is_start_button_click:
                     self._toggle_warning_label(show=False)
                     return True
-        # 转发事件给舰队配置面板
-        self.fleet_config_controller.process_app_event(watched, event)
         return False
 
     def hideEvent(self, event):
@@ -270,6 +268,7 @@ class DecisiveBattleTab(BaseTaskTab):
 
     def _toggle_warning_label(self, show: bool):
         """使用动画显示或隐藏警告标签"""
+        get_event_dispatcher().set_press_listener_armed(self, show)
         target_height = self.fleet_warning_label.sizeHint().height()
         current_height = self.fleet_warning_label.maximumHeight()
         if (show and current_height == target_height) or (not show and current_height == 0):
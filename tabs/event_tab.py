@@ -251,6 +251,19 @@ class EventTab(BaseTaskTab):
         current_folder = self.event_folder_combo.currentText()
         self._on_event_folder_changed(current_folder)
 
+    @Slot()
+    def reload_plan_selection(self):
+        """重新读取当前活动文件夹下的计划，并恢复配置中保存的计划（用于计划被重命名或删除后）"""
+        saved_plan = (self.configs_data.get('event_automation') or {}).get('plan_name')
+        self.event_task_combo.blockSignals(True)
+        self._populate_event_tasks_combo(self.event_folder_combo.currentText())
+        if saved_plan and self.event_task_combo.findText(saved_plan) != -1:
+            self.event_task_combo.setCurrentText(saved_plan)
+        elif self.event_task_combo.count() > 0 and self.event_task_combo.isEnabled():
+            self.event_task_combo.setCurrentIndex(0)
+            self._handle_value_change("event_automation.plan_name", self.event_task_combo.currentText())
+        self.event_task_combo.blockSignals(False)
+
     def get_script_args(self):
         """从UI控件收集并返回要传递给脚本的参数列表"""
         event_folder = self.event_folder_combo.currentText()
@@ -1,3 +1,5 @@
+from array import array
+from bisect import bisect_left, bisect_right
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTextEdit,
     QPushButton, QFrame, QLabel, QLineEdit
@@ -8,10 +10,15 @@ from ansi2html import Ansi2HTMLConverter
 from tabs.components.combo_box import CustomComboBox
 from tabs.components.check_box import CustomCheckBox
 from utils.ui_utils import create_form_layout, create_group
+from utils.style_utils import set_style_property
+from utils.log_buffer import LogRingBuffer
+from utils.log_search import LogSearchIndex, LEVELS
+from utils.tracing import traced
 from utils.config_utils import update_config_value, save_config, validate_and_save_line_edit
 
 class LogTab(QWidget):
     """专门的日志显示选项卡，带有快捷控制功能"""
+    log_archive_requested = Signal()
     quick_start_request = Signal(str)
     quick_stop_request = Signal()
 
@@ -21,6 +28,20 @@ class LogTab(QWidget):
         self.configs_path = configs_path
         self.yaml_manager = yaml_manager
         self.ansi_converter = Ansi2HTMLConverter(scheme='xterm', inline=True)
+        # 所有日志行先写入环形缓冲区；低功耗模式（窗口隐藏到托盘）下只写缓冲区，不渲染
+        self.log_buffer = LogRingBuffer()
+        self._low_power = False
+        self._low_power_mark = 0
+        # 日志到达时即建立检索索引，行号与缓冲区的行编号一致
+        self.search_index = LogSearchIndex()
+        self.enabled_levels = set(LEVELS)
+        # 日志框中每个块对应的行编号（升序）与块号，用于把命中的行定位到日志框中
+        self._display_ids = array('Q')
+        self._display_blocks = array('Q')
+        self._search_start = 0 # 清空日志后只在之后的行中搜索
+        self._hits = None
+        self._hits_line_count = -1
+        self._current_hit = None
         self._setup_ui()
         self._connect_signals()
         self._load_initial_settings()
@@ -59,31 +80,71 @@ class LogTab(QWidget):
         # 日志设置
         self.clear_log_button = QPushButton("清空日志")
         self.clear_log_button.setProperty("class", "StartStopButton")
+        self.log_archive_button = QPushButton("历史日志")
+        self.log_archive_button.setProperty("class", "StartStopButton")
         self.auto_scroll_checkbox = CustomCheckBox("自动滚动日志")
-        auto_scroll_layout = create_form_layout([{'widget': self.auto_scroll_checkbox}], column_stretches=(1, 1))
+        self.record_session_checkbox = CustomCheckBox("录制任务会话")
+        auto_scroll_layout = create_form_layout([
+            {'widget': self.auto_scroll_checkbox},
+            {'widget': self.record_session_checkbox, 'description': "把任务的原始输出保存到 data/sessions，可附在问题反馈中"}
+            ], column_stretches=(1, 1))
         log_settings_layout = QVBoxLayout()
         log_settings_layout.addWidget(self.clear_log_button)
+        log_settings_layout.addWidget(self.log_archive_button)
         log_settings_layout.addLayout(auto_scroll_layout)
         auto_scroll_group = create_group("日志设置", log_settings_layout)
         left_layout.addWidget(auto_scroll_group)
         left_layout.addStretch()
 
-        # 右侧日志显示区
+        # 右侧搜索栏与日志显示区
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索日志")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_previous_button = QPushButton("上一个")
+        self.search_next_button = QPushButton("下一个")
+        self.search_info_label = QLabel()
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.search_previous_button)
+        search_layout.addWidget(self.search_next_button)
+        search_layout.addWidget(self.search_info_label)
+        self.level_buttons = {}
+        for level in LEVELS:
+            button = QPushButton(level)
+            button.setCheckable(True)
+            button.setProperty("class", "ShortButton")
+            button.setToolTip(f"显示 {level} 级别的日志")
+            self.level_buttons[level] = button
+            search_layout.addWidget(button)
+        for button in (self.search_previous_button, self.search_next_button):
+            button.setProperty("class", "ShortButton")
+
         self.log_display = QTextEdit()
         self.log_display.setReadOnly(True)
+        right_layout = QVBoxLayout()
+        right_layout.addLayout(search_layout)
+        right_layout.addWidget(self.log_display)
 
         # 添加到主布局
         main_layout.addWidget(left_panel, 1)
-        main_layout.addWidget(self.log_display, 2)
+        main_layout.addLayout(right_layout, 2)
 
     def _connect_signals(self):
         """连接内部控件的信号"""
         self.quick_start_stop_button.clicked.connect(self._on_quick_button_clicked)
         self.auto_restart_checkbox.toggled.connect(self._on_auto_restart_toggled)
         self.auto_scroll_checkbox.toggled.connect(self._on_auto_scroll_toggled)
+        self.record_session_checkbox.toggled.connect(self._on_record_session_toggled)
         self.clear_log_button.clicked.connect(self._clear_log)
+        self.log_archive_button.clicked.connect(self.log_archive_requested)
         self.max_restart_input.editingFinished.connect(self._on_max_restart_changed)
         self.task_selector_combo.currentTextChanged.connect(self._on_task_selected)
+        self.search_input.textChanged.connect(self._on_search_text_changed)
+        self.search_input.returnPressed.connect(lambda: self._find(backward=False))
+        self.search_previous_button.clicked.connect(lambda: self._find(backward=True))
+        self.search_next_button.clicked.connect(lambda: self._find(backward=False))
+        for button in self.level_buttons.values():
+            button.toggled.connect(self._on_level_filter_changed)
 
     def _on_quick_button_clicked(self):
         """根据按钮的当前状态，决定是发送启动还是中止信号"""
@@ -96,8 +157,12 @@ class LogTab(QWidget):
                 self.quick_start_request.emit(task_name)
 
     def _clear_log(self):
-        """清空日志框内容"""
+        """清空日志框内容，之后的搜索也只覆盖清空后的日志"""
         self.log_display.clear()
+        del self._display_ids[:]
+        del self._display_blocks[:]
+        self._search_start = self.log_buffer.total_written
+        self._reset_search()
 
     def _load_initial_settings(self):
         """从配置文件加载初始UI状态"""
@@ -111,6 +176,16 @@ class LogTab(QWidget):
         self.auto_scroll_enabled = saved_auto_scroll
         self.auto_scroll_checkbox.setChecked(saved_auto_scroll)
         self.auto_scroll_checkbox.update_icon()
+
+        self.record_session_checkbox.setChecked(self.configs_data.get('record_sessions', False))
+        self.record_session_checkbox.update_icon()
+
+        saved_levels = self.configs_data.get('log_levels', list(LEVELS))
+        self.enabled_levels = {level for level in LEVELS if level in saved_levels}
+        for level, button in self.level_buttons.items():
+            button.blockSignals(True)
+            button.setChecked(level in self.enabled_levels)
+            button.blockSignals(False)
     
     def set_task_list(self):
         last_selected_task = self.configs_data.get('last_selected_task', "")
@@ -134,6 +209,12 @@ class LogTab(QWidget):
         update_config_value(self.configs_data, 'auto_restart', checked)
         save_config(self.yaml_manager, self.configs_data, self.configs_path)
 
+    @Slot(bool)
+    def _on_record_session_toggled(self, checked):
+        """更新是否录制任务会话"""
+        update_config_value(self.configs_data, 'record_sessions', checked)
+        save_config(self.yaml_manager, self.configs_data, self.configs_path)
+
     @Slot()
     def _on_max_restart_changed(self):
         """验证并保存最大重启次数输入框的值"""
@@ -176,27 +257,206 @@ class LogTab(QWidget):
         """
         if is_running:
             self.quick_start_stop_button.setText(f"中止{task_name}")
-            self.quick_start_stop_button.setProperty("running", True)
+            set_style_property(self.quick_start_stop_button, "running", True)
             self.task_selector_combo.setEnabled(False)
         else:
             self.quick_start_stop_button.setText("启动任务")
-            self.quick_start_stop_button.setProperty("running", False)
+            set_style_property(self.quick_start_stop_button, "running", False)
             self.task_selector_combo.setEnabled(True)
-        self.quick_start_stop_button.style().polish(self.quick_start_stop_button)
 
     @Slot(str)
+    @traced("log flush")
     def append_log_message(self, message_chunk: str):
         """槽函数，用于接收并显示日志信息。"""
-        lines = message_chunk.splitlines()
-
-        # 遍历这个列表，对每一行独立进行处理
-        for line in lines:
-            if not line:
-                continue
+        lines = [line.replace(" [36mautowsgr", "") for line in message_chunk.splitlines() if line]
+        if not lines:
+            return
+        first_id = self.log_buffer.total_written
+        self.log_buffer.extend(lines)
+        self.search_index.add_lines(lines)
+        # 倒排记录只需覆盖缓冲区中仍保留的行，积累到缓冲区的两倍时裁剪一次
+        if self.search_index.line_count - self.search_index.first_line > 2 * len(self.log_buffer):
+            self.search_index.trim(self.log_buffer.first_id)
+        if self._low_power:
+            return
 
-            processed_line = line.replace(" [36mautowsgr", "")
-            html_line = self.ansi_converter.convert(processed_line, full=False)
+        # 遍历这个列表，对每一行独立进行处理；未选中级别的行照常插入，只是隐藏
+        document = self.log_display.document()
+        for line_id, line in enumerate(lines, first_id):
+            html_line = self.ansi_converter.convert(line, full=False)
+            # 空文档上 append 会复用第 0 块，之后每次 append 新增一块
+            self._display_ids.append(line_id)
+            self._display_blocks.append(0 if document.isEmpty() else document.blockCount())
             self.log_display.append(html_line)
+            if not self._level_visible(line_id):
+                self._set_block_visible(document.lastBlock(), False)
         
-        if self.auto_scroll_enabled and lines:
-            self.log_display.verticalScrollBar().setValue(self.log_display.verticalScrollBar().maximum())
\ No newline at end of file
+        if self.auto_scroll_enabled:
+            self._scroll_to_bottom()
+
+    def _scroll_to_bottom(self):
+        self.log_display.verticalScrollBar().setValue(self.log_display.verticalScrollBar().maximum())
+
+    def set_low_power(self, enabled: bool):
+        """
+        进入或退出低功耗模式，由主窗口在隐藏到托盘和恢复时调用。
+        退出时只把隐藏期间新增日志中能在日志框内看到的末尾部分一次性插入。
+        """
+        if enabled == self._low_power:
+            return
+        self._low_power = enabled
+        if enabled:
+            self._low_power_mark = self.log_buffer.total_written
+            return
+        pending = self.log_buffer.total_written - self._low_power_mark
+        if pending > 0:
+            self._render_tail(pending)
+
+    def _visible_line_count(self) -> int:
+        line_height = max(1, self.log_display.fontMetrics().lineSpacing())
+        return max(1, self.log_display.viewport().height() // line_height + 1)
+
+    @traced("log render tail")
+    def _render_tail(self, pending: int):
+        """把缓冲区末尾的若干行转换为 HTML 并一次性插入日志框"""
+        count = min(pending, self._visible_line_count(), len(self.log_buffer))
+        omitted = pending - count
+        cursor = QTextCursor(self.log_display.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        if omitted > 0:
+            self._insert_display_block(
+                cursor, None, f'<span style="color:#888888;">…… 后台运行期间省略了 {omitted} 行日志 ……</span>')
+        self._insert_display_lines(cursor, self.log_buffer.total_written - count, self.log_buffer.tail(count))
+        cursor.endEditBlock()
+        if self.auto_scroll_enabled:
+            self._scroll_to_bottom()
+
+    def _insert_display_block(self, cursor: QTextCursor, line_id, html: str):
+        """在日志框末尾插入一块；line_id 为 None 的提示行不参与搜索定位与级别筛选"""
+        if self.log_display.document().isEmpty():
+            block = 0
+        else:
+            cursor.insertBlock()
+            block = cursor.blockNumber()
+        cursor.insertHtml(html)
+        if line_id is not None:
+            self._display_ids.append(line_id)
+            self._display_blocks.append(block)
+            if not self._level_visible(line_id):
+                self._set_block_visible(cursor.block(), False)
+
+    def _insert_display_lines(self, cursor: QTextCursor, first_id: int, lines: list):
+        for line_id, line in enumerate(lines, first_id):
+            self._insert_display_block(cursor, line_id, self.ansi_converter.convert(line, full=False))
+
+    def _set_block_visible(self, block, visible: bool):
+        block.setVisible(visible)
+        self.log_display.document().markContentsDirty(block.position(), block.length())
+
+    def _level_visible(self, line_id: int) -> bool:
+        return len(self.enabled_levels) == len(LEVELS) or self.search_index.level_of(line_id) in self.enabled_levels
+
+    @traced("log level filter")
+    def _apply_level_filter(self):
+        """按当前级别显示或隐藏日志框中已有的块，不重新生成内容"""
+        document = self.log_display.document()
+        changed = False
+        for line_id, block_number in zip(self._display_ids, self._display_blocks):
+            block = document.findBlockByNumber(block_number)
+            visible = self._level_visible(line_id)
+            if block.isVisible() != visible:
+                block.setVisible(visible)
+                changed = True
+        if changed:
+            document.markContentsDirty(0, document.characterCount())
+        if self.auto_scroll_enabled:
+            self._scroll_to_bottom()
+
+    # ---------- 搜索与级别筛选 ----------
+
+    @Slot(bool)
+    def _on_level_filter_changed(self, checked):
+        """更新显示的日志级别并保存，随后显示或隐藏日志框中对应级别的行"""
+        self.enabled_levels = {level for level, button in self.level_buttons.items() if button.isChecked()}
+        update_config_value(self.configs_data, 'log_levels', [level for level in LEVELS if level in self.enabled_levels])
+        save_config(self.yaml_manager, self.configs_data, self.configs_path)
+        self._apply_level_filter()
+        self._reset_search()
+        if self.search_input.text():
+            self._find(backward=True)
+
+    @Slot(str)
+    def _on_search_text_changed(self, text):
+        """边输入边搜索，定位到最新的一处匹配"""
+        self._reset_search()
+        if text:
+            self._find(backward=True)
+
+    def _reset_search(self):
+        self._hits = None
+        self._current_hit = None
+        self._update_search_info()
+
+    def _search_hits(self) -> list:
+        """
+        当前查询的全部命中行号，只包含仍在缓冲区中、且显示在日志框里的行
+        （后台运行期间省略的行不在日志框中）；有新日志到达后重新计算。
+        """
+        query = self.search_input.text()
+        if not query:
+            return []
+        if self._hits is None or self._hits_line_count != self.search_index.line_count:
+            first_id = max(self._search_start, self.log_buffer.first_id)
+            lines = self.log_buffer.lines_from(first_id, self.log_buffer.total_written - first_id)
+            read_lines = lambda start, count: lines[start - first_id:start - first_id + count] if start >= first_id else []
+            self._hits = [line_id for line_id in
+                          self.search_index.iter_hits(query, self.enabled_levels, first_id, False, read_lines)
+                          if self._display_position(line_id) is not None]
+            self._hits_line_count = self.search_index.line_count
+        return self._hits
+
+    @traced("log search")
+    def _find(self, backward: bool):
+        """跳到下一处（或上一处）匹配，到达末尾后从另一端继续"""
+        hits = self._search_hits()
+        if not hits:
+            self._current_hit = None
+            self._update_search_info()
+            return
+        if self._current_hit is None:
+            position = len(hits) - 1 if backward else 0
+        elif backward:
+            position = bisect_left(hits, self._current_hit) - 1
+        else:
+            position = bisect_right(hits, self._current_hit)
+        self._current_hit = hits[position % len(hits)]
+        self._show_line(self._current_hit)
+        self._update_search_info()
+
+    def _display_position(self, line_id: int):
+        position = bisect_left(self._display_ids, line_id)
+        if position == len(self._display_ids) or self._display_ids[position] != line_id:
+            return None
+        return position
+
+    def _show_line(self, line_id: int):
+        """选中日志框中对应的块"""
+        position = self._display_position(line_id)
+        if position is None:
+            return
+        block = self.log_display.document().findBlockByNumber(self._display_blocks[position])
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        self.log_display.setTextCursor(cursor)
+        self.log_display.ensureCursorVisible()
+
+    def _update_search_info(self):
+        if not self.search_input.text():
+            self.search_info_label.setText("")
+        elif not self._hits:
+            self.search_info_label.setText("无匹配")
+        elif self._current_hit is None:
+            self.search_info_label.setText(f"共 {len(self._hits)} 处")
+        else:
+            self.search_info_label.setText(f"{bisect_left(self._hits, self._current_hit) + 1}/{len(self._hits)}")
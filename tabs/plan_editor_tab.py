@@ -1,23 +1,31 @@
 import os
 import yaml
 from ruamel.yaml.comments import CommentedSeq
-import re
 from pathlib import Path
 import io
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFrame, QTextEdit, QSizePolicy, QScrollArea, QApplication
+    QFrame, QTextEdit, QSizePolicy, QScrollArea
 )
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt, Signal, QRect, QEvent
+from PySide6.QtGui import QPixmap, QKeySequence, QShortcut
+from PySide6.QtCore import Qt, Signal, QRect, QFileSystemWatcher
 from tabs.components.check_box import CustomCheckBox 
 from tabs.components.combo_box import CustomComboBox
 from tabs.components.plan_settings_widget import PlanSettingsWidget
 from tabs.components.node_settings_editor_widget import NodeSettingsEditorWidget
 from tabs.components.validation_input_dialog import ValidationInputDialog, PlanValidator
+from tabs.components.plan_lint_dialog import PlanLintDialog
+from tabs.components.bulk_edit_dialog import PlanBulkEditDialog
+from tabs.components.app_event_dispatcher import get_event_dispatcher
 from constants import SETTINGS_FILE, MAP_PICS_DIR, NORMAL_MAP_CONFIGS_FILE, EVENT_MAP_CONFIGS_FILE, KEY_ORDER_MAP
 from utils.config_utils import save_config, update_config_value
 from utils.ui_utils import create_ok_cancel_buttons, ConfirmButtonManager
+from utils.style_utils import set_style_property
+from utils.tracing import traced
+from utils.route_utils import analyze_routes, format_route_summary
+from utils.plan_history import PlanHistory
+from utils.plan_cache import PlanDocumentCache, render_plan_summary
+from utils.plan_reference_utils import plan_key_from_path
 
 class MapDisplayWidget(QWidget):
     """
@@ -111,6 +119,7 @@ class MapDisplayWidget(QWidget):
         
         return QRect(x_offset, y_offset, scaled_pixmap.width(), scaled_pixmap.height())
 
+    @traced("map render")
     def _update_display(self):
         """更新缩放后的图片并重新定位所有节点复选框。"""
         if self._original_pixmap.isNull():
@@ -198,9 +207,11 @@ class MapDisplayWidget(QWidget):
 
 class PlanEditorTab(QWidget):
     """用于编辑任务计划的标签页"""
+    plan_references_changed = Signal()
 
-    def __init__(self, custom_ship_name, custom_ship_name_path, yaml_manager, parent=None):
+    def __init__(self, custom_ship_name, custom_ship_name_path, yaml_manager, parent=None, reference_index=None):
         super().__init__(parent)
+        self.reference_index = reference_index
         self.current_plan_path_dir = ""
         self.plan_root_path = self._get_plan_root_path()
         self.yaml_manager = yaml_manager
@@ -210,14 +221,21 @@ class PlanEditorTab(QWidget):
         self.event_map_configs = self._load_event_map_configs()
         self.current_plan_data = None
         self.is_dirty = False 
+        self.plan_history = PlanHistory()
+        self._is_replaying_history = False
+        self._is_applying_edit = False # 处理一次用户修改引起的界面联动期间为 True
+        self.plan_cache = PlanDocumentCache(yaml_manager)
+        self.plan_watcher = QFileSystemWatcher(self)
         self._current_plan_file_path = None
+        self._current_nodes_data = None
         self._last_root_text = ""
         self._last_event_text = ""
         self._last_plan_text = ""
         self._setup_ui()
         self._connect_signals()
         self._populate_root_combo()
-        QApplication.instance().installEventFilter(self)
+        # 只在删除按钮处于二次确认状态时接收全局点击
+        get_event_dispatcher().add_press_listener(self, self._on_app_mouse_press, armed=False)
 
     def _load_normal_map_configs(self):
         """加载普通地图的节点配置"""
@@ -268,12 +286,24 @@ class PlanEditorTab(QWidget):
         self.new_plan_button.setProperty('class', 'TallButton')
         self.new_plan_description = QLabel("点击新建时，新建的计划会保存在<br>“计划类型”或“活动”文件夹内")
         self.new_plan_description.setObjectName('DescriptionLabel')
+        self.rename_plan_button = QPushButton("重命名计划")
+        self.rename_plan_button.setProperty('class', 'TallButton')
         self.delete_plan_button = QPushButton("删除当前计划")
         self.delete_plan_button.setProperty('class', 'TallButton')
         self.delete_button_manager = ConfirmButtonManager(
             self.delete_plan_button, "确认删除",
-            pre_condition_check=lambda: self.delete_plan_button.isEnabled()
+            pre_condition_check=self._delete_plan_pre_condition_check
         )
+        self.plan_usage_label = QLabel()
+        self.plan_usage_label.setObjectName('DescriptionLabel')
+        self.plan_usage_label.setWordWrap(True)
+        self.plan_usage_label.hide()
+        self.lint_plans_button = QPushButton("检查全部计划")
+        self.lint_plans_button.setProperty('class', 'TallButton')
+        self.lint_plans_button.setEnabled(bool(self.plan_root_path and os.path.isdir(self.plan_root_path)))
+        self.bulk_edit_button = QPushButton("批量编辑")
+        self.bulk_edit_button.setProperty('class', 'TallButton')
+        self.bulk_edit_button.setEnabled(self.lint_plans_button.isEnabled())
 
         file_selector_layout.addWidget(QLabel("计划类型:"))
         file_selector_layout.addWidget(self.root_combo)
@@ -286,8 +316,15 @@ class PlanEditorTab(QWidget):
         file_selector_layout.addSpacing(10)
         file_selector_layout.addWidget(self.new_plan_button)
         file_selector_layout.addSpacing(10)
+        file_selector_layout.addWidget(self.rename_plan_button)
+        file_selector_layout.addSpacing(10)
         file_selector_layout.addWidget(self.delete_plan_button)
+        file_selector_layout.addWidget(self.plan_usage_label)
         file_selector_layout.addWidget(self.new_plan_description)
+        file_selector_layout.addSpacing(10)
+        file_selector_layout.addWidget(self.lint_plans_button)
+        file_selector_layout.addSpacing(10)
+        file_selector_layout.addWidget(self.bulk_edit_button)
         file_selector_layout.addStretch()
 
         plan_summary_widget = QFrame()
@@ -300,13 +337,22 @@ class PlanEditorTab(QWidget):
         top_section_layout.addWidget(plan_summary_widget, 2)
 
         map_container_widget = QWidget()
-        map_container_layout = QVBoxLayout(map_container_widget)
+        map_container_layout = QHBoxLayout(map_container_widget)
         map_container_layout.setContentsMargins(9, 0, 9, 0)
         
         self.map_display_widget = MapDisplayWidget(self)
         self.map_display_widget.set_text("请选择一个计划文件以显示地图")
+        # 路线分析
+        self.route_info_label = QLabel()
+        self.route_info_label.setObjectName("DescriptionLabel")
+        self.route_info_label.setWordWrap(True)
+        self.route_info_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.route_info_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.route_info_label.setMaximumWidth(180)
+        self.route_info_label.hide()
         
-        map_container_layout.addWidget(self.map_display_widget)
+        map_container_layout.addWidget(self.map_display_widget, 1)
+        map_container_layout.addWidget(self.route_info_label)
         left_layout.addWidget(top_section_widget, 7)
         left_layout.addWidget(map_container_widget, 8)
         # 右侧面板
@@ -320,6 +366,12 @@ class PlanEditorTab(QWidget):
         button_layout.setContentsMargins(20, 10, 0, 10)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.cancel_button)
+        self.undo_button = QPushButton("撤销")
+        self.undo_button.setProperty("class", "OkCancelButton")
+        self.redo_button = QPushButton("重做")
+        self.redo_button.setProperty("class", "OkCancelButton")
+        button_layout.addWidget(self.undo_button)
+        button_layout.addWidget(self.redo_button)
         # 滚动区域
         self.settings_panel = PlanSettingsWidget(self.yaml_manager, self.custom_ship_name, self.custom_ship_name_path)
         self.node_settings_panel = NodeSettingsEditorWidget()
@@ -345,6 +397,10 @@ class PlanEditorTab(QWidget):
         # 初始禁用
         self.save_button.setEnabled(False)
         self.cancel_button.setEnabled(False)
+        self.undo_button.setEnabled(False)
+        self.redo_button.setEnabled(False)
+        self.undo_shortcut = QShortcut(QKeySequence.StandardKey.Undo, self)
+        self.redo_shortcut = QShortcut(QKeySequence.StandardKey.Redo, self)
 
     def _connect_signals(self):
         """连接所有UI控件的信号到其处理函数。"""
@@ -353,12 +409,22 @@ class PlanEditorTab(QWidget):
         self.plan_combo.currentTextChanged.connect(self._on_plan_selected)
         self.new_plan_button.clicked.connect(self._on_new_plan_clicked)
         self.delete_button_manager.confirmed_click.connect(self._on_delete_plan_clicked)
+        self.delete_button_manager.confirming_changed.connect(
+            lambda confirming: get_event_dispatcher().set_press_listener_armed(self, confirming))
+        self.rename_plan_button.clicked.connect(self._on_rename_plan_clicked)
+        self.lint_plans_button.clicked.connect(self._on_lint_plans_clicked)
+        self.bulk_edit_button.clicked.connect(self._on_bulk_edit_clicked)
         self.save_button.clicked.connect(self._on_save_clicked)
         self.cancel_button.clicked.connect(self._on_cancel_clicked)
+        self.undo_button.clicked.connect(self._on_undo_clicked)
+        self.redo_button.clicked.connect(self._on_redo_clicked)
+        self.undo_shortcut.activated.connect(self._on_undo_clicked)
+        self.redo_shortcut.activated.connect(self._on_redo_clicked)
         self.settings_panel.plan_data_changed.connect(self._on_plan_settings_changed)
         self.map_display_widget.selection_changed.connect(self._on_node_selection_changed)
         self.settings_panel.custom_ships_updated.connect(self._on_custom_ships_updated)
-        self.node_settings_panel.settings_changed.connect(lambda: self._set_dirty(True))
+        self.node_settings_panel.settings_changed.connect(self._on_node_settings_changed)
+        self.plan_watcher.fileChanged.connect(self._on_watched_plan_changed)
     
     # --- 状态管理 ---
     def _update_file_action_buttons_state(self):
@@ -367,12 +433,17 @@ class PlanEditorTab(QWidget):
         is_plan_selected = (self._current_plan_file_path is not None and 
                             self._current_plan_file_path.exists())
         self.delete_plan_button.setEnabled(is_plan_selected and not self.is_dirty)
+        self.rename_plan_button.setEnabled(is_plan_selected and not self.is_dirty)
         # 重置删除按钮的确认状态
         if hasattr(self, 'delete_button_manager'):
              self.delete_button_manager.reset_state()
+        self._update_plan_usage_label()
 
     def _set_dirty(self, is_dirty):
         """设置UI的未保存状态，并集中管理所有相关控件的启用/禁用。"""
+        # 缓存中的文档与 current_plan_data 是同一对象，修改后不再与文件一致
+        if is_dirty and self._current_plan_file_path is not None:
+            self.plan_cache.invalidate(self._current_plan_file_path)
         self.is_dirty = is_dirty
         # 保存/取消 按钮
         self.save_button.setEnabled(is_dirty)
@@ -389,24 +460,72 @@ class PlanEditorTab(QWidget):
         # 只有在导航启用 且 存在有效保存路径时 才启用
         has_valid_path = (self.current_plan_path_dir != "" and os.path.isdir(self.current_plan_path_dir))
         self.new_plan_button.setEnabled(is_nav_enabled and has_valid_path)
+        # 批量编辑会直接改写文件，有未保存修改时禁用
+        self.bulk_edit_button.setEnabled(is_nav_enabled and self.lint_plans_button.isEnabled())
         # 只有在导航启用 且 选中了一个真实文件时 才启用
         is_plan_selected = (self._current_plan_file_path is not None and 
                             self._current_plan_file_path.exists())
         self.delete_plan_button.setEnabled(is_nav_enabled and is_plan_selected)
+        self.rename_plan_button.setEnabled(is_nav_enabled and is_plan_selected)
         # 重置删除按钮的确认状态
         if hasattr(self, 'delete_button_manager'):
             self.delete_button_manager.reset_state()
+            self._update_plan_usage_label()
         # 更新预览
         if is_dirty and self.current_plan_data:
             self._update_plan_summary_from_memory()
         # 重置保存按钮的 "warning" 状态
-        self.save_button.setProperty("warning", "")
-        self.save_button.style().unpolish(self.save_button)
-        self.save_button.style().polish(self.save_button)
+        set_style_property(self.save_button, "warning", "")
+        self._update_history_buttons_state()
+
+    def _record_user_edit(self):
+        """
+        一次用户修改处理完毕后调用，把修改连同界面联动产生的修正记录为一个撤销步骤。
+        联动期间（如修改地图后自动取消孤立节点）触发的其他修改处理不单独记录。
+        """
+        if self._is_applying_edit or self._is_replaying_history or self.current_plan_data is None:
+            return
+        self.plan_history.record(self.current_plan_data)
+        self._update_history_buttons_state()
+
+    def _update_history_buttons_state(self):
+        """根据历史记录更新撤销/重做按钮。"""
+        has_plan = self.current_plan_data is not None
+        self.undo_button.setEnabled(has_plan and self.plan_history.can_undo())
+        self.redo_button.setEnabled(has_plan and self.plan_history.can_redo())
+
+    def _on_undo_clicked(self):
+        """撤销上一次修改。"""
+        if self.current_plan_data is None or not self.plan_history.undo(self.current_plan_data):
+            return
+        self._replay_history()
+
+    def _on_redo_clicked(self):
+        """重做上一次被撤销的修改。"""
+        if self.current_plan_data is None or not self.plan_history.redo(self.current_plan_data):
+            return
+        self._replay_history()
+
+    def _replay_history(self):
+        """撤销/重做后通过现有的刷新流程重建界面。"""
+        self._is_replaying_history = True
+        try:
+            plan_type = self.root_combo.currentText()
+            self.settings_panel.load_plan(plan_type, self.current_plan_data)
+            self._refresh_displays_from_memory()
+        finally:
+            self._is_replaying_history = False
+        # 界面联动产生的修正（如地图自动取消孤立节点）不计入历史
+        self.plan_history.resync(self.current_plan_data)
+        is_dirty = not self.plan_history.is_at_saved_state()
+        self._set_dirty(is_dirty)
+        if not is_dirty:
+            self._update_plan_summary_from_memory()
 
     def _on_save_clicked(self):
         """保存按钮：将内存保存到文件"""
         self._save_current_plan()
+        self.plan_history.mark_saved()
         self._set_dirty(False)
         # 刷新只读预览
         self._update_plan_summary(self._current_plan_file_path)
@@ -539,27 +658,14 @@ class PlanEditorTab(QWidget):
             self.yaml_manager.dump(self.current_plan_data, stream)
             full_text = stream.getvalue()
 
-            lines = full_text.splitlines()
-            clean_lines = []
-            for line in lines:
-                line_no_comment = re.sub(r'\s*#.*$', '', line).rstrip()
-                if line_no_comment:
-                    clean_lines.append(line_no_comment)
-            self.plan_summary_text.setText("\n".join(clean_lines))
+            self.plan_summary_text.setText(render_plan_summary(full_text))
         except Exception as e:
             self.plan_summary_text.setText(f"渲染预览时出错:\n{e}")
 
     def _update_plan_summary(self, file_path):
-        """读取文件，去除注释和空行，并显示在文本框中。"""
+        """显示文件去除注释和空行后的内容（优先使用缓存）。"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            clean_lines = []
-            for line in lines:
-                line_no_comment = re.sub(r'\s*#.*$', '', line).rstrip()
-                if line_no_comment:
-                    clean_lines.append(line_no_comment)
-            self.plan_summary_text.setText("\n".join(clean_lines))
+            self.plan_summary_text.setText(self.plan_cache.get_summary(file_path))
         except Exception as e:
             self.plan_summary_text.setText(f"读取文件时出错:\n{e}")
 
@@ -599,8 +705,11 @@ class PlanEditorTab(QWidget):
 
         return nodes_data, map_image_path
     
+    @traced("map load")
     def _update_map_display(self, nodes_data, map_image_path):
         """根据传入的数据更新地图显示。"""
+        self._current_nodes_data = None
+        self._update_route_analysis([])
         if map_image_path == "no_map":
             self.map_display_widget.set_text("演习/战役无地图")
             return
@@ -615,6 +724,8 @@ class PlanEditorTab(QWidget):
             pixmap = QPixmap(map_image_path)
             selected_nodes = self.current_plan_data.get('selected_nodes') or []
             self.map_display_widget.set_map_and_nodes(pixmap, nodes_data, selected_nodes)
+            self._current_nodes_data = nodes_data
+            self._update_route_analysis(self.map_display_widget.get_selected_nodes())
         elif map_image_path:
             relative_path = os.path.join(os.path.basename(MAP_PICS_DIR), os.path.relpath(map_image_path, MAP_PICS_DIR))
             self.map_display_widget.set_text(f"地图图片未找到:\n...\\{relative_path}")
@@ -622,23 +733,38 @@ class PlanEditorTab(QWidget):
             plan_type = self.root_combo.currentText().lower()
             self.map_display_widget.set_text(f"不支持的计划类型 '{plan_type}'")
 
+    def _update_route_analysis(self, selected_nodes):
+        """根据当前地图与已选节点刷新路线分析，结果按 (地图, 选择) 缓存。"""
+        if not self._current_nodes_data:
+            self.route_info_label.clear()
+            self.route_info_label.hide()
+            return
+        analysis = analyze_routes(self._current_nodes_data, selected_nodes)
+        self.route_info_label.setText(format_route_summary(analysis))
+        self.route_info_label.show()
+
     def _clear_displays(self):
         """清空计划概要、地图显示和内存数据。"""
         self.current_plan_data = None
         self.plan_summary_text.clear()
         self.map_display_widget.set_text("请选择一个计划文件以显示地图")
+        self._current_nodes_data = None
+        self._update_route_analysis([])
 
         if hasattr(self, 'settings_panel'):
             self.settings_panel.clear_and_hide()
 
+        self.plan_history.reset(None)
         self._set_dirty(False)
         self.save_button.setEnabled(False)
         self.cancel_button.setEnabled(False)
         self._current_plan_file_path = None
+        self._update_plan_usage_label()
 
         if hasattr(self, 'node_settings_panel'):
             self.node_settings_panel.hide()
 
+    @traced("plan load")
     def _on_plan_selected(self, index_or_text):
         """当最终的计划文件被选择时，加载数据并更新UI。"""
         plan_filename = ""
@@ -657,11 +783,12 @@ class PlanEditorTab(QWidget):
 
         if file_path.exists():
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.current_plan_data = self.yaml_manager.load(f) or {}
+                self.current_plan_data, _ = self.plan_cache.get(file_path)
             except Exception as e:
                 print(f"加载计划 {plan_filename} 失败: {e}")
                 self.current_plan_data = {}
+            self._sync_plan_watcher()
+            self.plan_history.reset(self.current_plan_data)
 
             # 重置脏状态
             self._set_dirty(False)
@@ -686,6 +813,7 @@ class PlanEditorTab(QWidget):
             self._clear_displays()
         self._update_file_action_buttons_state()
 
+    @traced("plan save")
     def _save_current_plan(self):
         """
         中央保存函数。保存内存中的当前状态。
@@ -699,14 +827,31 @@ class PlanEditorTab(QWidget):
         data_to_save = self.current_plan_data
         try:
             save_config(self.yaml_manager, data_to_save, self._current_plan_file_path, key_order=key_order)
+            self.plan_cache.put(self._current_plan_file_path, self.current_plan_data)
         except Exception as e:
+            self.plan_cache.invalidate(self._current_plan_file_path)
             print(f"保存计划失败: {e}")
+
+    def _sync_plan_watcher(self):
+        """让文件监视器只监视缓存中的计划文件。"""
+        cached_paths = set(self.plan_cache.paths())
+        watched_paths = set(self.plan_watcher.files())
+        if watched_paths - cached_paths:
+            self.plan_watcher.removePaths(list(watched_paths - cached_paths))
+        if cached_paths - watched_paths:
+            self.plan_watcher.addPaths(list(cached_paths - watched_paths))
+
+    def _on_watched_plan_changed(self, path):
+        """计划文件在外部被修改或删除时，丢弃过期的缓存条目。"""
+        self.plan_cache.discard_if_stale(path)
+        self._sync_plan_watcher()
             
     def _on_node_selection_changed(self, selected_nodes):
         """当用户在地图上勾选节点时，使用工具函数更新配置并设置为脏。"""
         # 当地图选择变化时，立即更新节点设置下拉框的内容
         if hasattr(self, 'node_settings_panel'):
             self.node_settings_panel.update_node_list(selected_nodes)
+        self._update_route_analysis(selected_nodes)
         if self.current_plan_data is None:
             return
         # 删除已取消勾选的节点的 node_args
@@ -727,12 +872,14 @@ class PlanEditorTab(QWidget):
         update_config_value(self.current_plan_data, 'selected_nodes', flow_style_nodes)
         # 设置为脏
         self._set_dirty(True)
+        self._record_user_edit()
 
     def _on_node_settings_changed(self):
         """当节点设置(默认或单独)变化时，更新内存中的数据并设置为脏。"""
         if self.current_plan_data is None:
             return
         self._set_dirty(True)
+        self._record_user_edit()
 
     def _on_custom_ships_updated(self, custom_ships: list):
         """当自定义舰船列表更新时，保存到 ship_name.yaml 文件。"""
@@ -747,7 +894,12 @@ class PlanEditorTab(QWidget):
     def _on_plan_settings_changed(self):
         """当 PlanSettingsWidget 中的数据发生变化时调用。"""
         self._set_dirty(True)
-        self._refresh_displays_from_memory()
+        self._is_applying_edit = True
+        try:
+            self._refresh_displays_from_memory()
+        finally:
+            self._is_applying_edit = False
+        self._record_user_edit()
     
     def can_safely_close_tab(self) -> bool:
         """
@@ -791,39 +943,104 @@ class PlanEditorTab(QWidget):
         else:
             return {}
 
+    def _get_current_plan_key(self):
+        """返回当前计划在引用索引中的键。"""
+        if self._current_plan_file_path is None or not self.plan_root_path:
+            return None
+        return plan_key_from_path(self.plan_root_path, self._current_plan_file_path)
+
+    def _update_plan_usage_label(self, is_deleting=False):
+        """显示当前计划被哪些任务和预设引用。"""
+        description = ""
+        if self.reference_index is not None:
+            description = self.reference_index.describe_references(self._get_current_plan_key())
+        if not description:
+            self.plan_usage_label.hide()
+            return
+        if is_deleting:
+            self.plan_usage_label.setText(f"删除后以下引用将失效：<br>{description}")
+        else:
+            self.plan_usage_label.setText(f"被引用：{description}")
+        self.plan_usage_label.show()
+
+    def _delete_plan_pre_condition_check(self):
+        """进入二次确认前列出受影响的任务与预设。"""
+        if not self.delete_plan_button.isEnabled():
+            return False
+        self._update_plan_usage_label(is_deleting=True)
+        return True
+
+    def _on_rename_plan_clicked(self):
+        """重命名当前计划，并同步改写所有引用。"""
+        old_path = self._current_plan_file_path
+        if old_path is None or self._check_if_dirty_and_block():
+            return
+        validator = PlanValidator(Path(self.current_plan_path_dir))
+        dialog = ValidationInputDialog(self,
+                                     title="重命名计划",
+                                     prompt="请输入新的文件名:",
+                                     validator=validator)
+        dialog.line_edit.setText(old_path.stem)
+        if not dialog.exec(): return
+        new_path = dialog.get_confirmed_value()
+        if not new_path: return
+        try:
+            if self.reference_index is not None:
+                self.reference_index.rename_plan(old_path, new_path, self.plan_root_path)
+            else:
+                old_path.rename(new_path)
+        except Exception as e:
+            print(f"重命名计划失败: {e}")
+            return
+        self.plan_cache.invalidate(old_path)
+        self._sync_plan_watcher()
+        self._populate_plan_combo(self.current_plan_path_dir)
+        self.plan_combo.setCurrentText(new_path.name)
+        self.plan_references_changed.emit()
+
     def _on_delete_plan_clicked(self):
         """处理“确认删除”按钮的点击事件。""" 
         file_to_delete = self._current_plan_file_path
         try:
             file_to_delete.unlink()
+            self.plan_cache.invalidate(file_to_delete)
+            self._sync_plan_watcher()
             self._clear_displays()
             self._populate_plan_combo(self.current_plan_path_dir)
         except Exception: return
+        self.plan_references_changed.emit()
     
+    def _on_lint_plans_clicked(self):
+        """检查 plan_root 下的全部计划并显示报告。"""
+        dialog = PlanLintDialog(self.plan_root_path, self)
+        dialog.exec()
+
+    def _on_bulk_edit_clicked(self):
+        """打开批量编辑对话框，写入后重新加载当前计划。"""
+        if self._check_if_dirty_and_block():
+            return
+        dialog = PlanBulkEditDialog(self.plan_root_path, self)
+        dialog.exec()
+        if dialog.written_files:
+            self._on_plan_file_updated()
+
     def _check_if_dirty_and_block(self) -> bool:
         """检查是否有未保存的更改。"""
         if not self.is_dirty:
             return False # 不脏
         # 应用 "warning" 样式以闪烁按钮
-        self.save_button.setProperty("warning", "true")
-        self.save_button.style().unpolish(self.save_button)
-        self.save_button.style().polish(self.save_button)
+        set_style_property(self.save_button, "warning", "true")
         return True # 很脏，阻止
     
-    def eventFilter(self, watched, event: QEvent):
-        """全局事件过滤器，用于处理点击空白处取消二次确认的逻辑。"""
-        # 仅在当前标签页可见时才处理事件
-        if not self.isVisible():
-            return super().eventFilter(watched, event)
-        # 检查事件类型
-        if event.type() == QEvent.Type.MouseButtonPress:
-            if hasattr(self, 'delete_button_manager') and self.delete_button_manager.is_confirming():
-                clicked_widget = QApplication.widgetAt(event.globalPosition().toPoint())
-                is_on_delete_button = clicked_widget and (
-                    self.delete_plan_button == clicked_widget or 
-                    self.delete_plan_button.isAncestorOf(clicked_widget)
-                )
-                # 如果点击的不是删除按钮，则重置它
-                if not is_on_delete_button:
-                    self.delete_button_manager.reset_state()
-        return super().eventFilter(watched, event)
\ No newline at end of file
+    def _on_app_mouse_press(self, event, clicked_widget):
+        """由全局分发器调用，用于处理点击空白处取消二次确认的逻辑。"""
+        if hasattr(self, 'delete_button_manager') and self.delete_button_manager.is_confirming():
+            is_on_delete_button = clicked_widget and (
+                self.delete_plan_button == clicked_widget or 
+                self.delete_plan_button.isAncestorOf(clicked_widget)
+            )
+            # 如果点击的不是删除按钮，则重置它
+            if not is_on_delete_button:
+                self.delete_button_manager.reset_state()
+                self._update_plan_usage_label()
+        return False
\ No newline at end of file
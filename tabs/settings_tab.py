@@ -12,6 +12,7 @@ from tabs.components.check_box import CustomCheckBox
 from tabs.components.spin_box import CustomSpinBox
 from tabs.components.combo_box import CustomComboBox
 from utils.ui_utils import create_form_layout, create_group
+from utils.style_utils import set_style_property
 from utils.config_utils import update_config_value, save_config, validate_and_save_line_edit
 from constants import (
     SHIP_DISPLAY_ORDER, CATEGORY_DISPLAY_ORDER,
@@ -277,15 +278,11 @@ class SettingsTab(QWidget):
         is_valid = not text or bool(re.match(pattern, text))
 
         if is_valid:
-            line_edit.setProperty("state", "valid")
+            set_style_property(line_edit, "state", "valid")
             value_to_save = text or None
             self._handle_value_change('emulator_name', value_to_save)
         else:
-            line_edit.setProperty("state", "invalid")
-
-        # 刷新输入框样式
-        line_edit.style().unpolish(line_edit)
-        line_edit.style().polish(line_edit)
+            set_style_property(line_edit, "state", "invalid")
 
     def _on_import_settings_clicked(self):
         """打开文件对话框以导入 user_settings.yaml 或 ui_configs.yaml 配置文件。"""
@@ -343,24 +340,19 @@ class SettingsTab(QWidget):
                     is_valid = True
         
         if is_valid:
-            self.plan_root_input.setProperty("state", "valid")
+            set_style_property(self.plan_root_input, "state", "valid")
             if not initial_load:
                 self._handle_value_change('plan_root', directory)
                 self.plan_root_changed.emit() # 发出信号通知其他Tab
         else:
             # 只有在有输入时才标记为无效，空路径不标记
             state = "invalid" if directory else "neutral"
-            self.plan_root_input.setProperty("state", state)
+            set_style_property(self.plan_root_input, "state", state)
             # 如果是用户主动选择的无效路径，则不写入文件
             # 但允许配置文件中初始加载一个空路径
             if not initial_load and not directory:
                  self._handle_value_change('plan_root', '')
 
-
-        # 刷新输入框样式
-        self.plan_root_input.style().unpolish(self.plan_root_input)
-        self.plan_root_input.style().polish(self.plan_root_input)
-
     def _on_destroy_mode_changed(self, index):
         """处理解装模式下拉菜单的变化"""
         value = self.destroy_mode_items[index][1]
@@ -1,5 +1,7 @@
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap
+from utils.style_utils import set_style_property
+from utils.tracing import span
 
 def update_config_value(config_data: dict, path: str, value):
     """
@@ -18,6 +20,36 @@ def update_config_value(config_data: dict, path: str, value):
     d[keys[-1]] = value
 
 
+def create_yaml_manager() -> YAML:
+    """创建与主窗口一致的 ruamel.yaml 往返管理器。"""
+    yaml_manager = YAML()
+    yaml_manager.preserve_quotes = True
+    yaml_manager.default_flow_style = False
+    yaml_manager.indent(mapping=2, sequence=4, offset=2)
+    yaml_manager.boolean_representation = ['False', 'True']
+    return yaml_manager
+
+def order_config_keys(config_data: dict, key_order: list = None):
+    """
+    按 key_order 重新排列顶层键，不在列表中的键保持原顺序追加在后面。
+    key_order 为空时原样返回 config_data。
+    """
+    if not key_order:
+        return config_data
+    ordered_data = CommentedMap()
+    # 保留原映射上的注释与格式信息
+    if isinstance(config_data, CommentedMap):
+        config_data.copy_attributes(ordered_data)
+    # 按照预设顺序拷贝键
+    for key in key_order:
+        if key in config_data:
+            ordered_data[key] = config_data[key]
+    # 拷贝不在预设顺序中的其他键，防止数据丢失
+    for key, value in config_data.items():
+        if key not in ordered_data:
+            ordered_data[key] = value
+    return ordered_data
+
 def save_config(yaml_manager: YAML, config_data: dict, file_path, key_order: list = None):
     """
     使用指定的YAML管理器将配置数据保存到文件，并可选择按指定顺序排序键。
@@ -33,23 +65,10 @@ def save_config(yaml_manager: YAML, config_data: dict, file_path, key_order: lis
     Raises:
         Exception: 当文件写入失败时抛出异常。
     """
-    data_to_save = config_data
-
-    # 如果提供了键顺序列表，则根据它重建字典
-    if key_order:
-        ordered_data = CommentedMap()
-        # 按照预设顺序拷贝键
-        for key in key_order:
-            if key in config_data:
-                ordered_data[key] = config_data[key]
-        # 拷贝不在预设顺序中的其他键，防止数据丢失
-        for key, value in config_data.items():
-            if key not in ordered_data:
-                ordered_data[key] = value
-        data_to_save = ordered_data
+    data_to_save = order_config_keys(config_data, key_order)
 
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with span("config save", file=file_path.name), open(file_path, 'w', encoding='utf-8') as f:
             yaml_manager.dump(data_to_save, f)
     except Exception as e:
         raise Exception(f"保存配置文件 {file_path.name} 失败: {e}")
@@ -138,7 +157,7 @@ def validate_and_save_text_input(
     is_valid = validation_func(text)
 
     if is_valid:
-        line_edit.setProperty("state", "valid")
+        set_style_property(line_edit, "state", "valid")
         try:
             update_config_value(settings_data, config_path, text)
             save_config(yaml_manager, settings_data, settings_path)
@@ -146,7 +165,4 @@ def validate_and_save_text_input(
             if log_signal:
                 log_signal.emit(f"保存配置失败: {e}")
     else:
-        line_edit.setProperty("state", "invalid")
-
-    line_edit.style().unpolish(line_edit)
-    line_edit.style().polish(line_edit)
\ No newline at end of file
+        set_style_property(line_edit, "state", "invalid")
\ No newline at end of file
@@ -0,0 +1,216 @@
+import ast
+import os
+import re
+from pathlib import Path
+from constants import ENCOUNTERS_DIR, FORMATION_ITEMS
+from utils.enemy_rule_compiler import (
+    SHIP_TYPE_COLUMNS, SHIP_TYPE_INDEX, NO_MATCH, compile_rules, match_rules, parse_tokens, evaluate_condition
+)
+
+# 敌方遭遇记录：按 地图/节点 保存定长记录，每条记录为各舰种数量 + 敌方阵型编号 (uint8)
+# 读取时用 np.memmap 映射为 (遭遇数, 列数) 的矩阵，按列即可得到各舰种的数量数组
+
+FORMATION_CODES = {name: i + 1 for i, name in enumerate(FORMATION_ITEMS)}  # 0 表示未知
+FORMATION_COLUMN = len(SHIP_TYPE_COLUMNS)
+RECORD_WIDTH = len(SHIP_TYPE_COLUMNS) + 1
+# 列顺序改变时需要提升版本号，避免读错旧数据
+STORE_VERSION = 1
+RECORD_SUFFIX = '.u8'
+
+_SAFE_NAME_PATTERN = re.compile(r'[^\w\-]')
+
+def _safe_name(name) -> str:
+    return _SAFE_NAME_PATTERN.sub('_', str(name))
+
+class EncounterStore:
+    """以追加方式写入、以内存映射方式读取的遭遇记录库。"""
+    def __init__(self, root_dir=ENCOUNTERS_DIR):
+        self.root_dir = Path(root_dir) / f"v{STORE_VERSION}"
+
+    def _record_path(self, map_key, node) -> Path:
+        return self.root_dir / _safe_name(map_key) / f"{_safe_name(node)}{RECORD_SUFFIX}"
+
+    def append(self, map_key, node, counts: dict, formation: int = 0):
+        """追加一条遭遇记录，counts 为 {舰种: 数量}，未知舰种被忽略。"""
+        record = bytearray(RECORD_WIDTH)
+        for ship_type, count in counts.items():
+            if ship_type in SHIP_TYPE_INDEX:
+                record[SHIP_TYPE_INDEX[ship_type]] = max(0, min(int(count), 255))
+        record[FORMATION_COLUMN] = formation
+        path = self._record_path(map_key, node)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(record)
+
+    def count(self, map_key, node) -> int:
+        try:
+            return os.path.getsize(self._record_path(map_key, node)) // RECORD_WIDTH
+        except OSError:
+            return 0
+
+    def load(self, map_key, node):
+        """返回只读的 (遭遇数, RECORD_WIDTH) 矩阵，没有记录时返回 None。"""
+        import numpy as np
+        rows = self.count(map_key, node)
+        if not rows:
+            return None
+        # 只映射完整的记录，忽略写入中断留下的半条记录
+        return np.memmap(self._record_path(map_key, node), dtype=np.uint8, mode='r', shape=(rows, RECORD_WIDTH))
+
+    def load_many(self, map_key, nodes):
+        """合并多个节点的记录（用于默认节点设置），没有记录时返回 None。"""
+        import numpy as np
+        matrices = [m for m in (self.load(map_key, node) for node in nodes) if m is not None]
+        if not matrices:
+            return None
+        return matrices[0] if len(matrices) == 1 else np.concatenate(matrices)
+
+def rule_coverage(rules, records) -> dict:
+    """
+    计算规则列表在历史遭遇上的命中情况（按 autowsgr 的顺序匹配语义）。
+    返回 total、per_rule (每条规则作为首个命中规则的次数)、by_action ({操作: 次数}) 与 unmatched。
+    规则无效时引发 RuleSyntaxError。
+    """
+    import numpy as np
+    compiled_rules = compile_rules(rules)
+    total = 0 if records is None else len(records)
+    if not total:
+        return {'total': 0, 'per_rule': [0] * len(compiled_rules), 'by_action': {}, 'unmatched': 0}
+    matched = match_rules(compiled_rules, records[:, :FORMATION_COLUMN])
+    hits = np.bincount(matched[matched != NO_MATCH], minlength=len(compiled_rules))
+    by_action = {}
+    for (_, action), hit_count in zip(compiled_rules, hits):
+        by_action[action] = by_action.get(action, 0) + int(hit_count)
+    return {
+        'total': total,
+        'per_rule': [int(hit_count) for hit_count in hits],
+        'by_action': by_action,
+        'unmatched': int((matched == NO_MATCH).sum()),
+    }
+
+def condition_coverage(condition_tokens, records) -> float | None:
+    """返回单个条件在历史遭遇中成立的比例，没有记录时返回 None。"""
+    if records is None or not len(records):
+        return None
+    return float(evaluate_condition(parse_tokens(condition_tokens), records[:, :FORMATION_COLUMN]).mean())
+
+# --- 日志解析 ---
+# 依据 autowsgr 1.4.7 实际输出的日志行。控制台格式见 autowsgr/utils/logger.py：
+#   '{time:HH:mm:ss} autowsgr {level:^7}| {message}'（替身包的输出带日期与毫秒、没有竖线）。
+# - scripts/daily_api.py DailyOperation._get_unfinished_plan_description（每次出征前 logger.info）：
+#   '正在执行的PLAN: 7-46SS, 已出击次数/目标次数: 0/10, ...'，计划名即 normal_fight 下的计划文件名。
+# - fight/normal_fight.py NormalFightInfo._update_ship_point（开启 show_map_node 时）：
+#   timer.logger.debug(self.node)，Logger.debug 输出 str(args)，即 "('B',)"。
+# - game/get_game_info.py get_enemy_condition（每次索敌成功）：timer.logger.debug('enemies:' + str(count))，
+#   即 ("enemies:{'CV': 1, 'DD': 2, 'ALL': 3}",)，只在 DEBUG 级别输出；常规战中 NormalFightInfo._after_match
+#   与 FightInfo._after_match 各调用一次，同一次索敌会输出两行。
+# 因此只有日志级别为 DEBUG 且开启 show_map_node 时才能得到完整的遭遇。run_for_times 出征后输出的“战斗信息”
+# 虽然带有节点与敌舰，但活动与周常脚本不输出计划说明，无从得知地图，不作解析。
+# autowsgr 不输出识别到的敌方阵型（get_enemy_formation 的结果只用于阵型规则），阵型列记为 0（未知）。
+_ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+_PREFIX_PATTERN = re.compile(r'^(?:\d{4}-\d{2}-\d{2} )?\d{2}:\d{2}:\d{2}(?:\.\d+)? autowsgr\s+[A-Z]+\s*\|?\s?')
+_PLAN_PATTERN = re.compile(r'^正在执行的PLAN: (.+?), 已出击次数/目标次数: ')
+_MAP_NODE_PATTERN = re.compile(r"^\('([A-Z])',\)$")
+_ENEMIES_PATTERN = re.compile(r"^\([\"']enemies:(\{.*\})[\"'],\)$")
+# 计划名惯例为 '7-46SS'（7-4 图 6 潜艇）：地图编号只有一位，其后紧跟计划说明
+_PLAN_MAP_PATTERN = re.compile(r'^(\d+-\d)')
+
+def plan_map_key(plan_root, plan_name):
+    """
+    由常规战计划名得到地图（如 '7-4'）：优先读取 plan_root/normal_fight 下的计划文件，
+    读不到时按计划名的惯例取开头的“章节-地图”。
+    """
+    if plan_root:
+        import yaml
+        try:
+            with open(Path(plan_root) / 'normal_fight' / f"{plan_name}.yaml", encoding='utf-8') as f:
+                plan_data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            plan_data = None
+        if isinstance(plan_data, dict) and plan_data.get('chapter') and plan_data.get('map'):
+            return f"{plan_data['chapter']}-{plan_data['map']}"
+    match = _PLAN_MAP_PATTERN.match(str(plan_name))
+    return match.group(1) if match else None
+
+def _literal_dict(text):
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return value if isinstance(value, dict) else None
+
+def _ship_counts(enemies: dict) -> dict:
+    return {ship_type: count for ship_type, count in enemies.items()
+            if ship_type in SHIP_TYPE_INDEX and isinstance(count, int) and count > 0}
+
+class EncounterLogParser:
+    """
+    从 autowsgr 任务日志中提取遭遇记录。
+    地图来自每次出征前的计划说明，节点来自 show_map_node 输出的最近一个节点，
+    索敌成功时的敌舰统计记在该节点上，每次出征中每个节点只记一次。
+    """
+    def __init__(self, resolve_map=None):
+        self.resolve_map = resolve_map or (lambda plan_name: plan_map_key(None, plan_name))
+        self.plan_name = None
+        self.map_key = None
+        self.node = None
+        self._recorded_nodes = set()  # 本次出征已记录的节点
+
+    def feed_line(self, line: str) -> list:
+        """处理一行日志，返回已完成的遭遇 [(map_key, node, counts, formation)]。"""
+        message = _PREFIX_PATTERN.sub('', _ANSI_PATTERN.sub('', line).rstrip(), count=1)
+        enemies_match = _ENEMIES_PATTERN.match(message)
+        if enemies_match:
+            enemies = _literal_dict(enemies_match.group(1))
+            counts = _ship_counts(enemies) if enemies is not None else None
+            if not (self.map_key and self.node and counts) or self.node in self._recorded_nodes:
+                return []
+            self._recorded_nodes.add(self.node)
+            return [(self.map_key, self.node, counts, 0)]
+        node_match = _MAP_NODE_PATTERN.match(message)
+        if node_match:
+            self.node = node_match.group(1)
+            return []
+        plan_match = _PLAN_PATTERN.match(message)
+        if plan_match:
+            self.flush()
+            if plan_match.group(1) != self.plan_name:
+                self.plan_name = plan_match.group(1)
+                self.map_key = self.resolve_map(self.plan_name)
+        return []
+
+    def flush(self) -> list:
+        """结束当前出征。遭遇在读到敌舰统计时即已完成，没有需要补写的记录。"""
+        self.node = None
+        self._recorded_nodes = set()
+        return []
+
+class EncounterRecorder:
+    """将任务日志流中的遭遇写入 EncounterStore。"""
+    def __init__(self, store=None, resolve_map=None):
+        self.store = store or EncounterStore()
+        self.resolve_map = resolve_map
+        self.parser = EncounterLogParser(resolve_map)
+
+    def feed(self, message_chunk: str) -> int:
+        """处理一段日志输出，返回新写入的记录数。"""
+        written = 0
+        for line in message_chunk.splitlines():
+            for encounter in self.parser.feed_line(line):
+                written += self._write(encounter)
+        return written
+
+    def finish(self) -> int:
+        """任务结束时写入尚未完成的遭遇并重置解析状态。"""
+        written = sum(self._write(encounter) for encounter in self.parser.flush())
+        self.parser = EncounterLogParser(self.resolve_map)
+        return written
+
+    def _write(self, encounter) -> int:
+        map_key, node, counts, formation = encounter
+        try:
+            self.store.append(map_key, node, counts, formation)
+        except OSError as e:
+            print(f"写入遭遇记录失败: {e}")
+            return 0
+        return 1
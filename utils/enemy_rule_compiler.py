@@ -0,0 +1,189 @@
+import re
+from typing import NamedTuple
+from constants import ENEMY_SHIP_TYPES, QUANTITIES
+from utils.enemy_rule_utils import SYMBOLS_VALUES, ENEMY_SHIP_TYPES_VALUES, is_valid_action
+
+# 敌方规则编译器：将条件解析为语法树，并对敌方编成矩阵进行批量求值
+# 语法（与 autowsgr 按 Python 表达式求值的优先级一致，and 优先于 or）:
+#   condition  := and_expr ('or' and_expr)*
+#   and_expr   := primary ('and' primary)*
+#   primary    := '(' condition ')' | comparison
+#   comparison := TYPE ('+' TYPE)* SYMBOL QUANTITY
+
+# 编成矩阵的列顺序
+SHIP_TYPE_COLUMNS = tuple(ENEMY_SHIP_TYPES.keys())
+SHIP_TYPE_INDEX = {ship_type: i for i, ship_type in enumerate(SHIP_TYPE_COLUMNS)}
+NO_MATCH = -1
+
+_TOKEN_PATTERN = re.compile(r'>=|<=|==|!=|[<>()+]|[A-Za-z_]+|\d+|\S')
+
+class RuleSyntaxError(ValueError):
+    """规则条件无法解析时引发，position 为出错的标记序号。"""
+    def __init__(self, message, position=None):
+        super().__init__(message)
+        self.position = position
+
+class Comparison(NamedTuple):
+    """原子条件：types 中各舰种数量之和与 value 比较。"""
+    types: tuple
+    op: str
+    value: int
+
+class BoolOp(NamedTuple):
+    """逻辑组合：op 为 'and' 或 'or'，operands 至少两个。"""
+    op: str
+    operands: tuple
+
+def tokenize(condition: str) -> list:
+    """将条件字符串拆分为标记，兼容无空格的写法 (e.g., "BB+CL>1")。"""
+    return _TOKEN_PATTERN.findall(condition)
+
+def _describe(token) -> str:
+    return "条件结尾" if token is None else repr(token)
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def error(self, message):
+        return RuleSyntaxError(message, self.pos)
+
+    def parse(self):
+        if not self.tokens:
+            raise self.error("条件为空")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise self.error(f"多余的标记 {self.peek()!r}")
+        return node
+
+    def parse_or(self):
+        operands = [self.parse_and()]
+        while self.peek() == 'or':
+            self.take()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else BoolOp('or', tuple(operands))
+
+    def parse_and(self):
+        operands = [self.parse_primary()]
+        while self.peek() == 'and':
+            self.take()
+            operands.append(self.parse_primary())
+        return operands[0] if len(operands) == 1 else BoolOp('and', tuple(operands))
+
+    def parse_primary(self):
+        if self.peek() == '(':
+            self.take()
+            node = self.parse_or()
+            if self.take() != ')':
+                raise self.error("缺少右括号")
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        types = [self.expect_type()]
+        while self.peek() == '+':
+            self.take()
+            types.append(self.expect_type())
+        symbol = self.take()
+        if symbol not in SYMBOLS_VALUES:
+            raise self.error(f"应为比较符号，实际为 {_describe(symbol)}")
+        quantity = self.take()
+        if quantity not in QUANTITIES:
+            raise self.error(f"应为 0-6 的数量，实际为 {_describe(quantity)}")
+        return Comparison(tuple(types), symbol, int(quantity))
+
+    def expect_type(self):
+        token = self.take()
+        if token not in ENEMY_SHIP_TYPES_VALUES:
+            raise self.error(f"应为舰船类型，实际为 {_describe(token)}")
+        return token
+
+def parse_tokens(tokens: list):
+    """将内部值标记列表解析为语法树，语法错误时引发 RuleSyntaxError。"""
+    return _Parser(tokens).parse()
+
+def parse_condition(condition):
+    """解析计划文件中的条件字符串。"""
+    if not isinstance(condition, str):
+        raise RuleSyntaxError(f"条件必须是字符串，实际为 {condition!r}")
+    return parse_tokens(tokenize(condition))
+
+def format_condition(node, parent_op=None) -> str:
+    """将语法树还原为以空格分隔的条件字符串（仅在需要时加括号）。"""
+    if isinstance(node, Comparison):
+        return f"{' + '.join(node.types)} {node.op} {node.value}"
+    text = f" {node.op} ".join(format_condition(operand, node.op) for operand in node.operands)
+    # and 优先于 or，只有 and 中的 or 需要括号
+    if parent_op == 'and' and node.op == 'or':
+        return f"( {text} )"
+    return text
+
+def compile_rules(rules) -> list:
+    """将 [[条件, 操作], ...] 编译为 [(语法树, 操作)]，任一规则无效时引发 RuleSyntaxError。"""
+    compiled = []
+    for i, rule in enumerate(rules or []):
+        if not isinstance(rule, (list, tuple)) or len(rule) != 2:
+            raise RuleSyntaxError(f"第 {i + 1} 条规则必须是 [条件, 操作]")
+        condition, action = rule
+        if not is_valid_action(action):
+            raise RuleSyntaxError(f"第 {i + 1} 条规则的操作无效: {action!r}")
+        compiled.append((parse_condition(condition), str(action)))
+    return compiled
+
+# --- 批量求值 ---
+_COMPARE_FUNCS = {
+    '>=': lambda lhs, rhs: lhs >= rhs,
+    '<=': lambda lhs, rhs: lhs <= rhs,
+    '>': lambda lhs, rhs: lhs > rhs,
+    '<': lambda lhs, rhs: lhs < rhs,
+    '==': lambda lhs, rhs: lhs == rhs,
+    '!=': lambda lhs, rhs: lhs != rhs,
+}
+
+def evaluate_condition(node, matrix):
+    """对编成矩阵的每一行求条件的值，返回布尔数组。"""
+    import numpy as np
+    if isinstance(node, Comparison):
+        columns = [SHIP_TYPE_INDEX[ship_type] for ship_type in node.types]
+        if len(columns) == 1:
+            lhs = matrix[:, columns[0]]
+        else:
+            lhs = matrix[:, columns].sum(axis=1, dtype=np.int16)
+        return _COMPARE_FUNCS[node.op](lhs, node.value)
+    results = [evaluate_condition(operand, matrix) for operand in node.operands]
+    reducer = np.logical_and if node.op == 'and' else np.logical_or
+    return reducer.reduce(results)
+
+def match_rules(compiled_rules, matrix):
+    """返回每一行第一条命中的规则序号，均未命中时为 NO_MATCH。"""
+    import numpy as np
+    matched = np.full(len(matrix), NO_MATCH, dtype=np.int16)
+    pending = np.ones(len(matrix), dtype=bool)
+    for i, (node, _) in enumerate(compiled_rules):
+        hits = pending & evaluate_condition(node, matrix)
+        matched[hits] = i
+        pending &= ~hits
+        if not pending.any():
+            break
+    return matched
+
+def evaluate_rules(rules, matrix):
+    """
+    按 autowsgr 的顺序匹配语义批量求值规则列表。
+    返回每一行选择的操作 (object 数组)，均未命中时为 None。
+    """
+    import numpy as np
+    compiled_rules = compile_rules(rules)
+    matched = match_rules(compiled_rules, np.asarray(matrix))
+    actions = np.array([action for _, action in compiled_rules] + [None], dtype=object)
+    # NO_MATCH (-1) 恰好索引到末尾的 None
+    return actions[matched]
@@ -0,0 +1,173 @@
+from functools import lru_cache
+from constants import QUANTITIES
+from utils.enemy_rule_compiler import (
+    SHIP_TYPE_COLUMNS, NO_MATCH, Comparison, BoolOp, compile_rules, format_condition, evaluate_condition, match_rules
+)
+
+# 敌方规则分析：在全部可能的敌方编成上求值，找出永不触发、被遮蔽与恒成立的规则，并给出等价的精简规则列表
+# 每个舰种数量不超过 6，且一支舰队最多 6 艘船，编成空间共 C(27, 6) - 1 = 296009 种
+
+MAX_FLEET_SIZE = max(int(q) for q in QUANTITIES)
+# 化简过程中的常量节点
+ALWAYS = 'ALWAYS'
+NEVER = 'NEVER'
+
+@lru_cache(maxsize=1)
+def enumerate_compositions():
+    """返回所有 1-6 艘船的敌方编成，形状为 (编成数, 舰种数) 的 uint8 矩阵。"""
+    import numpy as np
+    type_count = len(SHIP_TYPE_COLUMNS)
+
+    @lru_cache(maxsize=None)
+    def build(first_type, budget):
+        # 从 first_type 开始的各舰种数量之和不超过 budget 的所有组合
+        if first_type == type_count - 1:
+            return np.arange(budget + 1, dtype=np.uint8).reshape(-1, 1)
+        blocks = []
+        for count in range(budget + 1):
+            rest = build(first_type + 1, budget - count)
+            blocks.append(np.hstack([np.full((len(rest), 1), count, dtype=np.uint8), rest]))
+        return np.vstack(blocks)
+
+    compositions = build(0, MAX_FLEET_SIZE)
+    # 去掉没有敌舰的编成
+    compositions = compositions[compositions.sum(axis=1) > 0]
+    compositions.setflags(write=False)
+    return compositions
+
+class _MaskCache:
+    """缓存语法树节点在编成空间上的取值。"""
+    def __init__(self, space):
+        import numpy as np
+        self.space = space
+        self._cache = {
+            ALWAYS: np.ones(len(space), dtype=bool),
+            NEVER: np.zeros(len(space), dtype=bool),
+        }
+
+    def __call__(self, node):
+        mask = self._cache.get(node)
+        if mask is None:
+            if isinstance(node, BoolOp):
+                import numpy as np
+                reducer = np.logical_and if node.op == 'and' else np.logical_or
+                mask = reducer.reduce([self(operand) for operand in node.operands])
+            else:
+                mask = evaluate_condition(node, self.space)
+            self._cache[node] = mask
+        return mask
+
+def _make_node(op, operands):
+    if not operands:
+        return ALWAYS if op == 'and' else NEVER
+    return operands[0] if len(operands) == 1 else BoolOp(op, tuple(operands))
+
+def _simplify(node, masks, trivial_terms):
+    """化简条件：折叠恒真/恒假的子条件，展平同类逻辑并删除不影响结果的子条件。"""
+    import numpy as np
+    if isinstance(node, Comparison):
+        mask = masks(node)
+        if mask.all():
+            trivial_terms.append((node, True))
+            return ALWAYS
+        if not mask.any():
+            trivial_terms.append((node, False))
+            return NEVER
+        return node
+    absorbing, identity = (NEVER, ALWAYS) if node.op == 'and' else (ALWAYS, NEVER)
+    operands = []
+    for operand in node.operands:
+        simplified = _simplify(operand, masks, trivial_terms)
+        if simplified == absorbing:
+            return absorbing
+        if simplified == identity:
+            continue
+        # 展平 (a and b) and c
+        children = simplified.operands if isinstance(simplified, BoolOp) and simplified.op == node.op else (simplified,)
+        for child in children:
+            if child not in operands:
+                operands.append(child)
+    # 逐个尝试删除子条件，结果不变则删除
+    target = masks(_make_node(node.op, operands))
+    for operand in list(reversed(operands)):
+        candidate = [o for o in operands if o != operand]
+        if candidate and np.array_equal(masks(_make_node(node.op, candidate)), target):
+            operands = candidate
+    return _make_node(node.op, operands)
+
+def analyze_rules(rules) -> dict:
+    """
+    分析规则列表，规则无效时引发 RuleSyntaxError。
+    返回:
+        never_fires: 条件永不成立的规则序号
+        shadowed: 条件可成立但总被前面的规则先命中的规则序号
+        always_true: 条件恒成立的规则序号（其后的规则都不会被执行）
+        trivial_terms: [(规则序号, 子条件文本, 是否恒成立)]
+        simplified: [(规则序号, 原条件, 化简后条件)]
+        normalized: 等价的精简规则列表 [[条件, 操作]]
+        is_equivalent: 精简结果在全部编成上与原规则选择相同的操作
+    """
+    import numpy as np
+    compiled_rules = compile_rules(rules)
+    space = enumerate_compositions()
+    masks = _MaskCache(space)
+    matched = match_rules(compiled_rules, space)
+    first_hits = np.bincount(matched[matched != NO_MATCH], minlength=len(compiled_rules))
+
+    result = {
+        'never_fires': [], 'shadowed': [], 'always_true': [],
+        'trivial_terms': [], 'simplified': [], 'normalized': [], 'is_equivalent': True,
+    }
+    for i, (node, action) in enumerate(compiled_rules):
+        mask = masks(node)
+        if not mask.any():
+            result['never_fires'].append(i)
+            continue
+        if mask.all():
+            result['always_true'].append(i)
+        if not first_hits[i]:
+            result['shadowed'].append(i)
+            continue
+        trivial_terms = []
+        simplified = _simplify(node, masks, trivial_terms)
+        if isinstance(node, BoolOp):
+            for term, is_always in trivial_terms:
+                result['trivial_terms'].append((i, format_condition(term), is_always))
+        original_text = format_condition(node)
+        # 恒成立的条件无法用语法表示为常量，保留原条件
+        new_text = original_text if simplified in (ALWAYS, NEVER) else format_condition(simplified)
+        if new_text != original_text:
+            result['simplified'].append((i, original_text, new_text))
+        result['normalized'].append([new_text, action])
+
+    original_actions = match_rules(compiled_rules, space)
+    normalized_rules = compile_rules(result['normalized'])
+    normalized_actions = match_rules(normalized_rules, space)
+    original_labels = np.array([action for _, action in compiled_rules] + [None], dtype=object)[original_actions]
+    normalized_labels = np.array([action for _, action in normalized_rules] + [None], dtype=object)[normalized_actions]
+    result['is_equivalent'] = bool((original_labels == normalized_labels).all())
+    if not result['is_equivalent']:
+        # 化简出错时退回原规则，保证不会改变行为
+        result['normalized'] = [[condition, str(action)] for condition, action in rules]
+    return result
+
+def has_findings(analysis) -> bool:
+    return bool(
+        analysis['never_fires'] or analysis['shadowed'] or analysis['always_true']
+        or analysis['trivial_terms'] or analysis['simplified']
+    )
+
+def describe_findings(analysis) -> list:
+    """将分析结果转换为说明文本列表（规则序号从 1 开始）。"""
+    lines = []
+    for i in analysis['never_fires']:
+        lines.append(f"规则 {i + 1} 的条件永不成立，不会触发")
+    for i in analysis['shadowed']:
+        lines.append(f"规则 {i + 1} 被前面的规则完全覆盖，不会触发")
+    for i in analysis['always_true']:
+        lines.append(f"规则 {i + 1} 的条件恒成立，其后的规则都不会触发")
+    for i, term, is_always in analysis['trivial_terms']:
+        lines.append(f"规则 {i + 1} 的子条件 \"{term}\" {'恒成立' if is_always else '永不成立'}")
+    for i, original_text, new_text in analysis['simplified']:
+        lines.append(f"规则 {i + 1} 可简化为 \"{new_text}\"")
+    return lines
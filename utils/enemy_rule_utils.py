@@ -0,0 +1,25 @@
+from constants import ENEMY_SHIP_TYPES, SYMBOLS, LOGIC_OPS, ACTION_ITEMS
+
+# 敌方规则的显示文本与内部值映射，供规则编辑对话框与计划检查共用（语法解析见 enemy_rule_compiler）
+
+SYMBOLS_TEXT_TO_VALUE = {v: k for k, v in SYMBOLS.items()}
+LOGIC_OPS_TEXT_TO_VALUE = {v: k for k, v in LOGIC_OPS.items()}
+ENEMY_SHIP_TYPES_TEXT_TO_VALUE = {v: k for k, v in ENEMY_SHIP_TYPES.items()}
+
+LOGIC_OPS_VALUES = set(LOGIC_OPS.keys())
+SYMBOLS_VALUES = set(SYMBOLS.keys())
+ENEMY_SHIP_TYPES_VALUES = set(ENEMY_SHIP_TYPES.keys())
+
+def to_internal_value(text: str) -> str:
+    """将积木的显示文本转换为内部值，未知文本原样返回。"""
+    if text in ENEMY_SHIP_TYPES_TEXT_TO_VALUE:
+        return ENEMY_SHIP_TYPES_TEXT_TO_VALUE[text]
+    if text in SYMBOLS_TEXT_TO_VALUE:
+        return SYMBOLS_TEXT_TO_VALUE[text]
+    if text in LOGIC_OPS_TEXT_TO_VALUE:
+        return LOGIC_OPS_TEXT_TO_VALUE[text]
+    return text
+
+def is_valid_action(action) -> bool:
+    """检查规则的操作是否为撤退、迂回或阵型编号。"""
+    return str(action) in ACTION_ITEMS
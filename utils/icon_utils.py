@@ -1,24 +1,77 @@
 # 自定义实用函数
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
 from PySide6.QtCore import QSize, QByteArray
-from PySide6.QtGui import QPixmap, QPainter
+from PySide6.QtGui import QPixmap, QPainter, QGuiApplication
 from PySide6.QtSvg import QSvgRenderer
 from PySide6.QtCore import Qt
-from constants import ICONS_DIR
+from constants import ICONS_DIR, ICON_CACHE_DIR
 
-def create_colored_pixmap(svg_path: str, color: str, size: QSize) -> QPixmap:
-    """从SVG文件创建并返回一个着色后的、指定尺寸的QPixmap"""
+# 着色图标缓存：内存中按 (图标, 颜色, 尺寸, 设备像素比) 保存渲染结果，
+# 磁盘上按内容哈希保存 PNG，下次启动时直接读取而不再渲染 SVG
+PIXMAP_CACHE_SIZE = 256
+# 设为 False 可关闭磁盘缓存
+DISK_CACHE_ENABLED = True
+
+_pixmap_cache = OrderedDict()
+
+@lru_cache(maxsize=64)
+def _read_svg(svg_path: str) -> tuple:
+    """返回 (SVG 文本, 内容哈希)，每个文件只读取一次。"""
     with open(svg_path, 'r', encoding='utf-8') as f:
         svg_data = f.read()
+    return svg_data, hashlib.sha1(svg_data.encode('utf-8')).hexdigest()
+
+def _default_device_pixel_ratio() -> float:
+    app = QGuiApplication.instance()
+    return app.devicePixelRatio() if app is not None else 1.0
+
+def _render(svg_data: str, color: str, width: int, height: int, ratio: float) -> QPixmap:
     colored_svg_data = svg_data.replace('currentColor', color, -1)
     renderer = QSvgRenderer(QByteArray(colored_svg_data.encode('utf-8')))
-    # 直接创建目标尺寸的Pixmap
-    pixmap = QPixmap(size)
+    # 按物理像素渲染，再标记设备像素比，使高分屏上的图标保持清晰
+    pixmap = QPixmap(round(width * ratio), round(height * ratio))
     pixmap.fill(Qt.GlobalColor.transparent)
     painter = QPainter(pixmap)
     renderer.render(painter)
     painter.end()
+    pixmap.setDevicePixelRatio(ratio)
     return pixmap
 
+def _load_or_render(svg_path, color, width, height, ratio) -> QPixmap:
+    svg_data, content_hash = _read_svg(svg_path)
+    if not DISK_CACHE_ENABLED:
+        return _render(svg_data, color, width, height, ratio)
+    cache_key = f"{content_hash}|{color}|{width}x{height}@{ratio}"
+    cache_file = ICON_CACHE_DIR / f"{hashlib.sha1(cache_key.encode('utf-8')).hexdigest()}.png"
+    pixmap = QPixmap()
+    if cache_file.exists() and pixmap.load(str(cache_file), 'PNG'):
+        pixmap.setDevicePixelRatio(ratio)
+        return pixmap
+    pixmap = _render(svg_data, color, width, height, ratio)
+    try:
+        ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        pixmap.save(str(cache_file), 'PNG')
+    except OSError as e:
+        print(f"写入图标缓存失败: {e}")
+    return pixmap
+
+def create_colored_pixmap(svg_path: str, color: str, size: QSize, device_pixel_ratio: float = None) -> QPixmap:
+    """从SVG文件创建并返回一个着色后的、指定尺寸的QPixmap，结果会被缓存"""
+    ratio = round(device_pixel_ratio or _default_device_pixel_ratio(), 2)
+    key = (str(svg_path), color, size.width(), size.height(), ratio)
+    pixmap = _pixmap_cache.get(key)
+    if pixmap is None:
+        pixmap = _load_or_render(str(svg_path), color, size.width(), size.height(), ratio)
+        _pixmap_cache[key] = pixmap
+        if len(_pixmap_cache) > PIXMAP_CACHE_SIZE:
+            _pixmap_cache.popitem(last=False)
+    else:
+        _pixmap_cache.move_to_end(key)
+    # QPixmap 为隐式共享，复制开销很小，且调用方修改时不会影响缓存
+    return QPixmap(pixmap)
+
 def get_icon_path(icon_name: str) -> str:
     """根据图标名称获取完整的SVG文件路径"""
-    return str(ICONS_DIR / f'{icon_name}.svg')
\ No newline at end of file
+    return str(ICONS_DIR / f'{icon_name}.svg')
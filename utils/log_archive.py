@@ -0,0 +1,352 @@
+import gzip
+import mmap
+import queue
+import re
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from utils.log_search import LogSearchIndex, SEARCH_INDEX_SUFFIX
+
+# 磁盘日志归档：任务输出由后台线程按 任务/日期 写入分段文件，超过大小上限时换新段，
+# 已关闭的分段在换段或下次启动时压缩为 .gz。每个分段带一个 .idx 稀疏索引，每 INDEX_STRIDE 行记录一次
+# (字节偏移 uint64, 到达时间 float64)，读取时用 mmap 映射日志、用 np.memmap 映射索引，
+# 按行号或时间定位时只需二分索引并扫描不超过 INDEX_STRIDE 行，不需要把文件读入内存。
+# 另有 .sidx 检索索引（见 utils/log_search.py），以 INDEX_STRIDE 行为一块记录倒排表与级别位图，
+# 由写入线程随写随建、定期保存，查看时只需为保存之后新写入的行补建。
+
+INDEX_STRIDE = 64
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+LOG_SUFFIX = '.log'
+INDEX_SUFFIX = '.idx'
+COMPRESSED_SUFFIX = '.log.gz'
+# 正在写入的分段每隔这么多秒保存一次检索索引，换段与退出时也会保存
+SEARCH_INDEX_SAVE_INTERVAL_S = 60.0
+# 查看时为检索索引补建未覆盖的行，每次读取的行数
+SEARCH_CATCHUP_LINES = 64 * INDEX_STRIDE
+# 每次写入前最多合并的待写日志块数
+MAX_BATCH = 500
+# 查看压缩分段时解压到任务目录下的缓存目录，超过一天的缓存在下次启动时删除
+CACHE_DIR_NAME = '.cache'
+CACHE_MAX_AGE_S = 24 * 3600
+
+_INDEX_ENTRY = struct.Struct('<Qd')
+_SEGMENT_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})_(\d{3})(?:\.log|\.log\.gz)$')
+_SAFE_NAME_PATTERN = re.compile(r'[^\w\-]')
+_STOP = object()
+
+def _safe_name(name) -> str:
+    return _SAFE_NAME_PATTERN.sub('_', str(name)) or '_'
+
+class _SegmentWriter:
+    """一个正在写入的分段及其索引"""
+    def __init__(self, log_path: Path):
+        self.log_path = log_path
+        self.day = log_path.name[:10]
+        self.log_file = open(log_path, 'ab')
+        self.index_file = open(log_path.with_suffix(INDEX_SUFFIX), 'ab')
+        self.size = self.log_file.tell()
+        self.line_count = 0
+        self.search_index = LogSearchIndex(block_size=INDEX_STRIDE)
+        self.search_index_saved = time.monotonic()
+        self.search_index_dirty = False
+
+    def write_lines(self, lines: list, timestamp: float):
+        data = bytearray()
+        index = bytearray()
+        for line in lines:
+            if self.line_count % INDEX_STRIDE == 0:
+                index += _INDEX_ENTRY.pack(self.size + len(data), timestamp)
+            data += line.encode('utf-8', errors='replace') + b'\n'
+            self.line_count += 1
+        self.log_file.write(data)
+        self.index_file.write(index)
+        self.size += len(data)
+        self.search_index.add_lines(lines)
+        self.search_index_dirty = True
+
+    def flush(self):
+        self.log_file.flush()
+        self.index_file.flush()
+        # 检索索引在日志落盘之后保存，保证索引覆盖的行在文件中都已存在
+        if self.search_index_dirty and time.monotonic() - self.search_index_saved >= SEARCH_INDEX_SAVE_INTERVAL_S:
+            self.save_search_index()
+
+    def save_search_index(self):
+        self.search_index.save(self.log_path.with_suffix(SEARCH_INDEX_SUFFIX))
+        self.search_index_saved = time.monotonic()
+        self.search_index_dirty = False
+
+    def close(self):
+        self.log_file.close()
+        self.index_file.close()
+        if self.search_index_dirty:
+            try:
+                self.save_search_index()
+            except OSError as e:
+                print(f"保存日志检索索引失败: {e}")
+
+class LogArchive:
+    """
+    任务日志的磁盘归档。append() 只把日志放入队列，由后台线程写入
+    root_dir/<任务名>/<日期>_<序号>.log，写满 segment_max_bytes 后换新段。
+    """
+    def __init__(self, root_dir, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.root_dir = Path(root_dir)
+        self.segment_max_bytes = segment_max_bytes
+        self._queue = queue.SimpleQueue()
+        self._writers = {}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="LogArchiveWriter", daemon=True)
+            self._thread.start()
+
+    def append(self, task_name: str, text: str):
+        if self._thread is not None:
+            self._queue.put((task_name, time.time(), text))
+
+    def close(self, timeout: float = 5.0):
+        """写完队列中剩余的日志后停止后台线程"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ---------- 后台线程 ----------
+
+    def _run(self):
+        for task_dir in self._task_dirs():
+            self._compress_old_segments(task_dir)
+            self._clean_cache(task_dir)
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = False
+            touched = set()
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                    continue
+                task_name, timestamp, text = item
+                lines = text.splitlines()
+                if not lines:
+                    continue
+                try:
+                    self._writer_for(task_name, timestamp).write_lines(lines, timestamp)
+                    touched.add(task_name)
+                except OSError as e:
+                    print(f"写入日志归档失败: {e}")
+            for task_name in touched:
+                try:
+                    self._writers[task_name].flush()
+                except OSError as e:
+                    print(f"写入日志归档失败: {e}")
+            if stopping:
+                break
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def _task_dirs(self):
+        if not self.root_dir.is_dir():
+            return []
+        return [path for path in self.root_dir.iterdir() if path.is_dir()]
+
+    def _writer_for(self, task_name: str, timestamp: float) -> _SegmentWriter:
+        day = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+        writer = self._writers.get(task_name)
+        if writer is not None and writer.day == day and writer.size < self.segment_max_bytes:
+            return writer
+        if writer is not None:
+            writer.close()
+        task_dir = self.root_dir / _safe_name(task_name)
+        task_dir.mkdir(parents=True, exist_ok=True)
+        # 每次都开新段，不续写已有分段，索引中的行号因此总是从 0 开始
+        writer = self._writers[task_name] = _SegmentWriter(task_dir / f"{day}_{self._next_sequence(task_dir, day):03d}{LOG_SUFFIX}")
+        self._compress_old_segments(task_dir)
+        return writer
+
+    @staticmethod
+    def _next_sequence(task_dir: Path, day: str) -> int:
+        sequences = [int(match.group(2)) for match in map(_SEGMENT_PATTERN.match, (p.name for p in task_dir.iterdir()))
+                     if match and match.group(1) == day]
+        return max(sequences, default=-1) + 1
+
+    def _compress_old_segments(self, task_dir: Path):
+        """压缩所有已关闭的未压缩分段（按大小轮换出的当天分段也包括在内），正在写入的分段除外"""
+        open_paths = {writer.log_path for writer in self._writers.values()}
+        for path in sorted(task_dir.glob(f'*{LOG_SUFFIX}')):
+            if path in open_paths:
+                continue
+            target = path.with_name(path.stem + COMPRESSED_SUFFIX)
+            try:
+                with open(path, 'rb') as source, gzip.open(target, 'wb', compresslevel=6) as compressed:
+                    shutil.copyfileobj(source, compressed, 1024 * 1024)
+                path.unlink()
+            except OSError as e:
+                print(f"压缩日志分段失败: {e}")
+                target.unlink(missing_ok=True)
+
+    @staticmethod
+    def _clean_cache(task_dir: Path):
+        """删除查看压缩分段时解压出的、一天前的缓存"""
+        cutoff = time.time() - CACHE_MAX_AGE_S
+        for path in (task_dir / CACHE_DIR_NAME).glob(f'*{LOG_SUFFIX}'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+# ---------- 读取 ----------
+
+def list_tasks(root_dir) -> list:
+    root_dir = Path(root_dir)
+    if not root_dir.is_dir():
+        return []
+    return sorted(path.name for path in root_dir.iterdir() if path.is_dir() and not path.name.startswith('.'))
+
+def list_segments(root_dir, task_name: str) -> list:
+    """返回任务的全部分段路径，按日期与序号从新到旧排列"""
+    task_dir = Path(root_dir) / _safe_name(task_name)
+    if not task_dir.is_dir():
+        return []
+    segments = [path for path in task_dir.iterdir() if _SEGMENT_PATTERN.match(path.name)]
+    return sorted(segments, key=lambda path: path.name, reverse=True)
+
+def segment_label(path: Path) -> str:
+    match = _SEGMENT_PATTERN.match(path.name)
+    label = f"{match.group(1)} #{int(match.group(2)) + 1}"
+    return label + "（已压缩）" if path.name.endswith(COMPRESSED_SUFFIX) else label
+
+class LogSegmentReader:
+    """
+    只读打开一个分段。压缩的分段先解压到同目录下的 .cache 中再映射。
+    正在写入的分段也可以打开，行数以打开时的文件大小为准，可调用 reload() 刷新。
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self._mmap = None
+        self._index = None
+        self._search_index = None
+        self.reload()
+
+    def _data_path(self) -> Path:
+        if not self.path.name.endswith(COMPRESSED_SUFFIX):
+            return self.path
+        cache_path = self.path.parent / CACHE_DIR_NAME / self.path.name[:-len('.gz')]
+        if not cache_path.exists() or cache_path.stat().st_mtime < self.path.stat().st_mtime:
+            cache_path.parent.mkdir(exist_ok=True)
+            with gzip.open(self.path, 'rb') as compressed, open(cache_path, 'wb') as target:
+                shutil.copyfileobj(compressed, target, 1024 * 1024)
+        return cache_path
+
+    def reload(self):
+        import numpy as np
+        self.close()
+        data_path = self._data_path()
+        self._file = open(data_path, 'rb')
+        self.size = data_path.stat().st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        index_path = self.path.parent / (self.path.name.split('.')[0] + INDEX_SUFFIX)
+        entries = index_path.stat().st_size // _INDEX_ENTRY.size if index_path.exists() else 0
+        dtype = np.dtype([('offset', '<u8'), ('time', '<f8')])
+        index = np.memmap(index_path, dtype=dtype, mode='r', shape=(entries,)) if entries else np.zeros(0, dtype)
+        # 界面进程异常退出时索引可能比日志多写了几条，只使用指向文件内的条目
+        valid = int(np.searchsorted(index['offset'], self.size, side='left'))
+        self._index = index[:valid]
+        self.line_count = self._count_lines()
+
+    def _count_lines(self) -> int:
+        if self._mmap is None:
+            return 0
+        if len(self._index) == 0:
+            return self._count_newlines(0, self.size)
+        last = len(self._index) - 1
+        tail_start = int(self._index['offset'][last])
+        return last * INDEX_STRIDE + self._count_newlines(tail_start, self.size)
+
+    def _count_newlines(self, start: int, end: int) -> int:
+        count = 0
+        position = self._mmap.find(b'\n', start, end)
+        while position != -1:
+            count += 1
+            position = self._mmap.find(b'\n', position + 1, end)
+        return count
+
+    def line_offset(self, line: int) -> int:
+        """第 line 行（从 0 开始）的起始字节偏移"""
+        line = max(0, min(line, self.line_count))
+        block = min(line // INDEX_STRIDE, len(self._index) - 1)
+        if block < 0:
+            position, remaining = 0, line
+        else:
+            position, remaining = int(self._index['offset'][block]), line - block * INDEX_STRIDE
+        for _ in range(remaining):
+            next_newline = self._mmap.find(b'\n', position)
+            if next_newline == -1:
+                return self.size
+            position = next_newline + 1
+        return position
+
+    def read_lines(self, start: int, count: int) -> list:
+        if self._mmap is None or count <= 0:
+            return []
+        begin = self.line_offset(start)
+        end = self.line_offset(start + count)
+        return self._mmap[begin:end].decode('utf-8', errors='replace').splitlines()
+
+    def line_at_time(self, timestamp: float) -> int:
+        """返回到达时间不晚于 timestamp 的最后一个索引块的首行，精度为 INDEX_STRIDE 行"""
+        import numpy as np
+        if len(self._index) == 0:
+            return 0
+        block = int(np.searchsorted(self._index['time'], timestamp, side='right')) - 1
+        return max(0, block) * INDEX_STRIDE
+
+    def time_range(self) -> tuple:
+        if len(self._index) == 0:
+            return None, None
+        return float(self._index['time'][0]), float(self._index['time'][-1])
+
+    def search_index(self) -> LogSearchIndex:
+        """
+        返回覆盖当前全部行的检索索引。先读取写入线程保存的 .sidx，
+        再为其后新写入的行补建；补建的部分只保存在内存中，不写回文件。
+        """
+        if self._search_index is None:
+            index_path = self.path.parent / (self.path.name.split('.')[0] + SEARCH_INDEX_SUFFIX)
+            index = None
+            if index_path.exists():
+                try:
+                    index = LogSearchIndex.load(index_path)
+                except (OSError, ValueError, struct.error) as e:
+                    print(f"读取日志检索索引失败，将重新建立: {e}")
+            if index is None or index.block_size != INDEX_STRIDE or index.line_count > self.line_count:
+                index = LogSearchIndex(block_size=INDEX_STRIDE)
+            self._search_index = index
+        index = self._search_index
+        while index.line_count < self.line_count:
+            lines = self.read_lines(index.line_count, min(SEARCH_CATCHUP_LINES, self.line_count - index.line_count))
+            if not lines:
+                break
+            index.add_lines(lines)
+        return index
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index = None
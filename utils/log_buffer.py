@@ -0,0 +1,41 @@
+from collections import deque
+from itertools import islice
+
+class LogRingBuffer:
+    """
+    定长的日志行缓冲区，只保存去除前缀后的原始文本，不做 HTML 转换。
+    超出容量时丢弃最旧的行；total_written 记录累计写入的行数，
+    调用方可以据此计算某个时间点之后新增了多少行。
+    每行的编号即写入时的 total_written，缓冲区中最旧一行的编号为 first_id。
+    """
+    def __init__(self, capacity: int = 5000):
+        self._lines = deque(maxlen=capacity)
+        self.total_written = 0
+
+    def extend(self, lines: list):
+        self._lines.extend(lines)
+        self.total_written += len(lines)
+
+    @property
+    def first_id(self) -> int:
+        return self.total_written - len(self._lines)
+
+    def lines_from(self, line_id: int, count: int) -> list:
+        """返回从编号 line_id 开始的至多 count 行；line_id 已被丢弃时返回空列表"""
+        start = line_id - self.first_id
+        if start < 0 or count <= 0:
+            return []
+        return list(islice(self._lines, start, start + count))
+
+    def tail(self, count: int) -> list:
+        """返回最新的 count 行（按时间顺序）。"""
+        if count <= 0:
+            return []
+        # 从尾部向前取，避免 deque 中间位置的随机访问
+        return list(islice(reversed(self._lines), count))[::-1]
+
+    def clear(self):
+        self._lines.clear()
+
+    def __len__(self):
+        return len(self._lines)
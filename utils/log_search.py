@@ -0,0 +1,258 @@
+import json
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+# 日志全文检索：日志到达时增量建立倒排索引，查询时不再扫描全部日志。
+# - 中文按单字与相邻双字（bigram）切分，英文与数字按连续字母数字串中的三字母组（trigram）切分；
+#   查询时取各词项倒排表的交集得到候选，再逐行核对子串。查询中只有不足三个字符的英文串时
+#   没有可用的词项，退回按级别逐行核对。
+# - 倒排表记录的是“块”编号（line // block_size），界面中的环形缓冲区按行建索引（block_size=1），
+#   磁盘归档按 .idx 的 INDEX_STRIDE 行一块建索引，倒排表因此小几十倍，核对时按块读取。
+# - 每个级别一张位图，第 i 位表示第 i 行属于该级别；没有级别标记的行（如 Traceback 的续行）沿用上一行的级别。
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+SEARCH_INDEX_SUFFIX = '.sidx'
+
+_ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+_LEVEL_PATTERN = re.compile(r'\b(DEBUG|INFO|SUCCESS|WARNING|WARN|ERROR|CRITICAL)\b')
+_LEVEL_ALIASES = {'SUCCESS': 'INFO', 'WARN': 'WARNING', 'CRITICAL': 'ERROR'}
+# 级别标记只在行首这么多个字符内查找，避免把消息正文中的 ERROR 当作级别
+LEVEL_PREFIX_CHARS = 64
+_CJK_RUN_PATTERN = re.compile(r'[㐀-鿿豈-﫿]+')
+_TRIGRAM_PATTERN = re.compile(r'(?=([a-z0-9_]{3}))')
+
+_FILE_HEADER = struct.Struct('<4sBIQQI')
+_FILE_MAGIC = b'AWSI'
+_FILE_VERSION = 1
+
+def strip_ansi(line: str) -> str:
+    return _ANSI_PATTERN.sub('', line)
+
+def detect_level(text: str):
+    """返回行首附近的日志级别，没有级别标记时返回 None"""
+    match = _LEVEL_PATTERN.search(text, 0, LEVEL_PREFIX_CHARS)
+    if match is None:
+        return 'ERROR' if text.startswith('Traceback') else None
+    level = match.group(1)
+    return _LEVEL_ALIASES.get(level, level)
+
+def index_terms(text: str) -> set:
+    """一行文本的全部词项（已小写、去重）"""
+    text = text.lower()
+    terms = set(_TRIGRAM_PATTERN.findall(text))
+    for run in _CJK_RUN_PATTERN.findall(text):
+        terms.update(run)
+        terms.update([run[i:i + 2] for i in range(len(run) - 1)])
+    return terms
+
+def query_terms(query: str) -> set:
+    """查询串必须全部命中的词项；中文只需双字即可覆盖，单字仅在查询本身只有一个字时使用"""
+    query = query.lower()
+    terms = set(_TRIGRAM_PATTERN.findall(query))
+    for run in _CJK_RUN_PATTERN.findall(query):
+        if len(run) == 1:
+            terms.add(run)
+        else:
+            terms.update([run[i:i + 2] for i in range(len(run) - 1)])
+    return terms
+
+class LogSearchIndex:
+    """
+    按行追加的倒排索引与级别位图。行号从 0 开始连续递增；
+    trim() 丢弃某行之前的倒排记录，用于只保留最近若干行的环形缓冲区。
+    """
+    def __init__(self, block_size: int = 1):
+        self.block_size = block_size
+        self.line_count = 0
+        self.first_line = 0
+        self._postings = {}
+        self._level_bits = {level: bytearray() for level in LEVELS}
+        self._last_level = 'INFO'
+        self._candidate_cache = (None, None, None)
+
+    # ---------- 建立索引 ----------
+
+    def add_lines(self, lines):
+        postings = self._postings
+        for line in lines:
+            text = strip_ansi(line)
+            level = detect_level(text) or self._last_level
+            self._last_level = level
+            line_id = self.line_count
+            bits = self._level_bits[level]
+            byte_index = line_id >> 3
+            if byte_index >= len(bits):
+                bits.extend(bytes(byte_index - len(bits) + 1))
+            bits[byte_index] |= 1 << (line_id & 7)
+            block = line_id // self.block_size
+            for term in index_terms(text):
+                posting = postings.get(term)
+                if posting is None:
+                    postings[term] = array('I', (block,))
+                elif posting[-1] != block:
+                    if not isinstance(posting, array):
+                        posting = postings[term] = array('I', posting)
+                    posting.append(block)
+            self.line_count += 1
+
+    def trim(self, first_line: int):
+        """丢弃 first_line 之前的块的倒排记录（级别位图很小，保留不动）"""
+        first_block = first_line // self.block_size
+        if first_line <= self.first_line:
+            return
+        self.first_line = first_line
+        for term in list(self._postings):
+            posting = self._postings[term]
+            cut = bisect_left(posting, first_block)
+            if cut == len(posting):
+                del self._postings[term]
+            elif cut:
+                self._postings[term] = array('I', posting[cut:])
+        self._candidate_cache = (None, None, None)
+
+    # ---------- 查询 ----------
+
+    def level_of(self, line_id: int):
+        byte_index, mask = line_id >> 3, 1 << (line_id & 7)
+        for level, bits in self._level_bits.items():
+            if byte_index < len(bits) and bits[byte_index] & mask:
+                return level
+        return None
+
+    def candidate_blocks(self, query: str):
+        """
+        可能包含 query 的块编号（升序）；query 中没有可索引的字符时返回 None，表示所有块都是候选。
+        结果按 (查询, 行数) 缓存，连续翻找下一个命中时不重复求交集。
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+        cached_query, cached_count, cached_blocks = self._candidate_cache
+        if cached_query == query and cached_count == self.line_count:
+            return cached_blocks
+        postings = []
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                postings = []
+                break
+            postings.append(posting)
+        if not postings:
+            blocks = []
+        else:
+            postings.sort(key=len)
+            blocks = [block for block in postings[0]
+                      if all(_contains(other, block) for other in postings[1:])]
+        first_block = self.first_line // self.block_size
+        if blocks and blocks[0] < first_block:
+            blocks = blocks[bisect_left(blocks, first_block):]
+        self._candidate_cache = (query, self.line_count, blocks)
+        return blocks
+
+    def iter_hits(self, query: str, levels, start_line: int, backward: bool, read_lines):
+        """
+        从 start_line（含）开始向后或向前逐个产生命中的行号。
+        read_lines(first, count) 返回从 first 开始的 count 行原文。
+        查询为空时只按级别筛选。
+        """
+        levels = [self._level_bits[level] for level in levels if level in self._level_bits]
+        if not levels:
+            return
+        needle = query.lower()
+        blocks = self.candidate_blocks(query) if needle else None
+        block_size = self.block_size
+        start_line = max(self.first_line, min(start_line, self.line_count - 1))
+        if start_line < self.first_line or self.line_count == 0:
+            return
+        start_block = start_line // block_size
+        if blocks is None:
+            first_block = self.first_line // block_size
+            last_block = (self.line_count - 1) // block_size
+            block_iter = range(start_block, first_block - 1, -1) if backward else range(start_block, last_block + 1)
+        elif backward:
+            block_iter = reversed(blocks[:bisect_right(blocks, start_block)])
+        else:
+            block_iter = iter(blocks[bisect_left(blocks, start_block):])
+        for block in block_iter:
+            first = max(block * block_size, self.first_line)
+            last = min((block + 1) * block_size, self.line_count)
+            line_ids = [line_id for line_id in range(first, last) if _has_level(levels, line_id)]
+            if backward:
+                line_ids = [line_id for line_id in line_ids if line_id <= start_line]
+            else:
+                line_ids = [line_id for line_id in line_ids if line_id >= start_line]
+            if not line_ids:
+                continue
+            if needle:
+                texts = read_lines(line_ids[0], line_ids[-1] - line_ids[0] + 1)
+                line_ids = [line_id for line_id in line_ids
+                            if line_id - line_ids[0] < len(texts)
+                            and needle in strip_ansi(texts[line_id - line_ids[0]]).lower()]
+            yield from (reversed(line_ids) if backward else line_ids)
+
+    # ---------- 持久化 ----------
+
+    def save(self, path):
+        """
+        写入索引文件：文件头、词项表 JSON、按词项顺序拼接的 uint32 倒排表、各级别位图。
+        先写临时文件再替换，读取方不会看到写了一半的索引。
+        """
+        path = Path(path)
+        terms = list(self._postings)
+        term_table = json.dumps([[term, len(self._postings[term])] for term in terms],
+                                ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        bitmap_length = (self.line_count + 7) // 8
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, self.block_size, self.line_count,
+                                      self.first_line, len(term_table)))
+            f.write(term_table)
+            for term in terms:
+                posting = self._postings[term]
+                f.write(posting if isinstance(posting, array) else array('I', posting))
+            for level in LEVELS:
+                bits = self._level_bits[level][:bitmap_length]
+                f.write(bits + bytes(bitmap_length - len(bits)))
+            f.write(self._last_level.encode('ascii').ljust(8, b' '))
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path) -> 'LogSearchIndex':
+        """读取索引文件；倒排表以 memoryview 切片共享同一块内存，追加时才按需复制"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, block_size, line_count, first_line, table_length = _FILE_HEADER.unpack_from(data)
+        if magic != _FILE_MAGIC or version != _FILE_VERSION:
+            raise ValueError(f"不支持的检索索引文件: {path}")
+        index = cls(block_size)
+        index.line_count = line_count
+        index.first_line = first_line
+        offset = _FILE_HEADER.size
+        term_table = json.loads(data[offset:offset + table_length].decode('utf-8'))
+        offset += table_length
+        total = sum(count for _, count in term_table)
+        all_postings = array('I')
+        all_postings.frombytes(data[offset:offset + total * 4])
+        offset += total * 4
+        view = memoryview(all_postings)
+        position = 0
+        for term, count in term_table:
+            index._postings[term] = view[position:position + count]
+            position += count
+        bitmap_length = (line_count + 7) // 8
+        for level in LEVELS:
+            index._level_bits[level] = bytearray(data[offset:offset + bitmap_length])
+            offset += bitmap_length
+        index._last_level = data[offset:offset + 8].decode('ascii').strip() or 'INFO'
+        return index
+
+def _contains(posting, block) -> bool:
+    i = bisect_left(posting, block)
+    return i < len(posting) and posting[i] == block
+
+def _has_level(level_bits, line_id) -> bool:
+    byte_index, mask = line_id >> 3, 1 << (line_id & 7)
+    return any(byte_index < len(bits) and bits[byte_index] & mask for bits in level_bits)
@@ -0,0 +1,219 @@
+import os
+import io
+import difflib
+from fnmatch import fnmatchcase
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import Mapping
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from constants import KEY_ORDER_MAP
+from utils.config_utils import create_yaml_manager, order_config_keys
+from utils.plan_lint import collect_plan_files
+
+# 批量编辑计划：按选择器筛选计划文件，对每个文件应用 set / unset / merge 补丁。
+# 使用 ruamel 往返解析，注释与格式保持不变；写回时沿用 save_config 的键顺序。
+
+OPERATIONS = ('set', 'unset', 'merge')
+NODE_WILDCARD = '*'
+# 少于该数量的文件直接在当前进程处理，避免进程池的启动开销
+PARALLEL_THRESHOLD = 32
+
+_worker_yaml_manager = None
+
+def _to_yaml_value(value):
+    """将普通 Python 值转换为 ruamel 结构，只包含标量的列表使用流式风格。"""
+    if isinstance(value, Mapping):
+        result = CommentedMap()
+        for key, item in value.items():
+            result[key] = _to_yaml_value(item)
+        return result
+    if isinstance(value, (list, tuple)):
+        result = CommentedSeq(_to_yaml_value(item) for item in value)
+        if not any(isinstance(item, (Mapping, list, tuple)) for item in value):
+            result.fa.set_flow_style()
+        return result
+    return value
+
+def _plan_matches(plan_data, plan_type, event_folder, selector) -> bool:
+    """检查计划是否满足选择器中的类型、活动与地图条件。"""
+    if selector.get('plan_type') and plan_type != selector['plan_type']:
+        return False
+    if selector.get('event_folder') and event_folder != selector['event_folder']:
+        return False
+    map_glob = selector.get('map')
+    if map_glob:
+        if plan_data.get('map') is None:
+            return False
+        map_key = f"{plan_data.get('chapter')}-{plan_data.get('map')}" if 'chapter' in plan_data else str(plan_data.get('map'))
+        if not fnmatchcase(map_key, map_glob):
+            return False
+    return True
+
+def _expand_paths(plan_data, path, node_glob):
+    """展开路径中的节点通配符 '*'，节点候选为已选节点与已有的 node_args。"""
+    keys = path.split('.')
+    if NODE_WILDCARD not in keys:
+        return [keys]
+    nodes = list(plan_data.get('selected_nodes') or [])
+    for node in (plan_data.get('node_args') or {}):
+        if node not in nodes:
+            nodes.append(node)
+    if node_glob:
+        nodes = [node for node in nodes if fnmatchcase(str(node), node_glob)]
+    return [[str(node) if key == NODE_WILDCARD else key for key in keys] for node in nodes]
+
+def _remove_empty_parents(plan_data, keys):
+    """删除键后，逐级清理变为空的父映射（与编辑器中 node_args 的处理一致）。"""
+    for depth in range(len(keys) - 1, 0, -1):
+        parent = plan_data
+        for key in keys[:depth - 1]:
+            parent = parent.get(key)
+        child_key = keys[depth - 1]
+        if isinstance(parent.get(child_key), Mapping) and not parent[child_key]:
+            del parent[child_key]
+        else:
+            break
+
+def apply_operation(plan_data, operation, node_glob=None) -> bool:
+    """对一个计划应用单个操作，返回是否产生了修改。"""
+    op = operation['op']
+    changed = False
+    for keys in _expand_paths(plan_data, operation['path'], node_glob):
+        parent = plan_data
+        missing_parent = False
+        for key in keys[:-1]:
+            child = parent.get(key)
+            if not isinstance(child, Mapping):
+                if op == 'unset':
+                    missing_parent = True
+                    break
+                child = CommentedMap()
+                parent[key] = child
+            parent = child
+        if missing_parent:
+            continue
+        last_key = keys[-1]
+        if op == 'set':
+            new_value = _to_yaml_value(operation['value'])
+            if last_key not in parent or parent[last_key] != new_value:
+                parent[last_key] = new_value
+                changed = True
+        elif op == 'unset':
+            if last_key in parent:
+                del parent[last_key]
+                _remove_empty_parents(plan_data, keys)
+                changed = True
+        elif op == 'merge':
+            target = parent.get(last_key)
+            if not isinstance(target, Mapping):
+                target = CommentedMap()
+                parent[last_key] = target
+            for key, value in operation['value'].items():
+                new_value = _to_yaml_value(value)
+                if key not in target or target[key] != new_value:
+                    target[key] = new_value
+                    changed = True
+    return changed
+
+def _dump(yaml_manager, plan_data, plan_type):
+    stream = io.StringIO()
+    yaml_manager.dump(order_config_keys(plan_data, KEY_ORDER_MAP.get(plan_type)), stream)
+    return stream.getvalue()
+
+def preview_plan_file(plan_type, event_folder, file_path, selector, operations, yaml_manager=None):
+    """
+    在内存中对单个文件应用补丁。
+    返回 (file_path, 原文本, 新文本)，文件未命中或无修改时新文本为 None。
+    """
+    yaml_manager = yaml_manager or _worker_yaml_manager or create_yaml_manager()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            original_text = f.read()
+        plan_data = yaml_manager.load(original_text)
+    except Exception as e:
+        return file_path, None, f"解析失败: {e}"
+    if not isinstance(plan_data, Mapping) or not _plan_matches(plan_data, plan_type, event_folder, selector):
+        return file_path, original_text, None
+    changed = False
+    for operation in operations:
+        changed = apply_operation(plan_data, operation, selector.get('node')) or changed
+    if not changed:
+        return file_path, original_text, None
+    return file_path, original_text, _dump(yaml_manager, plan_data, plan_type)
+
+def _init_worker():
+    global _worker_yaml_manager
+    _worker_yaml_manager = create_yaml_manager()
+
+def _preview_task(task):
+    return preview_plan_file(*task)
+
+def validate_operations(operations):
+    """检查操作列表，格式错误时引发 ValueError。"""
+    if not operations:
+        raise ValueError("至少需要一个操作")
+    for operation in operations:
+        if operation.get('op') not in OPERATIONS:
+            raise ValueError(f"未知操作: {operation.get('op')}")
+        if not operation.get('path'):
+            raise ValueError("键路径不能为空")
+        if operation['op'] == 'merge' and not isinstance(operation.get('value'), Mapping):
+            raise ValueError("merge 操作的值必须是映射")
+
+def preview_bulk_edit(plan_root, selector, operations, max_workers=None):
+    """
+    计算批量编辑的结果但不写入文件。
+    返回 {'changes': [(file_path, 原文本, 新文本)], 'errors': [(file_path, 信息)], 'matched': 检查的文件数}。
+    """
+    validate_operations(operations)
+    plan_files = [
+        task for task in collect_plan_files(plan_root)
+        if not selector.get('plan_type') or task[0] == selector['plan_type']
+    ]
+    tasks = [(plan_type, event_folder, file_path, selector, operations) for plan_type, event_folder, file_path in plan_files]
+    if len(tasks) < PARALLEL_THRESHOLD or max_workers == 1:
+        yaml_manager = create_yaml_manager()
+        results = [preview_plan_file(*task, yaml_manager=yaml_manager) for task in tasks]
+    else:
+        chunk_size = max(1, len(tasks) // ((max_workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+            results = list(executor.map(_preview_task, tasks, chunksize=chunk_size))
+    changes, errors = [], []
+    for file_path, original_text, new_text in results:
+        if original_text is None:
+            errors.append((file_path, new_text))
+        elif new_text is not None:
+            changes.append((file_path, original_text, new_text))
+    return {'changes': changes, 'errors': errors, 'matched': len(tasks)}
+
+def format_diff(changes, plan_root=None) -> str:
+    """将修改列表格式化为统一 diff 文本。"""
+    diff_lines = []
+    for file_path, original_text, new_text in changes:
+        display_path = os.path.relpath(file_path, plan_root) if plan_root else file_path
+        diff_lines.extend(difflib.unified_diff(
+            original_text.splitlines(), new_text.splitlines(),
+            fromfile=display_path, tofile=display_path, lineterm=''
+        ))
+    return "\n".join(diff_lines)
+
+def _write_change(change):
+    file_path, original_text, new_text = change
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if f.read() != original_text:
+            raise Exception(f"{Path(file_path).name} 在预览后被修改，已跳过")
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(new_text)
+    return file_path
+
+def apply_bulk_edit(changes, max_workers=8):
+    """并行写入预览得到的修改，返回 (已写入的文件列表, 错误列表)。"""
+    written, errors = [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_write_change, change): change[0] for change in changes}
+        for future, file_path in futures.items():
+            try:
+                written.append(future.result())
+            except Exception as e:
+                errors.append((file_path, str(e)))
+    return written, errors
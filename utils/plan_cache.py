@@ -0,0 +1,88 @@
+import os
+import re
+from collections import OrderedDict
+
+# 计划文档缓存：按路径保存解析后的 CommentedMap 与预览文本，以 (mtime, size) 判断是否过期
+
+_COMMENT_PATTERN = re.compile(r'\s*#.*$')
+
+def render_plan_summary(text: str) -> str:
+    """去除注释和空行，生成只读预览文本。"""
+    clean_lines = []
+    for line in text.splitlines():
+        line_no_comment = _COMMENT_PATTERN.sub('', line).rstrip()
+        if line_no_comment:
+            clean_lines.append(line_no_comment)
+    return "\n".join(clean_lines)
+
+def _stat_key(file_path):
+    """返回文件的 (mtime_ns, size)，文件不存在时返回 None。"""
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+class PlanDocumentCache:
+    """
+    LRU 计划文档缓存。
+    命中时只做一次 stat，不读取文件内容；返回的 CommentedMap 与缓存共享，
+    调用方修改数据前应调用 invalidate()，保存后调用 put() 重新登记。
+    """
+    def __init__(self, yaml_manager, max_entries=32):
+        self.yaml_manager = yaml_manager
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, file_path):
+        """返回 (plan_data, summary_text)，缓存未命中或已过期时从文件加载。读取或解析失败时引发异常。"""
+        key = str(file_path)
+        stat_key = _stat_key(key)
+        entry = self._entries.get(key)
+        if entry is not None and stat_key is not None and entry[0] == stat_key:
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+        with open(key, 'r', encoding='utf-8') as f:
+            text = f.read()
+        plan_data = self.yaml_manager.load(text) or {}
+        summary_text = render_plan_summary(text)
+        self._store(key, stat_key, plan_data, summary_text)
+        return plan_data, summary_text
+
+    def get_summary(self, file_path) -> str:
+        return self.get(file_path)[1]
+
+    def put(self, file_path, plan_data):
+        """保存文件后登记内存中的数据，预览文本取自刚写入的文件。"""
+        key = str(file_path)
+        stat_key = _stat_key(key)
+        if stat_key is None:
+            self.invalidate(key)
+            return
+        with open(key, 'r', encoding='utf-8') as f:
+            summary_text = render_plan_summary(f.read())
+        self._store(key, stat_key, plan_data, summary_text)
+
+    def invalidate(self, file_path):
+        self._entries.pop(str(file_path), None)
+
+    def discard_if_stale(self, file_path) -> bool:
+        """文件在磁盘上已变化时丢弃对应条目，返回是否丢弃。"""
+        key = str(file_path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] != _stat_key(key):
+            del self._entries[key]
+            return True
+        return False
+
+    def clear(self):
+        self._entries.clear()
+
+    def paths(self) -> list:
+        return list(self._entries.keys())
+
+    def _store(self, key, stat_key, plan_data, summary_text):
+        self._entries[key] = (stat_key, plan_data, summary_text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
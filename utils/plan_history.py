@@ -0,0 +1,181 @@
+import sys
+from collections.abc import Mapping
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+# 计划编辑的撤销/重做历史
+# 历史只保存发生变化的路径 (key_path, old, new)，并维护一份与内存数据同步的冻结影子树。
+# 影子树以路径复制的方式更新，未变化的子树在各版本之间共享。
+
+MISSING = object()
+
+def freeze_value(value):
+    """将 ruamel 数据转换为不可变的普通结构：映射转为 dict，序列转为 tuple。"""
+    if isinstance(value, Mapping):
+        return {key: freeze_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(item) for item in value)
+    return value
+
+def thaw_value(value):
+    """将冻结的值还原为 ruamel 结构，只包含标量的序列使用流式风格。"""
+    if isinstance(value, dict):
+        thawed = CommentedMap()
+        for key, item in value.items():
+            thawed[key] = thaw_value(item)
+        return thawed
+    if isinstance(value, tuple):
+        thawed = CommentedSeq(thaw_value(item) for item in value)
+        if not any(isinstance(item, (dict, tuple)) for item in value):
+            thawed.fa.set_flow_style()
+        return thawed
+    return value
+
+def _estimate_size(value) -> int:
+    """粗略估算冻结值占用的内存。"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + _estimate_size(item)
+    elif isinstance(value, tuple):
+        for item in value:
+            size += _estimate_size(item)
+    return size
+
+def _diff(old, new, path, patches):
+    """比较影子树与内存数据，将差异以 (path, old, new) 追加到 patches。"""
+    if isinstance(old, dict) and isinstance(new, Mapping):
+        for key, new_item in new.items():
+            _diff(old.get(key, MISSING), new_item, path + (key,), patches)
+        for key, old_item in old.items():
+            if key not in new:
+                patches.append((path + (key,), old_item, MISSING))
+        return
+    frozen_new = freeze_value(new)
+    if old is MISSING or old != frozen_new or type(old) is not type(frozen_new):
+        patches.append((path, old, frozen_new))
+
+def _set_in(tree, path, value):
+    """路径复制：返回在 path 处设置 value 后的新树，其余子树与原树共享。"""
+    if not path:
+        return value
+    new_tree = dict(tree) if isinstance(tree, dict) else {}
+    key = path[0]
+    result = _set_in(new_tree.get(key, MISSING), path[1:], value)
+    if result is MISSING:
+        new_tree.pop(key, None)
+    else:
+        new_tree[key] = result
+    return new_tree
+
+def _apply_to_data(data, path, value):
+    """将冻结的值写回内存中的 ruamel 数据。"""
+    target = data
+    for key in path[:-1]:
+        child = target.get(key)
+        if not isinstance(child, Mapping):
+            if value is MISSING:
+                return
+            child = CommentedMap()
+            target[key] = child
+        target = child
+    if value is MISSING:
+        target.pop(path[-1], None)
+    else:
+        target[path[-1]] = thaw_value(value)
+
+class PlanHistory:
+    """以补丁记录 current_plan_data 的修改，条目数与估算内存均有上限。"""
+    def __init__(self, max_entries=200, max_bytes=2 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._undo_stack = []
+        self._redo_stack = []
+        self._total_bytes = 0
+        self._shadow = {}
+        self._next_entry_id = 1
+        self._base_entry_id = 0
+        self._saved_entry_id = 0
+
+    def reset(self, plan_data):
+        """以当前数据为基准清空历史。"""
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+        self._total_bytes = 0
+        self._shadow = freeze_value(plan_data) if isinstance(plan_data, Mapping) else {}
+        self._base_entry_id = 0
+        self._saved_entry_id = 0
+
+    def record(self, plan_data) -> bool:
+        """比较内存数据与影子树，若有变化则记录为一个新的历史条目。"""
+        patches = self._collect_patches(plan_data)
+        if not patches:
+            return False
+        for path, _, new in patches:
+            self._shadow = _set_in(self._shadow, path, new)
+        size = sum(_estimate_size(old) + _estimate_size(new) for _, old, new in patches)
+        self._undo_stack.append((self._next_entry_id, patches, size))
+        self._next_entry_id += 1
+        self._total_bytes += size
+        # 新的修改使重做历史失效
+        for _, _, redo_size in self._redo_stack:
+            self._total_bytes -= redo_size
+        self._redo_stack.clear()
+        self._trim()
+        return True
+
+    def resync(self, plan_data):
+        """将影子树与内存数据对齐，但不产生历史条目（用于重放后的界面联动修正）。"""
+        for path, _, new in self._collect_patches(plan_data):
+            self._shadow = _set_in(self._shadow, path, new)
+
+    def undo(self, plan_data) -> bool:
+        if not self._undo_stack:
+            return False
+        entry = self._undo_stack.pop()
+        for path, old, _ in reversed(entry[1]):
+            _apply_to_data(plan_data, path, old)
+            self._shadow = _set_in(self._shadow, path, old)
+        self._redo_stack.append(entry)
+        return True
+
+    def redo(self, plan_data) -> bool:
+        if not self._redo_stack:
+            return False
+        entry = self._redo_stack.pop()
+        for path, _, new in entry[1]:
+            _apply_to_data(plan_data, path, new)
+            self._shadow = _set_in(self._shadow, path, new)
+        self._undo_stack.append(entry)
+        return True
+
+    def can_undo(self) -> bool:
+        return bool(self._undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_stack)
+
+    def mark_saved(self):
+        """记录当前位置为已保存状态。"""
+        self._saved_entry_id = self._current_entry_id()
+
+    def is_at_saved_state(self) -> bool:
+        return self._current_entry_id() == self._saved_entry_id
+
+    def _current_entry_id(self):
+        # 栈底条目被丢弃后，空栈对应的是最后一个被丢弃的条目
+        return self._undo_stack[-1][0] if self._undo_stack else self._base_entry_id
+
+    def _collect_patches(self, plan_data):
+        patches = []
+        if isinstance(plan_data, Mapping):
+            _diff(self._shadow, plan_data, (), patches)
+        return patches
+
+    def _trim(self):
+        """超出条目数或内存上限时丢弃最早的历史。"""
+        while self._undo_stack and (
+            len(self._undo_stack) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            entry_id, _, size = self._undo_stack.pop(0)
+            self._base_entry_id = entry_id
+            self._total_bytes -= size
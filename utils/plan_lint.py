@@ -0,0 +1,273 @@
+import os
+import sys
+import argparse
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import yaml
+
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from constants import (
+    KEY_ORDER_MAP, VISIBLE_PARAMS_MAP, PARAM_DEFAULTS, SETTINGS_FILE,
+    NORMAL_MAP_CONFIGS_FILE, EVENT_MAP_CONFIGS_FILE
+)
+from utils.enemy_rule_utils import is_valid_action
+from utils.enemy_rule_compiler import parse_condition, RuleSyntaxError
+from utils.enemy_rule_optimizer import analyze_rules, describe_findings
+from utils.route_utils import find_reachable_nodes
+
+# 计划检查引擎：不依赖 Qt，可在进程池与命令行中运行
+
+MAP_PLAN_TYPES = {'normal_fight', 'week', 'special_ap_task', 'event'}
+NORMAL_MAP_PLAN_TYPES = {'normal_fight', 'week', 'special_ap_task'}
+UNCONTROLLED_PARAMS = {'enemy_rules', 'enemy_formation_rules'}
+FORMATION_VALUES = {1, 2, 3, 4, 5}
+# 少于该数量的计划直接在当前进程检查，避免进程池的启动开销
+PARALLEL_THRESHOLD = 32
+# 有 libyaml 时使用 C 实现的加载器，比纯 Python 实现快一个数量级
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+_worker_map_configs = None
+
+def _issue(level, location, message):
+    return {'level': level, 'location': location, 'message': message}
+
+def load_map_configs():
+    """读取普通与活动地图的节点配置，返回 (normal, event)。"""
+    configs = []
+    for file_path in (NORMAL_MAP_CONFIGS_FILE, EVENT_MAP_CONFIGS_FILE):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                configs.append(yaml.load(f, Loader=_YAML_LOADER) or {})
+        except Exception:
+            configs.append({})
+    return tuple(configs)
+
+def get_map_nodes(plan_type, plan_data, event_folder, map_configs):
+    """返回计划对应地图的节点配置，找不到时返回 None。"""
+    normal_configs, event_configs = map_configs
+    chapter = plan_data.get('chapter')
+    map_num = plan_data.get('map')
+    map_key = f"{chapter}-{map_num}"
+    if plan_type in NORMAL_MAP_PLAN_TYPES:
+        return normal_configs.get(f"chapter{chapter}", {}).get(map_key, {}).get('nodes')
+    if plan_type == 'event':
+        return event_configs.get(event_folder, {}).get(map_key, {}).get('nodes')
+    return None
+
+def collect_plan_files(plan_root):
+    """收集 plan_root 下所有可识别类型的计划，返回 [(plan_type, event_folder, path)]。"""
+    plan_files = []
+    root = Path(plan_root)
+    if not root.is_dir():
+        return plan_files
+    for type_dir in sorted(root.iterdir()):
+        plan_type = type_dir.name.lower()
+        if not type_dir.is_dir() or plan_type not in KEY_ORDER_MAP:
+            continue
+        if plan_type == 'event':
+            for event_dir in sorted(d for d in type_dir.iterdir() if d.is_dir()):
+                for file_path in sorted(event_dir.glob('*.yaml')):
+                    plan_files.append((plan_type, event_dir.name, str(file_path)))
+        else:
+            for file_path in sorted(type_dir.glob('*.yaml')):
+                plan_files.append((plan_type, None, str(file_path)))
+    return plan_files
+
+@lru_cache(maxsize=1024)
+def _rule_findings(rules_key):
+    """规则分析的结果按规则内容缓存，多个计划共用同一组规则时只分析一次"""
+    return tuple(describe_findings(analyze_rules([list(rule) for rule in rules_key])))
+
+def _lint_rules(location, rules):
+    """检查 enemy_rules 列表的语法。"""
+    issues = []
+    if not isinstance(rules, list):
+        return [_issue('error', location, "enemy_rules 必须是列表")]
+    for i, rule in enumerate(rules):
+        rule_location = f"{location}[{i}]"
+        if not isinstance(rule, list) or len(rule) != 2:
+            issues.append(_issue('error', rule_location, f"规则必须是 [条件, 操作]，实际为 {rule!r}"))
+            continue
+        condition, action = rule
+        try:
+            parse_condition(condition)
+        except RuleSyntaxError as e:
+            issues.append(_issue('error', rule_location, f"条件语法无效: {condition!r} ({e})"))
+        if not is_valid_action(action):
+            issues.append(_issue('error', rule_location, f"未知操作: {action!r}"))
+    if issues:
+        return issues
+    # 语法全部正确时再检查永不触发、被遮蔽与可简化的规则
+    try:
+        findings = _rule_findings(tuple(map(tuple, rules)))
+    except ImportError:
+        return issues
+    for message in findings:
+        issues.append(_issue('warning', location, message))
+    return issues
+
+def _lint_node_params(location, params, plan_type):
+    """检查单个节点（或 node_defaults）的参数。"""
+    if params is None:
+        return []
+    if not isinstance(params, dict):
+        return [_issue('error', location, "节点参数必须是映射")]
+    issues = []
+    visible_params = VISIBLE_PARAMS_MAP.get(plan_type, set())
+    for key, value in params.items():
+        key_location = f"{location}.{key}"
+        if key not in PARAM_DEFAULTS and key not in UNCONTROLLED_PARAMS:
+            issues.append(_issue('warning', key_location, "未知的节点参数"))
+            continue
+        if key not in visible_params:
+            issues.append(_issue('warning', key_location, f"该参数不适用于 {plan_type} 计划，编辑器保存时会被丢弃"))
+        if key == 'enemy_rules':
+            issues.extend(_lint_rules(key_location, value))
+        elif key == 'enemy_formation_rules':
+            if not isinstance(value, list):
+                issues.append(_issue('error', key_location, "enemy_formation_rules 必须是列表"))
+        elif key == 'proceed_stop':
+            is_valid = value in (1, 2) or (
+                isinstance(value, list) and len(value) == 6 and all(v in (1, 2) for v in value)
+            )
+            if not is_valid:
+                issues.append(_issue('error', key_location, f"应为 1、2 或 6 个 1/2 组成的列表，实际为 {value!r}"))
+        elif isinstance(PARAM_DEFAULTS[key], bool):
+            if not isinstance(value, bool):
+                issues.append(_issue('error', key_location, f"应为布尔值，实际为 {value!r}"))
+        elif key == 'formation':
+            if value not in FORMATION_VALUES or isinstance(value, bool):
+                issues.append(_issue('error', key_location, f"阵型应为 1-5，实际为 {value!r}"))
+        elif key == 'formation_when_spot_enemy_fails':
+            if value not in FORMATION_VALUES | {0} or isinstance(value, bool):
+                issues.append(_issue('error', key_location, f"阵型应为 0-5，实际为 {value!r}"))
+    return issues
+
+def lint_plan_data(plan_data, plan_type, event_folder, map_configs):
+    """检查一个已解析的计划，返回问题列表。"""
+    if not isinstance(plan_data, dict):
+        return [_issue('error', '', "计划文件内容必须是映射")]
+    issues = []
+    key_order = KEY_ORDER_MAP.get(plan_type, [])
+    for key in plan_data:
+        if key not in key_order:
+            issues.append(_issue('warning', key, f"未知的顶层键，{plan_type} 计划不使用该键"))
+
+    node_args = plan_data.get('node_args') or {}
+    if not isinstance(node_args, dict):
+        issues.append(_issue('error', 'node_args', "node_args 必须是映射"))
+        node_args = {}
+    issues.extend(_lint_node_params('node_defaults', plan_data.get('node_defaults'), plan_type))
+    for node_name, params in node_args.items():
+        issues.extend(_lint_node_params(f"node_args.{node_name}", params, plan_type))
+
+    if plan_type not in MAP_PLAN_TYPES:
+        return issues
+    if plan_data.get('chapter') is None or plan_data.get('map') is None:
+        issues.append(_issue('error', '', "地图计划缺少 'chapter' 或 'map' 键"))
+        return issues
+
+    selected_nodes = plan_data.get('selected_nodes') or []
+    if not isinstance(selected_nodes, list):
+        issues.append(_issue('error', 'selected_nodes', "selected_nodes 必须是列表"))
+        return issues
+    for node_name in node_args:
+        if node_name not in selected_nodes:
+            issues.append(_issue('warning', f"node_args.{node_name}", "该节点未被选中，其参数不会生效"))
+
+    nodes_data = get_map_nodes(plan_type, plan_data, event_folder, map_configs)
+    if not nodes_data:
+        map_key = f"{plan_data.get('chapter')}-{plan_data.get('map')}"
+        issues.append(_issue('warning', 'map', f"缺少地图 {map_key} 的节点配置，已跳过节点检查"))
+        return issues
+    unknown_nodes = [name for name in selected_nodes if name not in nodes_data]
+    for node_name in unknown_nodes:
+        issues.append(_issue('error', 'selected_nodes', f"地图中不存在节点 {node_name}"))
+    reachable_nodes = find_reachable_nodes(nodes_data, selected_nodes)
+    for node_name in selected_nodes:
+        if node_name in nodes_data and node_name not in reachable_nodes:
+            issues.append(_issue('error', 'selected_nodes', f"节点 {node_name} 无法从任何已选起点到达"))
+    return issues
+
+def lint_plan_file(plan_type, event_folder, file_path, map_configs=None):
+    """读取并检查一个计划文件，返回 (file_path, 问题列表)。"""
+    if map_configs is None:
+        map_configs = _worker_map_configs or load_map_configs()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            plan_data = yaml.load(f, Loader=_YAML_LOADER) or {}
+    except Exception as e:
+        return file_path, [_issue('error', '', f"YAML 解析失败: {e}")]
+    return file_path, lint_plan_data(plan_data, plan_type, event_folder, map_configs)
+
+def _init_worker(map_configs):
+    global _worker_map_configs
+    _worker_map_configs = map_configs
+
+def _lint_plan_file_task(task):
+    return lint_plan_file(*task)
+
+def lint_plan_root(plan_root, max_workers=None):
+    """并行检查 plan_root 下的所有计划，返回 {file_path: 问题列表}。"""
+    plan_files = collect_plan_files(plan_root)
+    map_configs = load_map_configs()
+    if len(plan_files) < PARALLEL_THRESHOLD or max_workers == 1:
+        return dict(lint_plan_file(*task, map_configs=map_configs) for task in plan_files)
+    chunk_size = max(1, len(plan_files) // ((max_workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(map_configs,)) as executor:
+        return dict(executor.map(_lint_plan_file_task, plan_files, chunksize=chunk_size))
+
+def count_issues(results):
+    """统计 (错误数, 警告数)。"""
+    errors = warnings = 0
+    for issues in results.values():
+        for issue in issues:
+            if issue['level'] == 'error':
+                errors += 1
+            else:
+                warnings += 1
+    return errors, warnings
+
+def format_report(results, plan_root=None):
+    """将检查结果格式化为文本报告。"""
+    lines = []
+    for file_path in sorted(results):
+        issues = results[file_path]
+        if not issues:
+            continue
+        display_path = os.path.relpath(file_path, plan_root) if plan_root else file_path
+        lines.append(display_path)
+        for issue in issues:
+            level_text = "错误" if issue['level'] == 'error' else "警告"
+            location = f" {issue['location']}:" if issue['location'] else ""
+            lines.append(f"  [{level_text}]{location} {issue['message']}")
+    errors, warnings = count_issues(results)
+    lines.append(f"共检查 {len(results)} 个计划，{errors} 个错误，{warnings} 个警告。")
+    return "\n".join(lines)
+
+def _get_default_plan_root():
+    try:
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+            return (yaml.safe_load(f) or {}).get('plan_root')
+    except Exception:
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查 plan_root 下的所有计划文件")
+    parser.add_argument('plan_root', nargs='?', help="计划根目录，默认读取 user_settings.yaml 中的 plan_root")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="并行进程数")
+    args = parser.parse_args(argv)
+    plan_root = args.plan_root or _get_default_plan_root()
+    if not plan_root or not os.path.isdir(plan_root):
+        print(f"计划文件夹未找到: {plan_root}", file=sys.stderr)
+        return 2
+    results = lint_plan_root(plan_root, max_workers=args.jobs)
+    print(format_report(results, plan_root))
+    errors, _ = count_issues(results)
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+from pathlib import Path
+from utils.config_utils import save_config
+
+# 计划引用关系：记录每个计划文件被哪些日常任务、预设和活动设置引用
+
+def plan_key_from_path(plan_root, file_path):
+    """根据计划文件路径生成 (计划类型, 活动文件夹, 计划名) 形式的键，无法识别时返回 None。"""
+    try:
+        relative_parts = Path(file_path).resolve().relative_to(Path(plan_root).resolve()).parts
+    except (ValueError, OSError, TypeError):
+        return None
+    plan_name = os.path.splitext(relative_parts[-1])[0]
+    if len(relative_parts) == 2:
+        return (relative_parts[0].lower(), None, plan_name)
+    if len(relative_parts) == 3 and relative_parts[0].lower() == 'event':
+        return ('event', relative_parts[1], plan_name)
+    return None
+
+class PlanReferenceIndex:
+    """
+    计划文件到引用方的反向索引。
+    索引在首次查询时构建，配置被其他页面修改后需调用 invalidate() 使其失效。
+    """
+    def __init__(self, settings_data, settings_path, configs_data, configs_path, yaml_manager):
+        self.settings_data = settings_data
+        self.settings_path = settings_path
+        self.configs_data = configs_data
+        self.configs_path = configs_path
+        self.yaml_manager = yaml_manager
+        self._index = None
+
+    def invalidate(self):
+        self._index = None
+
+    def _ensure_index(self):
+        if self._index is not None:
+            return self._index
+        index = {}
+        daily_tasks = (self.settings_data.get('daily_automation') or {}).get('normal_fight_tasks') or []
+        for row, task in enumerate(daily_tasks):
+            if task:
+                index.setdefault(('normal_fight', None, str(task[0])), []).append(
+                    {'kind': 'daily_task', 'name': "日常任务", 'row': row})
+        preset_map = self.configs_data.get('preset_task')
+        if isinstance(preset_map, dict):
+            for preset_name, tasks in preset_map.items():
+                for row, task in enumerate(tasks or []):
+                    if task:
+                        index.setdefault(('normal_fight', None, str(task[0])), []).append(
+                            {'kind': 'preset', 'name': preset_name, 'row': row})
+        event = self.configs_data.get('event_automation') or {}
+        if event.get('plan_name'):
+            index.setdefault(('event', event.get('event_folder'), str(event.get('plan_name'))), []).append(
+                {'kind': 'event', 'name': "活动任务", 'row': None})
+        self._index = index
+        return index
+
+    def get_references(self, plan_key) -> list:
+        """返回引用该计划的所有条目。"""
+        if plan_key is None:
+            return []
+        return list(self._ensure_index().get(tuple(plan_key), []))
+
+    def get_impacted_presets(self, plan_key) -> list:
+        """返回引用该计划的预设名称（去重并保持顺序）。"""
+        return list(dict.fromkeys(str(ref['name']) for ref in self.get_references(plan_key) if ref['kind'] == 'preset'))
+
+    def describe_references(self, plan_key) -> str:
+        """生成引用情况的简短描述，无引用时返回空字符串。"""
+        references = self.get_references(plan_key)
+        if not references:
+            return ""
+        parts = []
+        daily_count = sum(1 for ref in references if ref['kind'] == 'daily_task')
+        if daily_count:
+            parts.append(f"日常任务 {daily_count} 处")
+        presets = self.get_impacted_presets(plan_key)
+        if presets:
+            parts.append(f"预设: {'、'.join(presets)}")
+        if any(ref['kind'] == 'event' for ref in references):
+            parts.append("活动任务")
+        return "；".join(parts)
+
+    def rename_plan(self, old_path, new_path, plan_root) -> int:
+        """
+        重命名计划文件，并在一次保存中改写所有引用。
+        返回被改写的引用数量，失败时引发 Exception。
+        """
+        old_key = plan_key_from_path(plan_root, old_path)
+        new_key = plan_key_from_path(plan_root, new_path)
+        if old_key is None or new_key is None or old_key[:2] != new_key[:2]:
+            raise Exception("只能在同一文件夹内重命名计划")
+        references = self.get_references(old_key)
+        Path(old_path).rename(new_path)
+
+        new_name = new_key[2]
+        settings_changed = configs_changed = False
+        for ref in references:
+            if ref['kind'] == 'daily_task':
+                task = self.settings_data['daily_automation']['normal_fight_tasks'][ref['row']]
+                task[0] = new_name
+                settings_changed = True
+            elif ref['kind'] == 'preset':
+                task = self.configs_data['preset_task'][ref['name']][ref['row']]
+                task[0] = new_name
+                configs_changed = True
+            elif ref['kind'] == 'event':
+                self.configs_data['event_automation']['plan_name'] = new_name
+                configs_changed = True
+        # 每个配置文件最多保存一次
+        if settings_changed:
+            save_config(self.yaml_manager, self.settings_data, self.settings_path)
+        if configs_changed:
+            save_config(self.yaml_manager, self.configs_data, self.configs_path)
+        self.invalidate()
+        return len(references)
@@ -0,0 +1,101 @@
+from functools import lru_cache
+
+# 地图路线分析：根据节点图 (is_start / connections) 与已选节点枚举所有可能路线
+
+MAX_ROUTES = 1000
+
+def freeze_map_graph(nodes_data) -> tuple:
+    """将节点配置转换为可哈希的图结构 ((name, is_start, connections), ...)。"""
+    return tuple(
+        (name, bool((info or {}).get('is_start')), tuple((info or {}).get('connections') or ()))
+        for name, info in (nodes_data or {}).items()
+    )
+
+def find_reachable_nodes(nodes_data, selected_nodes) -> set:
+    """从已选起点出发，只经过已选节点所能到达的节点集合。"""
+    selected_set = set(selected_nodes)
+    queue = [name for name, info in nodes_data.items() if (info or {}).get('is_start') and name in selected_set]
+    visited = set(queue)
+    while queue:
+        node_name = queue.pop(0)
+        for conn_name in (nodes_data.get(node_name) or {}).get('connections') or []:
+            if conn_name in selected_set and conn_name not in visited:
+                visited.add(conn_name)
+                queue.append(conn_name)
+    return visited
+
+@lru_cache(maxsize=256)
+def _analyze_frozen(graph: tuple, selection: frozenset) -> dict:
+    """按 (地图, 选择) 缓存的分析实现，返回值不应被修改。"""
+    connections = {name: conns for name, _, conns in graph}
+    starts = [name for name, is_start, _ in graph if is_start and name in selection]
+
+    routes = []
+    truncated = False
+    # 有未选中后继的节点：走向该后继时 autowsgr 会撤退，出征在此节点结束
+    retreat_nodes = {name for name, conns in connections.items() if any(n not in selection for n in conns)}
+    # 深度优先枚举，路线在没有已选后继的节点处结束；节点同时有未选中的后继时，
+    # 另记一条在此撤退的路线
+    stack = [(start,) for start in reversed(starts)]
+    while stack:
+        route = stack.pop()
+        next_nodes = [n for n in connections.get(route[-1], ()) if n in selection and n not in route]
+        if not next_nodes or route[-1] in retreat_nodes:
+            if len(routes) >= MAX_ROUTES:
+                truncated = True
+                break
+            routes.append(route)
+        for next_node in reversed(next_nodes):
+            stack.append(route + (next_node,))
+
+    terminals = {}
+    for route in routes:
+        shortest, longest = terminals.get(route[-1], (len(route), len(route)))
+        terminals[route[-1]] = (min(shortest, len(route)), max(longest, len(route)))
+
+    # 可被进入的节点：已选路线上的节点及其直接后继（未选中的后继会在此撤退）
+    on_route = {node for route in routes for node in route}
+    enterable = set(on_route)
+    for node in on_route:
+        enterable.update(connections.get(node, ()))
+    if not starts:
+        enterable = {name for name, is_start, _ in graph if is_start}
+
+    return {
+        'routes': tuple(routes),
+        'terminals': terminals,
+        'retreat_terminals': frozenset(terminal for terminal in terminals if terminal in retreat_nodes),
+        'unreachable_selected': tuple(sorted(n for n in selection if n in connections and n not in on_route)),
+        'unreachable': tuple(sorted(n for n in connections if n not in enterable)),
+        'truncated': truncated,
+    }
+
+def analyze_routes(nodes_data, selected_nodes) -> dict:
+    """
+    分析已选节点构成的所有路线。
+    返回 routes (节点元组列表)、terminals ({终点: (最少战斗数, 最多战斗数)})、
+    retreat_terminals (路线会因走向未选中节点而撤退结束的终点)、
+    unreachable_selected (无法从起点到达的已选节点)、unreachable (当前选择下永远不会进入的节点)。
+    """
+    return _analyze_frozen(freeze_map_graph(nodes_data), frozenset(selected_nodes or ()))
+
+def format_route_summary(analysis: dict) -> str:
+    """将分析结果格式化为简短的文本。"""
+    routes = analysis['routes']
+    if not routes:
+        return "未选择起点，无可用路线"
+    lines = [f"共 {len(routes)} 条路线{'（已截断）' if analysis['truncated'] else ''}"]
+    retreat_terminals = analysis['retreat_terminals']
+    for route in routes:
+        lines.append(" → ".join(route) + ("（撤退）" if route[-1] in retreat_terminals else ""))
+    lines.append("")
+    lines.append("终点 (最少/最多战斗数):")
+    for terminal, (shortest, longest) in sorted(analysis['terminals'].items()):
+        lines.append(f"{terminal}: {shortest} / {longest}" + ("（撤退）" if terminal in retreat_terminals else ""))
+    if analysis['unreachable_selected']:
+        lines.append("")
+        lines.append(f"不可达的已选节点: {', '.join(analysis['unreachable_selected'])}")
+    if analysis['unreachable']:
+        lines.append("")
+        lines.append(f"无法到达的节点: {', '.join(analysis['unreachable'])}")
+    return "\n".join(lines)
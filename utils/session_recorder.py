@@ -0,0 +1,112 @@
+import gzip
+import json
+import struct
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+# 任务会话录制：按到达顺序保存任务进程 stdout / stderr 的原始字节与相对时间，
+# 用于回放同一段日志流做性能分析，或附在问题报告中。
+# 文件为 gzip 压缩的二进制流：
+#     MAGIC | 版本 (uint8) | 元数据长度 (uint32) | 元数据 JSON
+#     之后每条记录: 相对毫秒 (uint32) | 流编号 (uint8) | 数据长度 (uint32) | 数据
+# 流编号 0 为 stdout，1 为 stderr，2 为 JSON 格式的事件（如进程退出）。
+# 只依赖标准库，autowsgr 替身包也用它回放录制的会话。
+
+MAGIC = b'AWSR'
+FORMAT_VERSION = 1
+SESSION_SUFFIX = '.awsr'
+STREAM_STDOUT = 0
+STREAM_STDERR = 1
+STREAM_EVENT = 2
+# 最多每隔这么久把压缩缓冲区刷到磁盘一次，界面进程意外退出时最多丢失这段时间的输出
+FLUSH_INTERVAL_S = 1.0
+
+_HEADER = struct.Struct('<4sBI')
+_RECORD = struct.Struct('<IBI')
+
+def session_file_name(task_name: str) -> str:
+    return f"{task_name}_{datetime.now():%Y%m%d_%H%M%S}{SESSION_SUFFIX}"
+
+def decode_output(data: bytes, encoding: str) -> str:
+    """与任务页处理进程输出的方式一致，回放时得到与录制时相同的文本"""
+    return data.decode(encoding, errors='ignore').strip()
+
+class SessionRecorder:
+    """把一个任务进程的输出追加写入录制文件"""
+    def __init__(self, path, metadata: dict):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, 'wb', compresslevel=6)
+        header = json.dumps(dict(metadata, started=datetime.now().isoformat(timespec='milliseconds')),
+                            ensure_ascii=False).encode('utf-8')
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)) + header)
+        self._start = time.monotonic()
+        self._last_flush = self._start
+        self.byte_count = 0
+
+    def _elapsed_ms(self) -> int:
+        return int((time.monotonic() - self._start) * 1000)
+
+    def write(self, stream: int, data: bytes):
+        if not data or self._file is None:
+            return
+        self._file.write(_RECORD.pack(self._elapsed_ms(), stream, len(data)) + data)
+        self.byte_count += len(data)
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL_S:
+            self._file.flush()
+            self._last_flush = now
+
+    def write_event(self, name: str, **fields):
+        self.write(STREAM_EVENT, json.dumps(dict(fields, event=name), ensure_ascii=False).encode('utf-8'))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class SessionReader:
+    """读取录制文件；文件在录制中途被截断时读到截断处为止，并把 truncated 置为 True"""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.truncated = False
+        with gzip.open(self.path, 'rb') as f:
+            magic, version, header_length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"不是会话录制文件: {self.path}")
+            if version > FORMAT_VERSION:
+                raise ValueError(f"不支持的会话录制版本 {version}: {self.path}")
+            self.metadata = json.loads(f.read(header_length).decode('utf-8'))
+            self._data_offset = _HEADER.size + header_length
+
+    @property
+    def encoding(self) -> str:
+        return self.metadata.get('encoding') or 'utf-8'
+
+    def records(self):
+        """依次产生 (相对毫秒, 流编号, 数据)"""
+        with gzip.open(self.path, 'rb') as f:
+            try:
+                f.seek(self._data_offset)
+                while True:
+                    head = f.read(_RECORD.size)
+                    if len(head) < _RECORD.size:
+                        self.truncated = bool(head)
+                        return
+                    elapsed_ms, stream, length = _RECORD.unpack(head)
+                    data = f.read(length)
+                    if len(data) < length:
+                        self.truncated = True
+                        return
+                    yield elapsed_ms, stream, data
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                self.truncated = True
+
+def is_session_file(path) -> bool:
+    try:
+        with gzip.open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except (OSError, EOFError, zlib.error):
+        return False
@@ -0,0 +1,92 @@
+import json
+import time
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
+from utils.session_recorder import SessionReader, decode_output, STREAM_EVENT
+from utils import tracing
+
+# 会话回放：按录制时的时间间隔（可加速）把任务输出重新送入日志页与日志解析器，
+# 得到可重复的日志处理负载，也可以在本地重现用户附带的问题会话。
+
+# 不限速回放时每轮事件循环处理的记录数，保证回放期间界面仍可响应
+UNLIMITED_BATCH = 200
+
+class SessionReplayer(QObject):
+    """
+    回放一个会话录制文件。speed 为倍速，0 表示不等待、尽快回放。
+    output_ready 发出的文本与录制时任务页发出的 log_message_signal 相同；
+    回放结束后发出 finished(摘要)，摘要含记录数、字节数、录制时长、回放耗时与录制中的退出事件。
+    """
+    output_ready = Signal(str)
+    finished = Signal(dict)
+
+    def __init__(self, path, speed: float = 1.0, parent=None):
+        super().__init__(parent)
+        self.reader = SessionReader(path)
+        self.speed = max(0.0, speed)
+        self._records = None
+        self._pending = None
+        self._started = 0.0
+        self._summary = {}
+        self._finish_span = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._emit_due_records)
+
+    def is_running(self) -> bool:
+        return self._records is not None
+
+    def start(self):
+        self._records = self.reader.records()
+        self._pending = next(self._records, None)
+        self._started = time.perf_counter()
+        self._summary = {'path': str(self.reader.path), 'records': 0, 'bytes': 0, 'recorded_ms': 0, 'exit': None}
+        self._finish_span = tracing.begin("session replay", file=self.reader.path.name, speed=self.speed)
+        self._timer.start(0)
+
+    def stop(self):
+        if self.is_running():
+            self._timer.stop()
+            self._finish(stopped=True)
+
+    def _session_now_ms(self) -> float:
+        if self.speed == 0:
+            return float('inf')
+        return (time.perf_counter() - self._started) * 1000 * self.speed
+
+    def _emit_due_records(self):
+        now_ms = self._session_now_ms()
+        budget = UNLIMITED_BATCH if self.speed == 0 else None
+        encoding = self.reader.encoding
+        while self._pending is not None and self._pending[0] <= now_ms:
+            elapsed_ms, stream, data = self._pending
+            self._summary['records'] += 1
+            self._summary['bytes'] += len(data)
+            self._summary['recorded_ms'] = elapsed_ms
+            if stream == STREAM_EVENT:
+                event = json.loads(data.decode('utf-8'))
+                if event.get('event') == 'exit':
+                    self._summary['exit'] = event
+            else:
+                text = decode_output(data, encoding)
+                if text:
+                    self.output_ready.emit(text)
+            self._pending = next(self._records, None)
+            if budget is not None:
+                budget -= 1
+                if budget == 0:
+                    break
+        if self._pending is None:
+            self._finish(stopped=False)
+        elif self.speed == 0:
+            self._timer.start(0)
+        else:
+            self._timer.start(max(0, int((self._pending[0] - self._session_now_ms()) / self.speed)))
+
+    def _finish(self, stopped: bool):
+        self._records = None
+        self._pending = None
+        self._summary.update(elapsed_ms=(time.perf_counter() - self._started) * 1000, stopped=stopped,
+                             truncated=self.reader.truncated)
+        self._finish_span(records=self._summary['records'], stopped=stopped)
+        self.finished.emit(dict(self._summary))
@@ -1,27 +1,101 @@
 import yaml
-from collections import defaultdict
+import heapq
+from functools import lru_cache
 from PySide6.QtWidgets import QMessageBox
 from constants import SHIPS_FILE
+from utils.ui_utils import natural_sort_key
 
-def load_ship_data(file_path=SHIPS_FILE, target_types=None, group_by_type=False):
+class ShipCatalog:
     """
-    加载并解析舰船数据YAML文件，支持按舰种筛选和自定义返回结构。
+    舰船目录：在构造时建立全部索引，之后的查询不再读取文件或排序。
+    一艘船可能同时属于多个舰种（例如同时为防驱和导驱）。
+    """
+    def __init__(self, full_ship_data: dict):
+        name_index = {}
+        by_type = {}
+        by_nation = {}
+        by_type_nation = {}
+        nations_in_order = {}
+        for ship_type, nations in (full_ship_data or {}).items():
+            if not isinstance(nations, dict): continue
+            for nation, ships in nations.items():
+                if not isinstance(ships, list): continue
+                nations_in_order.setdefault(nation, None)
+                for ship in ships:
+                    if not ship: continue
+                    entries = name_index.setdefault(ship, [])
+                    if (ship_type, nation) not in entries:
+                        entries.append((ship_type, nation))
+                    by_type.setdefault(ship_type, set()).add(ship)
+                    by_nation.setdefault(nation, set()).add(ship)
+                    by_type_nation.setdefault((ship_type, nation), set()).add(ship)
 
-    Args:
-        file_path (str): 'all_ships.yaml' 文件的路径。
-        target_types (list, optional): 
-            一个包含舰种字符串的列表 (例如 ['BB', 'BC'])。
-            如果为 None 或 ['all']，则加载所有舰种。默认为 None。
-        group_by_type (bool, optional): 
-            决定返回字典的结构。
-            - False (默认): 返回按国籍分组的扁平字典。
-              {'C国': ['船A', '船B'], 'E国': ['船C']}
-            - True: 返回按国籍和舰种分组的嵌套字典。
-              {'C国': {'BB': ['船A'], 'BC': ['船B']}, 'E国': ...}
+        # 名称 -> ((舰种, 国籍), ...)
+        self.name_index = {name: tuple(entries) for name, entries in name_index.items()}
+        # 全部船名按自然顺序排列，其余结果都按此顺序输出
+        self.names = tuple(sorted(self.name_index, key=natural_sort_key))
+        self._order = {name: i for i, name in enumerate(self.names)}
+        self.by_type = {ship_type: self._ordered(ships) for ship_type, ships in by_type.items()}
+        self.by_nation = {nation: self._ordered(ships) for nation, ships in by_nation.items()}
+        self._by_type_nation = by_type_nation
+        self.types = tuple(sorted(self.by_type))
+        self.nations = tuple(sorted(self.by_nation))
+        self._nations_in_order = tuple(nations_in_order)
+        self._full_ship_data = full_ship_data or {}
 
-    Returns:
-        dict: 根据参数构建的舰船数据字典。出错时返回空字典。
-    """
+    def _ordered(self, ships) -> tuple:
+        return tuple(sorted(ships, key=self._order.__getitem__))
+
+    def __contains__(self, ship_name) -> bool:
+        return ship_name in self.name_index
+
+    @lru_cache(maxsize=256)
+    def filter_names(self, nation=None, types=None) -> tuple:
+        """
+        按国籍与舰种筛选船名，结果已按自然顺序排列并被缓存。
+        nation 为 None 表示全部国籍；types 为舰种元组，None 表示全部舰种。
+        """
+        if nation is None and types is None:
+            return self.names
+        if types is None:
+            return self.by_nation.get(nation, ())
+        candidates = set()
+        for ship_type in types:
+            if nation is None:
+                candidates.update(self.by_type.get(ship_type, ()))
+            else:
+                # 同名船可能属于不同国籍的不同舰种，必须按 (舰种, 国籍) 组合筛选
+                candidates.update(self._by_type_nation.get((ship_type, nation), ()))
+        return self._ordered(candidates)
+
+    @lru_cache(maxsize=32)
+    def nations_for(self, types=None) -> tuple:
+        """返回拥有指定舰种的国籍，保持在数据文件中首次出现的顺序。"""
+        if types is None:
+            return self._nations_in_order
+        nations = {}
+        for ship_type in types:
+            for nation in self._full_ship_data.get(ship_type) or {}:
+                nations.setdefault(nation, None)
+        return tuple(nations)
+
+    def merge_with_custom(self, names, custom_ships) -> list:
+        """将自定义船名合并进已排序的船名列表（去重并保持自然顺序）。"""
+        custom_sorted = sorted((name for name in set(custom_ships) if name and name not in self._order), key=natural_sort_key)
+        if not custom_sorted:
+            return list(names)
+        return list(heapq.merge(names, custom_sorted, key=natural_sort_key))
+
+_catalog = None
+
+def get_ship_catalog() -> ShipCatalog:
+    """返回进程内唯一的舰船目录，首次调用时才读取 all_ships.yaml。"""
+    global _catalog
+    if _catalog is None:
+        _catalog = ShipCatalog(_read_ship_file(SHIPS_FILE))
+    return _catalog
+
+def _read_ship_file(file_path) -> dict:
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             full_ship_data = yaml.safe_load(f) or {}
@@ -35,36 +109,4 @@ def load_ship_data(file_path=SHIPS_FILE, target_types=None, group_by_type=False)
     if not isinstance(full_ship_data, dict):
         QMessageBox.critical(None, "数据格式错误", f"'{file_path}' 内容非有效字典。")
         return {}
-
-    # 初始化返回结果的结构
-    if group_by_type:
-        # defaultdict 的 lambda 写法可以创建嵌套的 defaultdict
-        result_data = defaultdict(lambda: defaultdict(set))
-    else:
-        result_data = defaultdict(set)
-    
-    # 确定是否需要筛选
-    should_filter = isinstance(target_types, list) and 'all' not in target_types
-
-    for ship_type, nations in full_ship_data.items():
-        if should_filter and ship_type not in target_types:
-            continue  # 如果需要筛选且当前类型不匹配，则跳过
-        
-        if not isinstance(nations, dict): continue
-        for nation, ships in nations.items():
-            if not isinstance(ships, list): continue
-            
-            # 根据 group_by_type 参数填充数据
-            if group_by_type:
-                result_data[nation][ship_type].update(ships)
-            else:
-                result_data[nation].update(ships)
-
-    # 将最终结果中的 set 转换为排序后的 list
-    if group_by_type:
-        return {
-            nation: {stype: sorted(list(slist)) for stype, slist in sdict.items()}
-            for nation, sdict in result_data.items()
-        }
-    else:
-        return {nation: sorted(list(slist)) for nation, slist in result_data.items()}
\ No newline at end of file
+    return full_ship_data
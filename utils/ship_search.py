@@ -0,0 +1,133 @@
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时只能按船名搜索
+    lazy_pinyin = None
+
+PINYIN_AVAILABLE = lazy_pinyin is not None
+
+# 舰船搜索：对船名、拼音首字母与全拼建立前缀树，按 精确 > 船名前缀 > 拼音前缀 > 包含 > 模糊 排序
+# 同一档次内保持船名的自然顺序
+
+RANK_EXACT = 0
+RANK_NAME_PREFIX = 1
+RANK_PINYIN_PREFIX = 2
+RANK_SUBSTRING = 3
+RANK_FUZZY = 4
+
+_IDS = None  # 前缀树节点中保存船名序号集合的键
+_RESULT_CACHE_SIZE = 64
+
+def normalize_query(text) -> str:
+    return ''.join(str(text).split()).lower()
+
+def pinyin_keys(name) -> tuple:
+    """返回船名的 (全拼, 首字母)，未安装 pypinyin 或船名不含汉字时返回空元组。"""
+    if lazy_pinyin is None:
+        return ()
+    syllables = [s for s in lazy_pinyin(name) if s.strip()]
+    full = normalize_query(''.join(syllables))
+    if full == normalize_query(name):
+        return ()
+    initials = normalize_query(''.join(s[0] for s in syllables))
+    return (full, initials) if initials != full else (full,)
+
+def _is_subsequence(query, text) -> bool:
+    remaining = iter(text)
+    return all(char in remaining for char in query)
+
+class _PrefixTrie:
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key, ship_id):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+            node.setdefault(_IDS, set()).add(ship_id)
+
+    def lookup(self, prefix) -> set:
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node.get(_IDS, set())
+
+class ShipSearchIndex:
+    """
+    舰船搜索索引，构造较慢（需要计算拼音），应在后台线程中建立；建立后只读，查询在 GUI 线程进行。
+    names 应已按自然顺序排列。
+    """
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.has_pinyin = lazy_pinyin is not None
+        self._name_trie = _PrefixTrie()
+        self._pinyin_trie = _PrefixTrie()
+        self._exact = {}
+        # 每个船名参与包含/模糊匹配的全部键
+        self._keys = []
+        for ship_id, name in enumerate(self.names):
+            name_key = normalize_query(name)
+            keys = (name_key,) + pinyin_keys(name)
+            self._keys.append(keys)
+            self._name_trie.insert(name_key, ship_id)
+            for key in keys:
+                self._exact.setdefault(key, set()).add(ship_id)
+            for key in keys[1:]:
+                self._pinyin_trie.insert(key, ship_id)
+        self._char_sets = [frozenset(''.join(keys)) for keys in self._keys]
+        # 查询 -> 命中的船名序号，用于逐字输入时只在上一次的结果中继续筛选
+        self._matched_cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, query):
+        """返回最长的已缓存前缀查询的命中集合，不存在时返回 None（即全部船名）。"""
+        for end in range(len(query) - 1, 0, -1):
+            matched = self._matched_cache.get(query[:end])
+            if matched is not None:
+                return matched
+        return None
+
+    def _rank(self, query) -> dict:
+        ranks = {}
+        for ship_id in self._exact.get(query, ()):
+            ranks[ship_id] = RANK_EXACT
+        for ship_id in self._name_trie.lookup(query):
+            ranks.setdefault(ship_id, RANK_NAME_PREFIX)
+        for ship_id in self._pinyin_trie.lookup(query):
+            ranks.setdefault(ship_id, RANK_PINYIN_PREFIX)
+
+        candidates = self._candidates(query)
+        if candidates is None:
+            candidates = range(len(self.names))
+        query_chars = set(query)
+        for ship_id in candidates:
+            if ship_id in ranks or not query_chars <= self._char_sets[ship_id]:
+                continue
+            keys = self._keys[ship_id]
+            if any(query in key for key in keys):
+                ranks[ship_id] = RANK_SUBSTRING
+            elif len(query) > 1 and any(_is_subsequence(query, key) for key in keys):
+                ranks[ship_id] = RANK_FUZZY
+        return ranks
+
+    def search(self, text) -> list:
+        """返回按相关度排序的船名列表，查询为空时返回全部船名。"""
+        query = normalize_query(text)
+        if not query:
+            return list(self.names)
+        ranks = self._rank(query)
+        if len(self._matched_cache) >= _RESULT_CACHE_SIZE:
+            self._matched_cache.clear()
+        self._matched_cache[query] = frozenset(ranks)
+        # 序号即自然顺序，排序键为 (档次, 序号)
+        return [self.names[ship_id] for ship_id in sorted(ranks, key=lambda i: (ranks[i], i))]
+
+def simple_search(names, text) -> list:
+    """索引尚未建立时的退化搜索：仅按船名包含关系筛选。"""
+    query = normalize_query(text)
+    if not query:
+        return list(names)
+    return [name for name in names if query in normalize_query(name)]
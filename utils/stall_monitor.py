@@ -0,0 +1,180 @@
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from PySide6.QtCore import QObject, QTimer, Signal
+
+# 界面响应监视：主线程上的心跳定时器测量事件循环延迟，
+# 看门狗线程在心跳超时（卡顿）期间用 sys._current_frames() 采样主线程的 Python 调用栈，
+# 卡顿结束后按函数汇总采样，生成报告。
+
+HEARTBEAT_INTERVAL_MS = 50
+STALL_THRESHOLD_MS = 100
+SAMPLE_INTERVAL_S = 0.01
+MAX_STACK_DEPTH = 40
+RECENT_STALLS = 50
+REPORT_TOP_FUNCTIONS = 25
+
+def _function_key(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+def _sample_stack(frame) -> tuple:
+    """返回从栈顶（正在执行的函数）到栈底的函数列表。"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_function_key(frame))
+        frame = frame.f_back
+    return tuple(stack)
+
+class _Watchdog(threading.Thread):
+    def __init__(self, monitor, main_thread_id):
+        super().__init__(name="StallWatchdog", daemon=True)
+        self.monitor = monitor
+        self.main_thread_id = main_thread_id
+        self.stop_event = threading.Event()
+
+    def run(self):
+        threshold = self.monitor.threshold_ms / 1000
+        while not self.stop_event.wait(SAMPLE_INTERVAL_S):
+            if time.perf_counter() - self.monitor.last_beat < threshold:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is not None:
+                self.monitor.add_sample(_sample_stack(frame))
+            del frame
+
+class StallMonitor(QObject):
+    """
+    事件循环卡顿监视器。start() 后持续运行，开销为每 50 ms 一次心跳与每 10 ms 一次时间比较。
+    每次卡顿结束时发出 stall_detected(记录)，记录含开始时间、持续时长与热点函数。
+    """
+    stall_detected = Signal(dict)
+
+    def __init__(self, report_path: Path = None, threshold_ms: int = STALL_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.report_path = report_path
+        self.threshold_ms = threshold_ms
+        self.last_beat = time.perf_counter()
+        self._lock = threading.Lock()
+        self._pending_samples = []
+        self._watchdog = None
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setInterval(HEARTBEAT_INTERVAL_MS)
+        self._heartbeat.timeout.connect(self._on_heartbeat)
+        # 卡顿后延迟写报告，避免连续卡顿时频繁写文件
+        self._report_timer = QTimer(self)
+        self._report_timer.setSingleShot(True)
+        self._report_timer.setInterval(5000)
+        self._report_timer.timeout.connect(self.write_report)
+        self.reset()
+
+    def reset(self):
+        """清空已收集的统计"""
+        self.started_at = datetime.now()
+        self.latencies = deque(maxlen=1200)
+        self.recent_stalls = deque(maxlen=RECENT_STALLS)
+        self.stall_count = 0
+        self.total_stall_ms = 0.0
+        self.max_stall_ms = 0.0
+        self.self_counts = Counter()
+        self.inclusive_counts = Counter()
+        self.sample_count = 0
+
+    def start(self):
+        if self._watchdog is not None:
+            return
+        self.last_beat = time.perf_counter()
+        self._heartbeat.start()
+        self._watchdog = _Watchdog(self, threading.main_thread().ident)
+        self._watchdog.start()
+
+    def stop(self):
+        if self._watchdog is None:
+            return
+        self._heartbeat.stop()
+        self._watchdog.stop_event.set()
+        self._watchdog.join()
+        self._watchdog = None
+
+    def is_running(self) -> bool:
+        return self._watchdog is not None
+
+    def add_sample(self, stack: tuple):
+        """由看门狗线程调用"""
+        with self._lock:
+            self._pending_samples.append(stack)
+
+    def _on_heartbeat(self):
+        now = time.perf_counter()
+        gap_ms = (now - self.last_beat) * 1000
+        self.last_beat = now
+        self.latencies.append(max(0.0, gap_ms - HEARTBEAT_INTERVAL_MS))
+        with self._lock:
+            samples, self._pending_samples = self._pending_samples, []
+        if gap_ms < self.threshold_ms and not samples:
+            return
+        self._record_stall(gap_ms, samples)
+
+    def _record_stall(self, duration_ms: float, samples: list):
+        stall_self = Counter(stack[0] for stack in samples if stack)
+        for stack in samples:
+            self.inclusive_counts.update(set(stack))
+        self.self_counts.update(stall_self)
+        self.sample_count += len(samples)
+        self.stall_count += 1
+        self.total_stall_ms += duration_ms
+        self.max_stall_ms = max(self.max_stall_ms, duration_ms)
+        hotspot = stall_self.most_common(1)[0][0] if stall_self else "（未采样到 Python 调用栈）"
+        record = {
+            'time': datetime.now() - timedelta(milliseconds=duration_ms),
+            'duration_ms': duration_ms,
+            'samples': len(samples),
+            'hotspot': hotspot,
+            'stack': samples[len(samples) // 2] if samples else (),
+        }
+        self.recent_stalls.append(record)
+        self.stall_detected.emit(record)
+        if self.report_path is not None and not self._report_timer.isActive():
+            self._report_timer.start()
+
+    def format_report(self) -> str:
+        """生成文本格式的卡顿报告"""
+        latencies = sorted(self.latencies)
+        lines = [
+            f"界面卡顿报告  生成于 {datetime.now():%Y-%m-%d %H:%M:%S}，统计开始于 {self.started_at:%Y-%m-%d %H:%M:%S}",
+            f"心跳间隔 {HEARTBEAT_INTERVAL_MS} ms，卡顿阈值 {self.threshold_ms} ms",
+        ]
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            lines.append(f"事件循环延迟（最近 {len(latencies)} 次心跳）：平均 {sum(latencies) / len(latencies):.1f} ms，"
+                         f"P95 {p95:.1f} ms，最大 {latencies[-1]:.1f} ms")
+        lines.append(f"卡顿次数 {self.stall_count}，累计 {self.total_stall_ms:.0f} ms，最长 {self.max_stall_ms:.0f} ms，"
+                     f"调用栈采样 {self.sample_count} 次")
+        if self.sample_count:
+            lines.append("")
+            lines.append("热点函数（采样次数：位于栈顶 / 位于栈中）：")
+            for key, inclusive in self.inclusive_counts.most_common(REPORT_TOP_FUNCTIONS):
+                lines.append(f"  {self.self_counts.get(key, 0):>5} / {inclusive:<5} {key}")
+        if self.recent_stalls:
+            lines.append("")
+            lines.append("最近的卡顿：")
+            for record in reversed(self.recent_stalls):
+                lines.append(f"  {record['time']:%H:%M:%S}  {record['duration_ms']:>6.0f} ms  {record['hotspot']}")
+                for frame in record['stack'][1:6]:
+                    lines.append(f"      ← {frame}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self) -> bool:
+        """把报告写入 report_path"""
+        if self.report_path is None:
+            return False
+        try:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(self.format_report(), encoding='utf-8')
+        except OSError as e:
+            print(f"写入卡顿报告失败: {e}")
+            return False
+        return True
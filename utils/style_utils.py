@@ -0,0 +1,43 @@
+from PySide6.QtCore import QTimer
+from shiboken6 import isValid
+
+# 动态属性样式的批量刷新：setProperty 立即生效，但 QSS 的重新匹配（unpolish + polish）
+# 推迟到本轮事件循环结束后统一执行，同一控件在一轮内无论改动多少次属性都只刷新一次。
+
+_pending = {}
+_flush_scheduled = False
+
+def set_style_property(widget, name, value, *dependents) -> bool:
+    """
+    设置用于 QSS 选择器的动态属性，值未变化时不做任何事。
+    dependents 为样式规则依赖该属性的子控件（如 "#Parent[state=on] #Child"），会一并刷新。
+    :return: 属性是否发生了变化
+    """
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    request_repolish(widget, *dependents)
+    return True
+
+def request_repolish(*widgets):
+    """登记需要重新匹配样式的控件，在下一轮事件循环中统一刷新。"""
+    global _flush_scheduled
+    for widget in widgets:
+        _pending[id(widget)] = widget
+    if _pending and not _flush_scheduled:
+        _flush_scheduled = True
+        QTimer.singleShot(0, flush_repolish)
+
+def flush_repolish():
+    """立即刷新所有已登记的控件，已销毁的控件会被跳过。"""
+    global _flush_scheduled
+    _flush_scheduled = False
+    widgets = list(_pending.values())
+    _pending.clear()
+    for widget in widgets:
+        if not isValid(widget):
+            continue
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+        widget.update()
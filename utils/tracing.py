@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from pathlib import Path
+
+# 轻量级运行时追踪：span() 上下文管理器、traced 装饰器与 instant() 瞬时事件，
+# 记录写入定长环形缓冲区，可导出为 Chrome Trace / Perfetto 可读取的 JSON。
+# 未开启时 span() 返回共享的空上下文，traced 包装的函数只多一次全局变量判断。
+# 设置环境变量 AUTOWSGR_TRACE=1 可在启动时开启，也可从隐藏的诊断菜单开关。
+
+TRACE_ENV = 'AUTOWSGR_TRACE'
+DEFAULT_CAPACITY = 50000
+
+_enabled = False
+_events = deque(maxlen=DEFAULT_CAPACITY)
+_origin = time.perf_counter()
+_thread_names = {}
+
+def is_enabled() -> bool:
+    return _enabled
+
+def enable(capacity: int = None):
+    """开启追踪；指定 capacity 时重新分配缓冲区（会清空已有记录）"""
+    global _enabled, _events
+    if capacity is not None and capacity != _events.maxlen:
+        _events = deque(maxlen=capacity)
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def clear():
+    _events.clear()
+
+def event_count() -> int:
+    return len(_events)
+
+def _now_us() -> float:
+    return (time.perf_counter() - _origin) * 1e6
+
+def _thread_id() -> int:
+    tid = threading.get_ident()
+    if tid not in _thread_names:
+        _thread_names[tid] = threading.current_thread().name
+    return tid
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        args = self.args
+        if exc_type is not None:
+            args = dict(args, error=exc_type.__name__)
+        _events.append(('X', self.name, self.category, self.start, end - self.start, _thread_id(), args))
+        return False
+
+def span(name: str, category: str = 'gui', **args):
+    """记录 with 块的耗时，args 会显示在追踪查看器的详情中"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+def traced(name: str = None, category: str = 'gui'):
+    """把整个函数记录为一个 span，默认名称为函数的限定名"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def instant(name: str, category: str = 'gui', **args):
+    """记录一个瞬时事件"""
+    if _enabled:
+        _events.append(('i', name, category, _now_us(), 0, _thread_id(), args))
+
+def begin(name: str, category: str = 'gui', **args):
+    """开始一个跨越回调的 span（如任务从启动到结束），返回结束它的函数"""
+    if not _enabled:
+        return _noop
+    start = _now_us()
+    tid = _thread_id()
+
+    def finish(**end_args):
+        _events.append(('X', name, category, start, _now_us() - start, tid, dict(args, **end_args)))
+    return finish
+
+def _noop(**end_args):
+    pass
+
+def to_chrome_trace() -> dict:
+    pid = os.getpid()
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'AutoWSGR GUI'}}]
+    for tid, thread_name in _thread_names.items():
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}})
+    for phase, name, category, ts, dur, tid, args in list(_events):
+        event = {'name': name, 'cat': category, 'ph': phase, 'ts': round(ts, 1), 'pid': pid, 'tid': tid}
+        if phase == 'X':
+            event['dur'] = round(dur, 1)
+        else:
+            event['s'] = 't'
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        trace_events.append(event)
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+def dump(path) -> Path:
+    """把缓冲区中的记录写为 Chrome Trace JSON（Perfetto 同样可以直接打开）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(to_chrome_trace(), f, ensure_ascii=False)
+    return path
+
+if os.environ.get(TRACE_ENV, '') not in ('', '0'):
+    enable()
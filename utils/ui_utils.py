@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel, QGridLayout, QWidget, QLayout, QPushButton
 from PySide6.QtCore import Qt, QObject, Signal
 import re
+from utils.style_utils import set_style_property
 
 def create_group(title=None, content=None, margins=(15,15,15,0)):
     """
@@ -151,6 +152,7 @@ def create_ok_cancel_buttons():
 class ConfirmButtonManager(QObject):
     """为一个QPushButton提供二次点击确认功能。"""
     confirmed_click = Signal()
+    confirming_changed = Signal(bool)
 
     def __init__(self, button: QPushButton, confirm_text: str = "再次点击", 
                  pre_condition_check: callable = None, parent: QObject = None):
@@ -175,23 +177,18 @@ class ConfirmButtonManager(QObject):
             # 如果检查函数存在且返回False，则中止操作，不进入二次确认
             return
             
-        self.button.setProperty("confirming", True)
+        set_style_property(self.button, "confirming", True)
         self._original_text = self.button.text()
         self.button.setText(self.confirm_text)
-        self._force_style_update()
+        self.confirming_changed.emit(True)
 
     def reset_state(self):
         """将按钮恢复到正常状态。"""
         if self.is_confirming():
-            self.button.setProperty("confirming", False)
+            set_style_property(self.button, "confirming", False)
             self.button.setText(self._original_text)
-            self._force_style_update()
+            self.confirming_changed.emit(False)
 
     def is_confirming(self):
         """检查按钮是否处于确认状态。"""
-        return self.button.property("confirming") == True
-
-    def _force_style_update(self):
-        """强制按钮刷新其视觉样式以响应属性变化。"""
-        self.button.style().unpolish(self.button)
-        self.button.style().polish(self.button)
\ No newline at end of file
+        return self.button.property("confirming") == True
\ No newline at end of file